@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+请求头设置方式基准 - 对比生成的服务器中 RapidAPI headers 的两种设置方式的单次请求开销
+
+- 改造前: 替换 client.request，每次请求新建/合并 headers 字典（未设置 API_KEY 时每次打印警告）
+- 改造后: 创建 AsyncClient 时通过 headers= 设置一次
+
+使用 httpx.MockTransport 返回固定响应，不产生网络 I/O，只统计客户端侧的开销。
+请求参数与 FastMCP.from_openapi 生成的工具一致（params + headers）。
+
+用法:
+    python benchmarks/bench_client_headers.py [--requests 20000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+
+import httpx
+
+BASE_URL = "https://jsearch.p.rapidapi.com"
+RAPIDAPI_HOST = "jsearch.p.rapidapi.com"
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"status": "OK", "data": []})
+
+
+def make_patched_client(api_key: str) -> httpx.AsyncClient:
+    """改造前的模板: 替换 client.request，逐次添加 headers"""
+    client = httpx.AsyncClient(base_url=BASE_URL, timeout=30.0, transport=httpx.MockTransport(handler))
+    original_request = client.request
+
+    async def add_rapidapi_headers(method, url, **kwargs):
+        if 'headers' not in kwargs:
+            kwargs['headers'] = {}
+        if api_key:
+            kwargs['headers']['X-RapidAPI-Key'] = api_key
+            kwargs['headers']['X-RapidAPI-Host'] = RAPIDAPI_HOST
+        else:
+            print("⚠️  警告: API_KEY 未设置，请求可能失败")
+        if method.upper() in ['POST', 'PUT', 'PATCH']:
+            if 'Content-Type' not in kwargs['headers']:
+                kwargs['headers']['Content-Type'] = 'application/json'
+        return await original_request(method, url, **kwargs)
+
+    client.request = add_rapidapi_headers
+    return client
+
+
+def make_static_client(api_key: str) -> httpx.AsyncClient:
+    """改造后的模板: 创建客户端时设置一次 headers"""
+    default_headers = {}
+    if api_key:
+        default_headers["X-RapidAPI-Key"] = api_key
+        default_headers["X-RapidAPI-Host"] = RAPIDAPI_HOST
+    return httpx.AsyncClient(
+        base_url=BASE_URL, timeout=30.0, headers=default_headers, transport=httpx.MockTransport(handler)
+    )
+
+
+async def run_requests(client: httpx.AsyncClient, requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        response = await client.request(
+            method="GET", url="/search", params={"query": f"python developer {i % 10}", "page": 1}, headers={}
+        )
+        response.json()
+    return time.perf_counter() - start
+
+
+def bench(factory, api_key: str, requests: int, repeat: int) -> float:
+    """返回多次运行中的最短单次请求耗时（秒）"""
+    async def main():
+        async with factory(api_key) as client:
+            # 预热
+            await run_requests(client, min(requests, 100))
+            return min([await run_requests(client, requests) for _ in range(repeat)])
+
+    # 未设置 API_KEY 时改造前的模板每次请求打印警告，输出丢弃但计入耗时
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return asyncio.run(main()) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="请求头设置方式基准")
+    parser.add_argument("--requests", type=int, default=20000, help="每轮请求数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数（取最短耗时）")
+    args = parser.parse_args()
+
+    print(f"📊 每轮 {args.requests} 个请求（MockTransport），取 {args.repeat} 轮最短耗时")
+    for api_key, label in [("test-key", "已设置 API_KEY"), ("", "未设置 API_KEY")]:
+        before = bench(make_patched_client, api_key, args.requests, args.repeat)
+        after = bench(make_static_client, api_key, args.requests, args.repeat)
+        print(f"   {label}:")
+        print(f"      替换 client.request   {before * 1e6:7.1f} µs/请求")
+        print(f"      客户端静态 headers    {after * 1e6:7.1f} µs/请求  ({before / after:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+模型构造基准 - 对比 pydantic 校验构造与 build_* 快速构造的耗时
+
+用法:
+    python benchmarks/bench_models.py [--endpoints 10000] [--params 3] [--repeat 5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from api_to_mcp.models import (  # noqa: E402
+    APISpec, APIEndpoint, APIParameter, build_spec, build_endpoint, build_parameter,
+)
+
+
+def make_raw(endpoints: int, params: int):
+    """生成解析器产出形态的原始字段"""
+    raw = []
+    for i in range(endpoints):
+        raw.append({
+            "path": f"/v1/resource{i}/{{id}}",
+            "method": "GET",
+            "summary": f"Get resource {i}",
+            "description": f"Returns resource {i} by id",
+            "operation_id": f"get_resource_{i}",
+            "responses": {"200": {"description": "OK"}},
+            "tags": ["resources"],
+            "parameters": [
+                {
+                    "name": f"param{j}",
+                    "type": "string",
+                    "description": f"Parameter {j}",
+                    "required": j == 0,
+                    "default": None,
+                    "enum": None,
+                }
+                for j in range(params)
+            ],
+        })
+    return raw
+
+
+def construct_validated(raw):
+    endpoints = [
+        APIEndpoint(**{**item, "parameters": [APIParameter(**param) for param in item["parameters"]]})
+        for item in raw
+    ]
+    return APISpec(title="Bench", version="1.0.0", endpoints=endpoints)
+
+
+def construct_model_construct(raw):
+    endpoints = [
+        APIEndpoint.model_construct(
+            **{**item, "parameters": [APIParameter.model_construct(**param) for param in item["parameters"]]}
+        )
+        for item in raw
+    ]
+    return APISpec.model_construct(title="Bench", version="1.0.0", endpoints=endpoints)
+
+
+def construct_trusted(raw):
+    endpoints = [
+        build_endpoint(**{**item, "parameters": [build_parameter(**param) for param in item["parameters"]]})
+        for item in raw
+    ]
+    return build_spec(title="Bench", version="1.0.0", endpoints=endpoints)
+
+
+def bench(func, raw, repeat: int) -> float:
+    """返回多次运行中的最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(raw)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模型构造基准")
+    parser.add_argument("--endpoints", type=int, default=10000, help="端点数量")
+    parser.add_argument("--params", type=int, default=3, help="每个端点的参数数量")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数（取最短耗时）")
+    args = parser.parse_args()
+
+    raw = make_raw(args.endpoints, args.params)
+
+    # 快速构造的结果必须与校验构造完全一致
+    assert construct_trusted(raw).model_dump() == construct_validated(raw).model_dump()
+
+    print(f"📊 {args.endpoints} 个端点 × {args.params} 个参数，取 {args.repeat} 次最短耗时")
+    baseline = None
+    for label, func in [
+        ("pydantic 校验构造", construct_validated),
+        ("model_construct", construct_model_construct),
+        ("build_* 快速构造", construct_trusted),
+    ]:
+        seconds = bench(func, raw, args.repeat)
+        baseline = baseline or seconds
+        per_10k = seconds / args.endpoints * 10000
+        print(f"   {label:<18} {seconds * 1000:8.1f} ms  ({per_10k * 1000:.1f} ms / 10k 端点, {baseline / seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
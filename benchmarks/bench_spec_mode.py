@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+规范存放方式启动基准 - 对比各 spec_mode（inline / sidecar）下 server.py 的导入耗时
+
+对同一个规范按每种模式分别生成服务器，在子进程中多次导入 server.py，只统计模块自身
+（编译/读取/解析规范 + FastMCP.from_openapi）的耗时，fastmcp 与 httpx 的导入不计入。
+冷启动会先删除 __pycache__，热启动复用已编译的字节码。"仅规范"一列把
+FastMCP.from_openapi 替换为空操作，单独体现规范加载本身的差异。
+
+用法:
+    python benchmarks/bench_spec_mode.py SPEC_FILE [--runs 5] [--python /path/to/python]
+
+--python 指定安装了 fastmcp 的解释器（默认当前解释器）。
+"""
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from api_to_mcp.parsers import OpenAPIParser  # noqa: E402
+from api_to_mcp.generator import MCPGenerator, ServerOptions  # noqa: E402
+from api_to_mcp.generator.mcp_generator import SPEC_MODES  # noqa: E402
+
+IMPORT_SNIPPET = """
+import sys, time
+import fastmcp, httpx
+if sys.argv[2] == "spec-only":
+    fastmcp.FastMCP.from_openapi = classmethod(lambda cls, *args, **kwargs: None)
+sys.path.insert(0, sys.argv[1])
+start = time.perf_counter()
+import server
+print(time.perf_counter() - start)
+"""
+
+
+def time_import(python: str, server_dir: Path, cold: bool, spec_only: bool = False) -> float:
+    """在子进程中导入 server.py，返回模块耗时（秒）"""
+    if cold:
+        shutil.rmtree(server_dir / "__pycache__", ignore_errors=True)
+    completed = subprocess.run(
+        [python, "-c", IMPORT_SNIPPET, str(server_dir), "spec-only" if spec_only else "full"],
+        capture_output=True, text=True, check=True, cwd=server_dir
+    )
+    return float(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="spec_mode 启动基准")
+    parser.add_argument("spec_file", help="OpenAPI/Swagger 规范文件")
+    parser.add_argument("--runs", type=int, default=5, help="每种模式的导入次数")
+    parser.add_argument("--python", default=sys.executable, help="安装了 fastmcp 的 Python 解释器")
+    args = parser.parse_args()
+
+    api_spec = OpenAPIParser().parse_file(args.spec_file)
+    print(f"📋 {api_spec.title}: {len(api_spec.endpoints)} 个端点，每种模式导入 {args.runs} 次")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = []
+        for mode in SPEC_MODES:
+            generator = MCPGenerator(output_dir=str(Path(tmp) / mode))
+            server = generator.generate(api_spec, custom_name="bench", options=ServerOptions(spec_mode=mode))
+            server_dir = Path(server.output_path)
+
+            size = sum(
+                (server_dir / name).stat().st_size
+                for name in ("server.py", "openapi.json") if (server_dir / name).exists()
+            )
+            cold = [time_import(args.python, server_dir, cold=True) for _ in range(args.runs)]
+            warm = [time_import(args.python, server_dir, cold=False) for _ in range(args.runs)]
+            spec_cold = [time_import(args.python, server_dir, cold=True, spec_only=True) for _ in range(args.runs)]
+            spec_warm = [time_import(args.python, server_dir, cold=False, spec_only=True) for _ in range(args.runs)]
+            rows.append((mode, size, *map(statistics.median, (cold, warm, spec_cold, spec_warm))))
+
+    print()
+    print("   各列均为中位数；仅规范 = 不执行 FastMCP.from_openapi")
+    print(f"   {'模式':<8} {'规范体积':>10} {'冷启动':>10} {'热启动':>10} {'仅规范冷':>10} {'仅规范热':>10}")
+    for mode, size, *timings in rows:
+        cells = " ".join(f"{seconds * 1000:>7.1f} ms" for seconds in timings)
+        print(f"   {mode:<8} {size / 1024:>7.0f} KB {cells}")
+
+
+if __name__ == "__main__":
+    main()
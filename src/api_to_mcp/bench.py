@@ -0,0 +1,271 @@
+"""
+MCP 服务器启动基准模块
+"""
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from . import __version__
+
+
+# 子进程中导入 server.py 并强制以 stdio 启动：绕过 main() 中写到 stdout 的启动提示，
+# sse / streamable-http 服务器也能按同样的方式测量。导入耗时写到 stderr 的标记行
+LAUNCH_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import server
+sys.stderr.write("{marker} %f\\n" % (time.perf_counter() - start))
+sys.stderr.flush()
+server.mcp.run(transport="stdio")
+"""
+
+IMPORT_MARKER = "__api_to_mcp_import__"
+
+IMPORTTIME_SNIPPET = """
+import sys
+sys.path.insert(0, sys.argv[1])
+import server
+"""
+
+# MCP 协议版本（initialize 请求使用）
+PROTOCOL_VERSION = "2025-06-18"
+
+# 单条 JSON-RPC 消息的读取上限，上千个工具的 tools/list 响应可达数 MB
+STREAM_LIMIT = 256 * 1024 * 1024
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """线性插值计算百分位数"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _format_ms(seconds: Optional[float], width: int = 8) -> str:
+    """秒数格式化为毫秒，缺失时显示 n/a"""
+    if seconds is None:
+        return f"{'n/a':>{width}}   "
+    return f"{seconds * 1000:>{width}.1f} ms"
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """
+    解析 -X importtime 的输出
+
+    Returns:
+        [{"module", "self_us", "cumulative_us"}]，按自身耗时降序
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            # 表头行
+            continue
+        entries.append({
+            "module": parts[2].strip(),
+            "self_us": self_us,
+            "cumulative_us": cumulative_us,
+        })
+    entries.sort(key=lambda entry: entry["self_us"], reverse=True)
+    return entries
+
+
+class StartupBenchmark:
+    """
+    MCP 服务器启动基准
+
+    与 MCPTester 一样在子进程中运行生成的 server.py，每次测量：
+    - 导入耗时：import server（含 fastmcp 导入和 FastMCP.from_openapi）
+    - 首个 tools/list 耗时：从启动进程到通过 stdio 完成 initialize 并收到 tools/list 响应
+    """
+
+    def __init__(self, server_path: Path, python: Optional[str] = None, timeout: float = 60):
+        self.server_path = Path(server_path).resolve()
+        self.server_file = self.server_path / "server.py"
+        self.python = python or sys.executable
+        self.timeout = timeout
+
+    def measure_once(self) -> Dict[str, Any]:
+        """启动一次服务器，返回 {"import", "tools_list", "tools"}（秒 / 工具数）"""
+        try:
+            return asyncio.run(asyncio.wait_for(self._measure_once(), self.timeout))
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"服务器在 {self.timeout:g} 秒内未响应 tools/list")
+
+    async def _measure_once(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(
+            self.python, "-c", LAUNCH_SNIPPET.format(marker=IMPORT_MARKER), str(self.server_path),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.server_path,
+            limit=STREAM_LIMIT,
+        )
+        stderr_task = asyncio.ensure_future(proc.stderr.read())
+
+        try:
+            try:
+                await self._request(proc, 1, "initialize", {
+                    "protocolVersion": PROTOCOL_VERSION,
+                    "capabilities": {},
+                    "clientInfo": {"name": "api-to-mcp-bench", "version": __version__},
+                })
+                self._send(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+                response = await self._request(proc, 2, "tools/list", {})
+                tools_list = time.perf_counter() - start
+            finally:
+                # 关闭 stdin 后 stdio 服务器会自行退出
+                proc.stdin.close()
+                try:
+                    await asyncio.wait_for(proc.wait(), 5)
+                except asyncio.TimeoutError:
+                    proc.kill()
+                    await proc.wait()
+        except EOFError as e:
+            # stderr 由 stderr_task 读取，进程退出后从中取出错误信息
+            stderr = (await stderr_task).decode("utf-8", errors="replace")
+            raise RuntimeError(f"服务器在 {e} 响应前退出:\n{stderr[-2000:]}") from None
+
+        stderr = (await stderr_task).decode("utf-8", errors="replace")
+        import_seconds = None
+        for line in stderr.splitlines():
+            if line.startswith(IMPORT_MARKER):
+                import_seconds = float(line.split()[1])
+                break
+
+        return {
+            "import": import_seconds,
+            "tools_list": tools_list,
+            "tools": len(response.get("tools", [])),
+        }
+
+    def _send(self, proc, message: Dict[str, Any]):
+        proc.stdin.write(json.dumps(message).encode("utf-8") + b"\n")
+
+    async def _request(self, proc, request_id: int, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """发送 JSON-RPC 请求并等待对应 id 的响应，跳过通知和非 JSON 行"""
+        self._send(proc, {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        await proc.stdin.drain()
+
+        while True:
+            line = await proc.stdout.readline()
+            if not line:
+                raise EOFError(method)
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(message, dict) or message.get("id") != request_id:
+                continue
+            if "error" in message:
+                raise RuntimeError(f"{method} 返回错误: {message['error']}")
+            return message.get("result", {})
+
+    def import_profile(self) -> Tuple[List[Dict[str, Any]], float]:
+        """
+        以 -X importtime 导入一次 server.py
+
+        Returns:
+            (按自身耗时降序的模块列表, server 模块的累计耗时秒数)
+        """
+        proc = subprocess.run(
+            [self.python, "-X", "importtime", "-c", IMPORTTIME_SNIPPET, str(self.server_path)],
+            capture_output=True,
+            text=True,
+            timeout=self.timeout,
+            cwd=self.server_path,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"导入失败:\n{proc.stderr[-2000:]}")
+
+        entries = parse_importtime(proc.stderr)
+        server_total = next(
+            (entry["cumulative_us"] for entry in entries if entry["module"] == "server"), 0
+        )
+        return entries, server_total / 1e6
+
+    def run(self, runs: int = 10, warmup: int = 1, top: int = 10) -> Dict[str, Any]:
+        """运行基准并打印报告"""
+        if runs < 1:
+            raise ValueError("runs 必须大于 0")
+        print(f"⏱️ 启动基准: {self.server_path.name}")
+        print(f"   解释器: {self.python}")
+        print(f"   预热 {warmup} 次，测量 {runs} 次")
+        print("=" * 60)
+
+        if not self.server_file.exists():
+            raise FileNotFoundError(f"服务器文件不存在: {self.server_file}")
+
+        # 预热：生成 __pycache__，避免第一次测量包含字节码编译
+        for _ in range(warmup):
+            self.measure_once()
+
+        samples = []
+        for index in range(runs):
+            sample = self.measure_once()
+            samples.append(sample)
+            print(
+                f"   #{index + 1:<3} 导入 {_format_ms(sample['import'])}   "
+                f"首个 tools/list {_format_ms(sample['tools_list'])}   ({sample['tools']} 个工具)"
+            )
+
+        # 服务器没有输出导入耗时标记（如 server.py 自行改写了 stderr）时只统计 tools/list
+        imports = [sample["import"] for sample in samples if sample["import"] is not None]
+        tools_lists = [sample["tools_list"] for sample in samples]
+
+        print("=" * 60)
+        print(f"   {'指标':<16} {'p50':>10} {'p95':>10} {'最小':>10} {'最大':>10}")
+        for label, values in [("导入 server.py", imports), ("首个 tools/list", tools_lists)]:
+            if not values:
+                print(f"   {label:<16} {'无数据':>10}")
+                continue
+            cells = " ".join(
+                _format_ms(seconds, 7)
+                for seconds in (percentile(values, 50), percentile(values, 95), min(values), max(values))
+            )
+            print(f"   {label:<16} {cells}")
+
+        entries, server_total = self.import_profile()
+        print()
+        print(f"🐢 -X importtime 自身耗时前 {top} 的模块（import server 累计 {server_total * 1000:.1f} ms）:")
+        for entry in entries[:top]:
+            print(
+                f"   {entry['self_us'] / 1000:8.1f} ms  (累计 {entry['cumulative_us'] / 1000:8.1f} ms)  "
+                f"{entry['module']}"
+            )
+
+        return {
+            "server_path": str(self.server_path),
+            "runs": runs,
+            "tools": samples[-1]["tools"] if samples else 0,
+            "import": {
+                "p50": percentile(imports, 50) if imports else None,
+                "p95": percentile(imports, 95) if imports else None,
+                "samples": imports,
+            },
+            "tools_list": {"p50": percentile(tools_lists, 50), "p95": percentile(tools_lists, 95), "samples": tools_lists},
+            "importtime_top": entries[:top],
+        }
+
+
+def bench_startup(server_path: str, runs: int = 10, warmup: int = 1, top: int = 10,
+                  python: Optional[str] = None, timeout: float = 60) -> Dict[str, Any]:
+    """测量 MCP 服务器启动耗时"""
+    benchmark = StartupBenchmark(Path(server_path), python=python, timeout=timeout)
+    return benchmark.run(runs=runs, warmup=warmup, top=top)
@@ -2,22 +2,126 @@
 命令行接口
 """
 import click
+import functools
 import json
 import sys
+import time
+import tracemalloc
 from pathlib import Path
 from typing import Optional
 
-from .config import AzureOpenAIConfig, RapidAPIConfig, MCPGeneratorConfig
-from .parsers import OpenAPIParser
+from .config import AzureOpenAIConfig, RapidAPIConfig, MCPGeneratorConfig, HTTPClientProfile
+from .models import APISpec
+from .manifest import GenerationManifest
+from .parsers import OpenAPIParser, SpecCache
+from .parsers.loader import load_spec_file, loader_name, JSON_SUFFIXES, YAML_SUFFIXES
 from .platforms import RapidAPISpecFetcher
 from .enhancer import DescriptionEnhancer
-from .generator import MCPGenerator
+from .enhance_cache import EnhancementCache
+from .generator import MCPGenerator, ServerOptions
+from .generator.mcp_generator import SPEC_MODES
 from .tester import test_mcp_server
+from .bench import bench_startup as run_bench_startup
 from .publisher import publish_mcp_server
 from .platforms.rapidapi_helper import RapidAPIHelper
 from .platforms.rapidapi_auto import auto_extract_rapidapi
 
 
+def _enhance_spec(
+    api_spec: APISpec,
+    use_cache: bool,
+    concurrency: Optional[int],
+    batch_size: int,
+    manifest: Optional[GenerationManifest]
+) -> APISpec:
+    """使用 LLM 增强描述（可选启用磁盘缓存，结束后关闭缓存数据库）"""
+    cache = None
+    try:
+        if use_cache:
+            cache = EnhancementCache()
+            click.echo(f"💾 增强缓存: {cache.path}")
+        return DescriptionEnhancer(cache=cache).enhance_api_spec(
+            api_spec, concurrency=concurrency, batch_size=batch_size, manifest=manifest
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def _create_parser(use_cache: bool) -> OpenAPIParser:
+    """创建规范解析器（可选启用解析结果缓存）"""
+    return OpenAPIParser(cache=SpecCache() if use_cache else None)
+
+
+def _echo_spec_cache_hit(parser: OpenAPIParser):
+    """解析命中缓存时输出提示"""
+    if parser.cache is not None and parser.cache.hits:
+        click.echo(f"⚡ 命中解析缓存: {parser.cache.path}")
+
+
+# 直接对应 ServerOptions 字段的选项
+SERVER_OPTION_NAMES = [
+    'spec_mode', 'lazy_tools', 'cache_ttl', 'coalesce_requests', 'rate_limit', 'response_projection', 'metrics',
+]
+
+# HTTP 客户端配置选项 -> HTTPClientProfile 字段
+CLIENT_PROFILE_OPTIONS = {
+    'max_connections': 'max_connections',
+    'max_keepalive': 'max_keepalive_connections',
+    'http2': 'http2',
+    'connect_timeout': 'connect_timeout',
+    'read_timeout': 'read_timeout',
+}
+
+
+def server_options(func):
+    """
+    生成服务器代码的共用选项，合并为 ServerOptions 以 options 参数传给命令
+    
+    HTTP 客户端相关选项会合并为 client_profile（HTTPClientProfile）；只要指定了
+    --client-profile 或其中任一选项，就以 HTTPClientProfile.from_env() 为基础覆盖对应字段。
+    """
+    @functools.wraps(func)
+    def wrapper(*args, client_profile: bool, **kwargs):
+        overrides = {
+            field: kwargs.pop(option)
+            for option, field in CLIENT_PROFILE_OPTIONS.items()
+        }
+        overrides = {field: value for field, value in overrides.items() if value is not None}
+        profile = None
+        if client_profile or overrides:
+            profile = HTTPClientProfile(**{**vars(HTTPClientProfile.from_env()), **overrides})
+        try:
+            options = ServerOptions(
+                client_profile=profile,
+                **{name: kwargs.pop(name) for name in SERVER_OPTION_NAMES}
+            )
+            options.check_transport(kwargs['transport'])
+        except ValueError as e:
+            click.echo(f"❌ 错误: {e}", err=True)
+            raise click.Abort()
+        return func(*args, options=options, **kwargs)
+    
+    options = [
+        click.option('--spec-mode', default='inline', type=click.Choice(SPEC_MODES), help='OpenAPI 规范的存放方式：inline 嵌入 server.py / sidecar 写入紧凑的 openapi.json（启动更快）'),
+        click.option('--lazy-tools', is_flag=True, default=False, help='生成延迟注册工具的服务器：启动时不解析 OpenAPI，只注册预先计算的工具定义，首次调用时才构建请求'),
+        click.option('--cache-ttl', type=click.FloatRange(min=0), default=0, help='为生成的服务器启用 GET 响应缓存（TTL 秒数，0 表示不启用；操作上的 x-cache-ttl 扩展优先）'),
+        click.option('--coalesce-requests', is_flag=True, default=False, help='在生成的服务器中合并并发的相同 GET/HEAD 上游请求（single-flight）'),
+        click.option('--rate-limit', type=click.FloatRange(min=0), default=0, help='RapidAPI 服务器默认的每秒请求数上限（0 表示不限制，运行时可用 RATE_LIMIT_PER_SECOND 覆盖）'),
+        click.option('--response-projection', is_flag=True, default=False, help='为工具添加 fields / max_items / max_bytes 参数，在返回前裁剪上游响应（需要 --lazy-tools；安装 ijson 时流式解析大响应）'),
+        click.option('--metrics', is_flag=True, default=False, help='在 /metrics 路由上输出 Prometheus 指标：按工具统计的调用次数、延迟直方图、上游状态码与收发字节数（需要 sse 或 streamable-http）'),
+        click.option('--client-profile', is_flag=True, default=False, help='为生成的 httpx 客户端渲染连接池/HTTP/2/超时配置（默认值读取 API_TO_MCP_HTTP_* 环境变量，运行时可用 HTTP_* 环境变量覆盖）'),
+        click.option('--max-connections', type=click.IntRange(min=1), default=None, help='HTTP 客户端最大连接数（隐含 --client-profile）'),
+        click.option('--max-keepalive', type=click.IntRange(min=0), default=None, help='HTTP 客户端最大空闲 keep-alive 连接数（隐含 --client-profile）'),
+        click.option('--http2/--no-http2', default=None, help='HTTP 客户端是否启用 HTTP/2，依赖 httpx[http2]（隐含 --client-profile）'),
+        click.option('--connect-timeout', type=float, default=None, help='HTTP 连接超时秒数（隐含 --client-profile）'),
+        click.option('--read-timeout', type=float, default=None, help='HTTP 读取超时秒数（隐含 --client-profile）'),
+    ]
+    for option in reversed(options):
+        wrapper = option(wrapper)
+    return wrapper
+
+
 @click.group()
 @click.version_option(version="0.1.0")
 def cli():
@@ -29,10 +133,17 @@ def cli():
 @click.argument('input_file', type=click.Path(exists=True))
 @click.option('--output-dir', '-o', default='generated_mcps', help='输出目录')
 @click.option('--enhance/--no-enhance', default=True, help='是否使用 LLM 增强描述')
+@click.option('--enhance-concurrency', type=int, help='LLM 增强的最大并发请求数（默认读取 AZURE_OPENAI_MAX_CONCURRENCY）')
+@click.option('--enhance-batch-size', default=1, type=int, help='每次 LLM 请求打包的端点数量（大于 1 时启用批量提示词）')
+@click.option('--enhance-cache/--no-enhance-cache', default=False, help='缓存 LLM 增强结果，未变化的端点不再重复调用（路径见 API_TO_MCP_ENHANCE_CACHE）')
+@click.option('--incremental/--full', default=False, help='增量生成：复用未变化端点的增强结果并跳过未变化的文件（默认 --full 全部重新生成）')
 @click.option('--platform', '-p', default='openapi', type=click.Choice(['openapi', 'swagger', 'rapidapi']), help='API 平台类型')
 @click.option('--transport', '-t', default='stdio', type=click.Choice(['stdio', 'sse', 'streamable-http']), help='MCP 传输协议')
 @click.option('--name', '-n', help='自定义 MCP 服务器名称（默认从 API 标题生成）')
-def convert(input_file: str, output_dir: str, enhance: bool, platform: str, transport: str, name: Optional[str]):
+@click.option('--stream', is_flag=True, help='流式解析和生成（适用于上万个操作的超大规范，不支持 LLM 增强）')
+@click.option('--spec-cache/--no-spec-cache', default=False, help='缓存解析结果，文件内容未变时跳过解析（写入 API_TO_MCP_SPEC_CACHE，默认 ~/.cache/api-to-mcp/specs）')
+@server_options
+def convert(input_file: str, output_dir: str, enhance: bool, enhance_concurrency: Optional[int], enhance_batch_size: int, enhance_cache: bool, incremental: bool, platform: str, transport: str, name: Optional[str], stream: bool, spec_cache: bool, options: ServerOptions):
     """
     从文件转换 API 到 MCP 服务器
     
@@ -43,24 +154,37 @@ def convert(input_file: str, output_dir: str, enhance: bool, platform: str, tran
     click.echo(f"🚀 开始转换: {input_file}")
     click.echo(f"📦 平台类型: {platform}")
     
+    if stream:
+        if platform == 'rapidapi':
+            click.echo("❌ 错误: --stream 不支持 rapidapi 平台", err=True)
+            raise click.Abort()
+        if enhance:
+            click.echo("⚠️  流式模式不支持 LLM 增强，已跳过")
+        _convert_stream(input_file, output_dir, incremental, transport, name, options)
+        return
+    
     try:
         # 解析 API 规范
         click.echo("📖 解析 API 规范...")
+        parser = _create_parser(spec_cache)
         if platform == 'rapidapi':
-            fetcher = RapidAPISpecFetcher()
+            fetcher = RapidAPISpecFetcher(parser=parser)
             api_spec = fetcher.fetch_from_file(input_file)
         else:
-            parser = OpenAPIParser()
             api_spec = parser.parse_file(input_file)
         
+        _echo_spec_cache_hit(parser)
         click.echo(f"✅ 解析成功: {api_spec.title} v{api_spec.version}")
         click.echo(f"   端点数量: {len(api_spec.endpoints)}")
         
+        # 增量模式下复用上次生成的清单
+        generator = MCPGenerator(output_dir=output_dir)
+        manifest = generator.load_manifest(api_spec, custom_name=name) if incremental else None
+        
         # 增强描述
         if enhance:
             click.echo("🤖 使用 LLM 增强描述...")
-            enhancer = DescriptionEnhancer()
-            api_spec = enhancer.enhance_api_spec(api_spec)
+            api_spec = _enhance_spec(api_spec, enhance_cache, enhance_concurrency, enhance_batch_size, manifest)
             click.echo("✅ 描述增强完成")
         
         # 生成 MCP 服务器
@@ -68,8 +192,10 @@ def convert(input_file: str, output_dir: str, enhance: bool, platform: str, tran
         click.echo(f"📡 传输协议: {transport}")
         if name:
             click.echo(f"📝 自定义名称: {name}")
-        generator = MCPGenerator(output_dir=output_dir)
-        mcp_server = generator.generate(api_spec, transport=transport, custom_name=name)
+        mcp_server = generator.generate(
+            api_spec, transport=transport, custom_name=name,
+            manifest=manifest, incremental=incremental, options=options
+        )
         
         click.echo(f"✅ 生成完成!")
         click.echo(f"📁 输出目录: {mcp_server.output_path}")
@@ -86,15 +212,54 @@ def convert(input_file: str, output_dir: str, enhance: bool, platform: str, tran
         raise click.Abort()
 
 
+def _convert_stream(input_file: str, output_dir: str, incremental: bool, transport: str, name: Optional[str], options: ServerOptions):
+    """流式转换: 边解析端点边生成，不构建完整的端点和工具列表"""
+    try:
+        click.echo("📖 解析 API 规范（流式）...")
+        path = Path(input_file)
+        spec_data = load_spec_file(path)
+        parser = OpenAPIParser()
+        api_spec = parser.parse_info(spec_data, base_path=path)
+        click.echo(f"✅ 解析成功: {api_spec.title} v{api_spec.version}")
+        
+        click.echo("🔨 生成 MCP 服务器代码...")
+        click.echo(f"📡 传输协议: {transport}")
+        if name:
+            click.echo(f"📝 自定义名称: {name}")
+        generator = MCPGenerator(output_dir=output_dir)
+        mcp_server = generator.generate_stream(
+            api_spec, parser.iter_endpoints(spec_data, base_path=path),
+            transport=transport, custom_name=name, incremental=incremental, options=options
+        )
+        
+        click.echo(f"✅ 生成完成!")
+        click.echo(f"📁 输出目录: {mcp_server.output_path}")
+        click.echo(f"🎉 MCP 服务器: {mcp_server.name} v{mcp_server.version}")
+        click.echo(f"📡 协议: {transport}")
+        click.echo()
+        click.echo("📝 运行方法:")
+        click.echo(f"   cd {mcp_server.output_path}")
+        click.echo(f"   python server.py")
+        
+    except Exception as e:
+        click.echo(f"❌ 错误: {e}", err=True)
+        raise click.Abort()
+
+
 @cli.command()
 @click.argument('spec_url')
 @click.option('--output-dir', '-o', default='generated_mcps', help='输出目录')
 @click.option('--enhance/--no-enhance', default=True, help='是否使用 LLM 增强描述')
+@click.option('--enhance-concurrency', type=int, help='LLM 增强的最大并发请求数（默认读取 AZURE_OPENAI_MAX_CONCURRENCY）')
+@click.option('--enhance-batch-size', default=1, type=int, help='每次 LLM 请求打包的端点数量（大于 1 时启用批量提示词）')
+@click.option('--enhance-cache/--no-enhance-cache', default=False, help='缓存 LLM 增强结果，未变化的端点不再重复调用（路径见 API_TO_MCP_ENHANCE_CACHE）')
+@click.option('--incremental/--full', default=False, help='增量生成：复用未变化端点的增强结果并跳过未变化的文件（默认 --full 全部重新生成）')
 @click.option('--api-key', '-k', help='RapidAPI Key')
 @click.option('--transport', '-t', default='stdio', type=click.Choice(['stdio', 'sse', 'streamable-http']), help='MCP 传输协议')
 @click.option('--no-verify-ssl', is_flag=True, help='跳过 SSL 证书验证（不安全，仅用于测试）')
 @click.option('--name', '-n', help='自定义 MCP 服务器名称（默认从 API 标题生成）')
-def from_url(spec_url: str, output_dir: str, enhance: bool, api_key: Optional[str], transport: str, no_verify_ssl: bool, name: Optional[str]):
+@server_options
+def from_url(spec_url: str, output_dir: str, enhance: bool, enhance_concurrency: Optional[int], enhance_batch_size: int, enhance_cache: bool, incremental: bool, api_key: Optional[str], transport: str, no_verify_ssl: bool, name: Optional[str], options: ServerOptions):
     """
     从 URL 获取 OpenAPI 规范并转换为 MCP 服务器
     """
@@ -111,11 +276,14 @@ def from_url(spec_url: str, output_dir: str, enhance: bool, api_key: Optional[st
         click.echo(f"✅ 获取成功: {api_spec.title} v{api_spec.version}")
         click.echo(f"   端点数量: {len(api_spec.endpoints)}")
         
+        # 增量模式下复用上次生成的清单
+        generator = MCPGenerator(output_dir=output_dir)
+        manifest = generator.load_manifest(api_spec, custom_name=name) if incremental else None
+        
         # 增强描述
         if enhance:
             click.echo("🤖 使用 LLM 增强描述...")
-            enhancer = DescriptionEnhancer()
-            api_spec = enhancer.enhance_api_spec(api_spec)
+            api_spec = _enhance_spec(api_spec, enhance_cache, enhance_concurrency, enhance_batch_size, manifest)
             click.echo("✅ 描述增强完成")
         
         # 生成 MCP 服务器
@@ -123,8 +291,10 @@ def from_url(spec_url: str, output_dir: str, enhance: bool, api_key: Optional[st
         click.echo(f"📡 传输协议: {transport}")
         if name:
             click.echo(f"📝 自定义名称: {name}")
-        generator = MCPGenerator(output_dir=output_dir)
-        mcp_server = generator.generate(api_spec, transport=transport, custom_name=name)
+        mcp_server = generator.generate(
+            api_spec, transport=transport, custom_name=name,
+            manifest=manifest, incremental=incremental, options=options
+        )
         
         click.echo(f"✅ 生成完成!")
         click.echo(f"📁 输出目录: {mcp_server.output_path}")
@@ -141,17 +311,138 @@ def from_url(spec_url: str, output_dir: str, enhance: bool, api_key: Optional[st
         raise click.Abort()
 
 
+@cli.command()
+@click.argument('inputs', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--output-dir', '-o', default='generated_mcps', help='输出目录')
+@click.option('--workers', '-w', type=int, help='并行进程数（默认 CPU 核数，1 表示顺序执行）')
+@click.option('--platform', '-p', default='openapi', type=click.Choice(['openapi', 'swagger', 'rapidapi']), help='API 平台类型')
+@click.option('--transport', '-t', default='stdio', type=click.Choice(['stdio', 'sse', 'streamable-http']), help='MCP 传输协议')
+@click.option('--incremental/--full', default=False, help='增量生成：跳过未变化的文件（默认 --full 全部重新生成）')
+@click.option('--spec-cache/--no-spec-cache', default=False, help='缓存解析结果，文件内容未变时跳过解析（写入 API_TO_MCP_SPEC_CACHE，默认 ~/.cache/api-to-mcp/specs）')
+@server_options
+def generate_batch(inputs: tuple, output_dir: str, workers: Optional[int], platform: str, transport: str, incremental: bool, spec_cache: bool, options: ServerOptions):
+    """
+    批量转换多个规范文件（多进程并行生成，不使用 LLM 增强）
+    
+    INPUTS 可以是规范文件或目录（目录中的 .json/.yaml/.yml 文件都会被转换）
+    """
+    files = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix in JSON_SUFFIXES + YAML_SUFFIXES))
+        else:
+            files.append(path)
+    
+    if not files:
+        click.echo("❌ 没有找到规范文件", err=True)
+        raise click.Abort()
+    
+    click.echo(f"🚀 批量转换 {len(files)} 个规范文件")
+    start = time.perf_counter()
+    
+    # 解析（逐个汇总错误，不中断整批）
+    parser = _create_parser(spec_cache)
+    fetcher = RapidAPISpecFetcher(parser=parser) if platform == 'rapidapi' else None
+    specs, spec_files, errors = [], [], {}
+    for file_path in files:
+        try:
+            api_spec = fetcher.fetch_from_file(str(file_path)) if fetcher else parser.parse_file(str(file_path))
+        except Exception as e:
+            errors[str(file_path)] = f"解析失败: {e}"
+            continue
+        specs.append(api_spec)
+        spec_files.append(str(file_path))
+    
+    click.echo(f"📖 解析完成: {len(specs)}/{len(files)}")
+    if parser.cache is not None:
+        click.echo(f"   解析缓存命中: {parser.cache.hits}")
+    
+    # 生成
+    generator = MCPGenerator(output_dir=output_dir)
+    result = generator.generate_many(
+        specs, transport=transport, workers=workers, incremental=incremental, options=options
+    )
+    for index, message in result.errors.items():
+        errors[spec_files[index]] = message
+    
+    elapsed = time.perf_counter() - start
+    click.echo()
+    click.echo(f"✅ 成功: {result.succeeded}/{len(files)}")
+    for file_path, server in zip(spec_files, result.servers):
+        if server is not None:
+            click.echo(f"   • {server.name} ({len(server.tools)} 工具) ← {file_path}")
+    if errors:
+        click.echo(f"❌ 失败: {len(errors)}/{len(files)}")
+        for file_path, message in errors.items():
+            click.echo(f"   • {file_path}: {message}")
+    click.echo(f"⏱️  耗时: {elapsed:.2f} 秒")
+    
+    if errors:
+        sys.exit(1)
+
+
+def _profile_parse(parser: OpenAPIParser, input_file: str):
+    """加载并解析规范文件，返回 (api_spec, 性能报告)"""
+    path = Path(input_file)
+    
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        spec_data = load_spec_file(path)
+        loaded = time.perf_counter()
+        load_peak = tracemalloc.get_traced_memory()[1]
+        
+        tracemalloc.reset_peak()
+        api_spec = parser.parse_dict(spec_data, base_path=path)
+        parsed = time.perf_counter()
+        parse_peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    
+    report = {
+        "file_size": path.stat().st_size,
+        "loader": loader_name(path.suffix),
+        "load_seconds": loaded - start,
+        "load_peak": load_peak,
+        "parse_seconds": parsed - loaded,
+        "parse_peak": parse_peak,
+    }
+    return api_spec, report
+
+
 @cli.command()
 @click.argument('input_file', type=click.Path(exists=True))
-def validate(input_file: str):
+@click.option('--profile', is_flag=True, help='输出加载/解析耗时和峰值内存')
+@click.option('--spec-cache/--no-spec-cache', default=False, help='缓存解析结果，供随后的 convert --spec-cache 复用（默认不缓存，流式解析端点）')
+def validate(input_file: str, profile: bool, spec_cache: bool):
     """
     验证 OpenAPI/Swagger 规范文件
     """
     click.echo(f"🔍 验证 API 规范: {input_file}")
     
     try:
-        parser = OpenAPIParser()
-        api_spec = parser.parse_file(input_file)
+        parser = _create_parser(spec_cache and not profile)
+        if profile:
+            api_spec, report = _profile_parse(parser, input_file)
+            endpoints = iter(api_spec.endpoints)
+        elif spec_cache:
+            api_spec = parser.parse_file(input_file)
+            _echo_spec_cache_hit(parser)
+            endpoints = iter(api_spec.endpoints)
+        else:
+            # 流式解析端点，只保留前 10 个用于展示
+            path = Path(input_file)
+            spec_data = load_spec_file(path)
+            api_spec = parser.parse_info(spec_data, base_path=path)
+            endpoints = parser.iter_endpoints(spec_data, base_path=path)
+        
+        preview = []
+        endpoint_count = 0
+        for endpoint in endpoints:
+            if endpoint_count < 10:  # 只显示前 10 个
+                preview.append(endpoint)
+            endpoint_count += 1
         
         click.echo(f"✅ 验证成功!")
         click.echo()
@@ -161,20 +452,29 @@ def validate(input_file: str):
         if api_spec.description:
             click.echo(f"   描述: {api_spec.description[:100]}...")
         click.echo(f"   基础 URL: {api_spec.base_url or 'N/A'}")
-        click.echo(f"   端点数量: {len(api_spec.endpoints)}")
+        click.echo(f"   端点数量: {endpoint_count}")
         
         if api_spec.auth_type:
             click.echo(f"   认证类型: {api_spec.auth_type}")
         
         click.echo()
         click.echo("📍 端点列表:")
-        for endpoint in api_spec.endpoints[:10]:  # 只显示前 10 个
+        for endpoint in preview:
             click.echo(f"   {endpoint.method:6} {endpoint.path}")
             if endpoint.summary:
                 click.echo(f"          {endpoint.summary[:70]}")
         
-        if len(api_spec.endpoints) > 10:
-            click.echo(f"   ... 还有 {len(api_spec.endpoints) - 10} 个端点")
+        if endpoint_count > 10:
+            click.echo(f"   ... 还有 {endpoint_count - 10} 个端点")
+        
+        if profile:
+            mb = 1024 * 1024
+            click.echo()
+            click.echo("⏱️  性能分析（已开启 tracemalloc，耗时会略高于实际）:")
+            click.echo(f"   文件大小: {report['file_size'] / mb:.2f} MB")
+            click.echo(f"   解析器: {report['loader']}")
+            click.echo(f"   加载: {report['load_seconds']:.3f} 秒，峰值内存 {report['load_peak'] / mb:.1f} MB")
+            click.echo(f"   解析: {report['parse_seconds']:.3f} 秒，峰值内存 {report['parse_peak'] / mb:.1f} MB")
         
     except Exception as e:
         click.echo(f"❌ 验证失败: {e}", err=True)
@@ -204,6 +504,61 @@ def test(server_path: str):
         sys.exit(1)
 
 
+@cli.command()
+@click.argument('server_path', type=click.Path(exists=True, file_okay=False))
+@click.option('--runs', '-n', default=10, type=click.IntRange(min=1), help='测量次数')
+@click.option('--warmup', default=1, type=click.IntRange(min=0), help='预热次数（不计入结果）')
+@click.option('--top', default=10, type=click.IntRange(min=1), help='列出 -X importtime 中自身耗时最高的模块数')
+@click.option('--python', 'python', default=None, help='运行服务器的 Python 解释器（默认当前解释器，需已安装 fastmcp）')
+@click.option('--timeout', default=60.0, type=float, help='单次启动的超时秒数')
+@click.option('--json-output', type=click.Path(dir_okay=False), default=None, help='将结果写入 JSON 文件')
+def bench_startup(server_path: str, runs: int, warmup: int, top: int, python: Optional[str], timeout: float, json_output: Optional[str]):
+    """
+    测量生成的 MCP 服务器启动耗时
+
+    多次以 stdio 启动服务器，统计导入 server.py 和首个 tools/list 响应的 p50/p95，
+    并列出 -X importtime 中耗时最高的模块。
+    """
+    try:
+        result = run_bench_startup(server_path, runs=runs, warmup=warmup, top=top, python=python, timeout=timeout)
+    except Exception as e:
+        click.echo(f"❌ 基准测试失败: {e}", err=True)
+        sys.exit(1)
+
+    if json_output:
+        Path(json_output).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+        click.echo(f"💾 结果已写入: {json_output}")
+
+
+@cli.command()
+@click.argument('servers_dir', type=click.Path(exists=True, file_okay=False))
+@click.option('--transport', '-t', default='stdio', type=click.Choice(['stdio', 'sse', 'streamable-http']), help='传输协议')
+@click.option('--host', default='localhost', help='sse / streamable-http 的监听地址')
+@click.option('--port', default=8000, type=int, help='sse / streamable-http 的监听端口')
+@click.option('--allow-unsupported', is_flag=True, help='仍然加载启用了网关不支持的功能的服务器，并忽略这些功能')
+def serve_many(servers_dir: str, transport: str, host: str, port: int, allow_unsupported: bool):
+    """
+    在同一个进程中托管多个生成的 MCP 服务器 🌐
+
+    加载 SERVERS_DIR 下每个含 server.py 的子目录（如 generate-batch 的输出），
+    工具名加上 <目录名>_ 前缀；同一上游主机共用连接池（配置见 API_TO_MCP_HTTP_*），
+    各 API 的凭据读取 <目录名大写>_API_KEY，未设置时回退到 API_KEY。
+
+    RapidAPI 服务器的限流、429 重试和配额检查由网关按 API 执行（<目录名大写>_RATE_LIMIT_PER_SECOND
+    等，回退到 RATE_LIMIT_PER_SECOND 等）。网关不支持响应缓存、请求合并、响应裁剪和 --metrics，
+    启用这些功能的服务器默认跳过（--allow-unsupported 时加载并忽略这些功能）。
+
+    示例: api-to-mcp serve-many generated_mcps -t streamable-http --port 8000
+    """
+    try:
+        # fastmcp 导入较慢，只有这个命令需要
+        from .gateway import serve_many as run_serve_many
+        run_serve_many(servers_dir, transport=transport, host=host, port=port, allow_unsupported=allow_unsupported)
+    except Exception as e:
+        click.echo(f"❌ 网关启动失败: {e}", err=True)
+        sys.exit(1)
+
+
 @cli.command()
 @click.argument('server_path', type=click.Path(exists=True))
 @click.option('--target', '-t', default='testpypi', type=click.Choice(['testpypi', 'pypi']), help='发布目标')
@@ -242,10 +597,15 @@ def publish(server_path: str, target: str):
 @click.option('--name', '-n', help='自定义 MCP 服务器名称')
 @click.option('--no-verify-ssl', is_flag=True, help='跳过 SSL 验证')
 @click.option('--enhance/--no-enhance', default=False, help='是否使用 LLM 增强描述')
+@click.option('--enhance-concurrency', type=int, help='LLM 增强的最大并发请求数（默认读取 AZURE_OPENAI_MAX_CONCURRENCY）')
+@click.option('--enhance-batch-size', default=1, type=int, help='每次 LLM 请求打包的端点数量（大于 1 时启用批量提示词）')
+@click.option('--enhance-cache/--no-enhance-cache', default=False, help='缓存 LLM 增强结果，未变化的端点不再重复调用（路径见 API_TO_MCP_ENHANCE_CACHE）')
+@click.option('--incremental/--full', default=False, help='增量生成：复用未变化端点的增强结果并跳过未变化的文件（默认 --full 全部重新生成）')
 @click.option('--transport', '-t', default='stdio', type=click.Choice(['stdio', 'sse', 'streamable-http']), help='传输协议')
 @click.option('--use-selenium', is_flag=True, help='使用 Selenium 完整提取参数和响应（需要 selenium 和 ChromeDriver）')
 @click.option('--show-browser', is_flag=True, help='显示浏览器窗口（用于调试，默认无头模式）')
-def rapidapi(rapidapi_url: str, output_dir: str, name: Optional[str], no_verify_ssl: bool, enhance: bool, transport: str, use_selenium: bool, show_browser: bool):
+@server_options
+def rapidapi(rapidapi_url: str, output_dir: str, name: Optional[str], no_verify_ssl: bool, enhance: bool, enhance_concurrency: Optional[int], enhance_batch_size: int, enhance_cache: bool, incremental: bool, transport: str, use_selenium: bool, show_browser: bool, options: ServerOptions):
     """
     自动从 RapidAPI 提取并转换为 MCP 服务器 🚀
     
@@ -309,17 +669,22 @@ def rapidapi(rapidapi_url: str, output_dir: str, name: Optional[str], no_verify_
         click.echo(f"✅ 解析成功: {api_spec.title}")
         click.echo(f"   端点数量: {len(api_spec.endpoints)}")
         
+        # 增量模式下复用上次生成的清单
+        generator = MCPGenerator(output_dir=output_dir)
+        manifest = generator.load_manifest(api_spec, custom_name=name) if incremental else None
+        
         # 增强描述
         if enhance:
             click.echo("🤖 使用 LLM 增强描述...")
-            enhancer = DescriptionEnhancer()
-            api_spec = enhancer.enhance_api_spec(api_spec)
+            api_spec = _enhance_spec(api_spec, enhance_cache, enhance_concurrency, enhance_batch_size, manifest)
             click.echo("✅ 描述增强完成")
         
         # 生成 MCP
         click.echo("🔨 生成 MCP 服务器...")
-        generator = MCPGenerator(output_dir=output_dir)
-        mcp_server = generator.generate(api_spec, transport=transport, custom_name=name)
+        mcp_server = generator.generate(
+            api_spec, transport=transport, custom_name=name,
+            manifest=manifest, incremental=incremental, options=options
+        )
         
         click.echo()
         click.echo("🎉 完成!")
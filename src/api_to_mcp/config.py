@@ -17,11 +17,22 @@ class AzureOpenAIConfig:
     - AZURE_OPENAI_API_KEY: Azure OpenAI API 密钥
     - AZURE_OPENAI_DEPLOYMENT: 部署名称（默认：gpt-4o）
     - AZURE_OPENAI_API_VERSION: API 版本（默认：2024-02-15-preview）
+    - AZURE_OPENAI_MAX_CONCURRENCY: 最大并发请求数，大于 1 时使用异步增强（默认：1，逐个同步请求）
+    - AZURE_OPENAI_RPM: 每分钟请求数上限（默认：0，不限制）
+    - AZURE_OPENAI_TPM: 每分钟 token 数上限（默认：0，不限制）
+    - AZURE_OPENAI_MAX_RETRIES: 限流/临时错误的最大重试次数（默认：5）
     """
     endpoint: Optional[str] = None
     api_key: Optional[str] = None
     deployment_name: str = "gpt-4o"
     api_version: str = "2024-02-15-preview"
+    max_concurrency: int = 1
+    # 限流与重试（与 Azure 部署的 RPM/TPM 配额保持一致）
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    max_retries: int = 5
+    retry_backoff_base: float = 1.0
+    retry_backoff_max: float = 60.0
     
     @classmethod
     def from_env(cls) -> "AzureOpenAIConfig":
@@ -31,6 +42,89 @@ class AzureOpenAIConfig:
             api_key=os.getenv("AZURE_OPENAI_API_KEY"),
             deployment_name=os.getenv("AZURE_OPENAI_DEPLOYMENT", cls.deployment_name),
             api_version=os.getenv("AZURE_OPENAI_API_VERSION", cls.api_version),
+            max_concurrency=int(os.getenv("AZURE_OPENAI_MAX_CONCURRENCY", cls.max_concurrency)),
+            requests_per_minute=int(os.getenv("AZURE_OPENAI_RPM", cls.requests_per_minute)),
+            tokens_per_minute=int(os.getenv("AZURE_OPENAI_TPM", cls.tokens_per_minute)),
+            max_retries=int(os.getenv("AZURE_OPENAI_MAX_RETRIES", cls.max_retries)),
+        )
+
+
+@dataclass
+class EnhanceCacheConfig:
+    """描述增强缓存配置
+    
+    环境变量：
+    - API_TO_MCP_ENHANCE_CACHE: 缓存数据库路径（默认：~/.cache/api-to-mcp/enhance.sqlite3）
+    - API_TO_MCP_ENHANCE_CACHE_MAX_ENTRIES: 最大条目数（默认：50000，0 表示不限制）
+    - API_TO_MCP_ENHANCE_CACHE_MAX_AGE_DAYS: 条目最长保留天数（默认：90，0 表示不过期）
+    """
+    path: str = "~/.cache/api-to-mcp/enhance.sqlite3"
+    max_entries: int = 50000
+    max_age_days: float = 90
+    
+    @classmethod
+    def from_env(cls) -> "EnhanceCacheConfig":
+        """从环境变量加载配置"""
+        return cls(
+            path=os.getenv("API_TO_MCP_ENHANCE_CACHE", cls.path),
+            max_entries=int(os.getenv("API_TO_MCP_ENHANCE_CACHE_MAX_ENTRIES", cls.max_entries)),
+            max_age_days=float(os.getenv("API_TO_MCP_ENHANCE_CACHE_MAX_AGE_DAYS", cls.max_age_days)),
+        )
+
+
+@dataclass
+class SpecCacheConfig:
+    """解析结果缓存配置
+    
+    环境变量：
+    - API_TO_MCP_SPEC_CACHE: 缓存目录（默认：~/.cache/api-to-mcp/specs）
+    - API_TO_MCP_SPEC_CACHE_MAX_MB: 缓存目录最大容量，单位 MB（默认：256，0 表示不限制）
+    """
+    path: str = "~/.cache/api-to-mcp/specs"
+    max_mb: float = 256
+    
+    @classmethod
+    def from_env(cls) -> "SpecCacheConfig":
+        """从环境变量加载配置"""
+        return cls(
+            path=os.getenv("API_TO_MCP_SPEC_CACHE", cls.path),
+            max_mb=float(os.getenv("API_TO_MCP_SPEC_CACHE_MAX_MB", cls.max_mb)),
+        )
+
+
+@dataclass
+class HTTPClientProfile:
+    """生成的服务器中 httpx.AsyncClient 的连接池与超时配置
+    
+    渲染进 server.py 后仍可在运行时通过环境变量覆盖：
+    HTTP_MAX_CONNECTIONS、HTTP_MAX_KEEPALIVE_CONNECTIONS、HTTP_KEEPALIVE_EXPIRY、
+    HTTP2、HTTP_CONNECT_TIMEOUT、HTTP_READ_TIMEOUT
+    
+    生成时的默认值读取环境变量：
+    - API_TO_MCP_HTTP_MAX_CONNECTIONS: 最大连接数（默认：100）
+    - API_TO_MCP_HTTP_MAX_KEEPALIVE: 最大空闲 keep-alive 连接数（默认：50）
+    - API_TO_MCP_HTTP_KEEPALIVE_EXPIRY: 空闲连接保留秒数（默认：30）
+    - API_TO_MCP_HTTP2: 是否启用 HTTP/2，需要 httpx[http2]（默认：0）
+    - API_TO_MCP_HTTP_CONNECT_TIMEOUT: 连接超时秒数（默认：10）
+    - API_TO_MCP_HTTP_READ_TIMEOUT: 读取超时秒数（默认：30）
+    """
+    max_connections: int = 100
+    max_keepalive_connections: int = 50
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    connect_timeout: float = 10.0
+    read_timeout: float = 30.0
+    
+    @classmethod
+    def from_env(cls) -> "HTTPClientProfile":
+        """从环境变量加载配置"""
+        return cls(
+            max_connections=int(os.getenv("API_TO_MCP_HTTP_MAX_CONNECTIONS", cls.max_connections)),
+            max_keepalive_connections=int(os.getenv("API_TO_MCP_HTTP_MAX_KEEPALIVE", cls.max_keepalive_connections)),
+            keepalive_expiry=float(os.getenv("API_TO_MCP_HTTP_KEEPALIVE_EXPIRY", cls.keepalive_expiry)),
+            http2=os.getenv("API_TO_MCP_HTTP2", "1" if cls.http2 else "0").lower() in ("1", "true", "yes"),
+            connect_timeout=float(os.getenv("API_TO_MCP_HTTP_CONNECT_TIMEOUT", cls.connect_timeout)),
+            read_timeout=float(os.getenv("API_TO_MCP_HTTP_READ_TIMEOUT", cls.read_timeout)),
         )
 
 
@@ -0,0 +1,143 @@
+"""
+描述增强缓存 - 基于 SQLite 的内容寻址缓存
+"""
+from typing import Optional, Tuple
+from pathlib import Path
+import hashlib
+import sqlite3
+import threading
+import time
+
+from .config import EnhanceCacheConfig
+
+
+class EnhancementCache:
+    """
+    LLM 增强结果缓存
+
+    键为 (提示词 + 部署名称 + 温度) 的 SHA-256 摘要，值为解析后的
+    (enhanced_summary, enhanced_description)。端点内容不变时提示词不变，
+    重复运行即可直接命中缓存而无需再次调用 Azure OpenAI。
+
+    淘汰策略:
+    - 超过 max_age_days 的条目视为过期
+    - 条目数超过 max_entries 时按最近访问时间淘汰最旧的条目
+    """
+
+    def __init__(self, config: Optional[EnhanceCacheConfig] = None):
+        self.config = config or EnhanceCacheConfig.from_env()
+        self.path = Path(self.config.path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS enhancements (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                description TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_enhancements_accessed ON enhancements (accessed_at)"
+        )
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.closed = False
+
+        self.evict()
+
+    @staticmethod
+    def make_key(prompt: str, deployment: str, temperature: float) -> str:
+        """计算缓存键"""
+        payload = f"{deployment}\x00{temperature!r}\x00{prompt}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """读取缓存，未命中或已过期时返回 None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, description, created_at FROM enhancements WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None or self._is_expired(row[2], now):
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE enhancements SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0], row[1]
+
+    def set(self, key: str, summary: str, description: str):
+        """写入缓存"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO enhancements "
+                "(key, summary, description, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, summary, description, now, now)
+            )
+            self._conn.commit()
+
+    def evict(self) -> int:
+        """
+        执行淘汰
+
+        Returns:
+            被删除的条目数
+        """
+        removed = 0
+        with self._lock:
+            if self.config.max_age_days > 0:
+                cutoff = time.time() - self.config.max_age_days * 86400
+                cursor = self._conn.execute(
+                    "DELETE FROM enhancements WHERE created_at < ?", (cutoff,)
+                )
+                removed += cursor.rowcount
+
+            if self.config.max_entries > 0:
+                cursor = self._conn.execute(
+                    "DELETE FROM enhancements WHERE key IN ("
+                    "  SELECT key FROM enhancements ORDER BY accessed_at DESC LIMIT -1 OFFSET ?"
+                    ")",
+                    (self.config.max_entries,)
+                )
+                removed += cursor.rowcount
+
+            self._conn.commit()
+        return removed
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM enhancements").fetchone()[0]
+
+    def close(self):
+        """执行淘汰并关闭数据库连接（可重复调用）"""
+        if self.closed:
+            return
+        self.evict()
+        with self._lock:
+            self._conn.close()
+            self.closed = True
+
+    def __enter__(self) -> "EnhancementCache":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        if self.config.max_age_days <= 0:
+            return False
+        return now - created_at > self.config.max_age_days * 86400
@@ -1,23 +1,97 @@
 """
 API 描述增强模块 - 使用 Azure OpenAI 优化描述
 """
-from typing import Optional, List
-from openai import AzureOpenAI
+import asyncio
+import hashlib
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Tuple, Any
+from openai import (
+    AzureOpenAI,
+    AsyncAzureOpenAI,
+    APIConnectionError,
+    APIStatusError,
+    RateLimitError,
+)
 
 from .config import AzureOpenAIConfig
 from .models import APIEndpoint, APISpec
+from .enhance_cache import EnhancementCache
+from .rate_limiter import RateLimiter, parse_retry_after
+from .manifest import GenerationManifest, endpoint_fingerprint
+
+
+SYSTEM_PROMPT = "你是一个 API 文档专家。你的任务是为 API 端点生成清晰、准确、对 AI Agent 友好的描述。"
+
+
+@dataclass
+class EnhancerMetrics:
+    """增强器调用统计"""
+    requests: int = 0    # 实际发出的模型请求数
+    throttled: int = 0   # 被服务端限流（429）的次数
+    retried: int = 0     # 重试次数
+    fallback: int = 0    # 最终回退到原始描述的端点数
+    wait_seconds: float = 0.0  # 本地限流器累计等待时间
 
 
 class DescriptionEnhancer:
     """API 描述增强器"""
     
-    def __init__(self, config: Optional[AzureOpenAIConfig] = None):
+    # 模型调用参数
+    temperature: float = 0.3
+    max_tokens: int = 500
+    
+    def __init__(
+        self,
+        config: Optional[AzureOpenAIConfig] = None,
+        cache: Optional[EnhancementCache] = None
+    ):
+        """
+        Args:
+            config: Azure OpenAI 配置（默认从环境变量加载）
+            cache: 增强结果缓存（可选，命中时跳过模型调用）
+        """
         self.config = config or AzureOpenAIConfig.from_env()
+        self.cache = cache
+        # 重试由增强器统一处理（限流、Retry-After、退避），关闭 SDK 自带重试
         self.client = AzureOpenAI(
             api_key=self.config.api_key,
             api_version=self.config.api_version,
-            azure_endpoint=self.config.endpoint
+            azure_endpoint=self.config.endpoint,
+            max_retries=0
+        )
+        # 异步客户端在首次使用时创建
+        self._async_client: Optional[AsyncAzureOpenAI] = None
+        
+        # 同一部署的配额在进程内共享
+        self.rate_limiter = RateLimiter.shared(
+            f"{self.config.endpoint}/{self.config.deployment_name}",
+            requests_per_minute=self.config.requests_per_minute,
+            tokens_per_minute=self.config.tokens_per_minute
         )
+        self.metrics = EnhancerMetrics()
+        # 本次运行中回退到原始描述的端点，不写入清单，下次运行会重新尝试
+        self._fallback_ids = set()
+    
+    @property
+    def async_client(self) -> AsyncAzureOpenAI:
+        """异步 Azure OpenAI 客户端（惰性创建，绑定到当前事件循环）"""
+        if self._async_client is None:
+            self._async_client = AsyncAzureOpenAI(
+                api_key=self.config.api_key,
+                api_version=self.config.api_version,
+                azure_endpoint=self.config.endpoint,
+                max_retries=0
+            )
+        return self._async_client
+    
+    async def aclose(self):
+        """关闭异步客户端（事件循环结束前调用）"""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
     
     def enhance_endpoint(self, endpoint: APIEndpoint, context: str = "") -> APIEndpoint:
         """
@@ -34,59 +108,364 @@ class DescriptionEnhancer:
         # 构建提示词
         prompt = self._build_enhancement_prompt(endpoint, context)
         
+        # 命中缓存时直接使用缓存结果
+        cache_key = self._cache_key(prompt)
+        if self._apply_cached(endpoint, cache_key):
+            return endpoint
+        
         try:
-            # 调用 Azure OpenAI
-            response = self.client.chat.completions.create(
-                model=self.config.deployment_name,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "你是一个 API 文档专家。你的任务是为 API 端点生成清晰、准确、对 AI Agent 友好的描述。"
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=500
-            )
-            
-            enhanced_text = response.choices[0].message.content.strip()
-            
-            # 解析增强后的描述
-            enhanced_summary, enhanced_description = self._parse_enhanced_text(enhanced_text)
+            # 调用 Azure OpenAI（经过限流与重试）
+            response = self._create_completion(self._build_messages(prompt), self.max_tokens)
+            self._apply_enhanced_text(endpoint, response.choices[0].message.content, cache_key)
             
-            endpoint.enhanced_summary = enhanced_summary
-            endpoint.enhanced_description = enhanced_description
+        except Exception as e:
+            self._apply_fallback(endpoint, e)
+        
+        return endpoint
+    
+    async def aenhance_endpoint(self, endpoint: APIEndpoint, context: str = "") -> APIEndpoint:
+        """
+        增强单个端点的描述（异步版本）
+        
+        失败时与 enhance_endpoint 一样回退到原始描述，不会抛出异常。
+        
+        Args:
+            endpoint: API 端点
+            context: 额外的上下文信息（如 API 整体描述）
+        """
+        if not self._needs_enhancement(endpoint):
+            return endpoint
+        
+        prompt = self._build_enhancement_prompt(endpoint, context)
+        
+        cache_key = self._cache_key(prompt)
+        if self._apply_cached(endpoint, cache_key):
+            return endpoint
+        
+        try:
+            response = await self._acreate_completion(self._build_messages(prompt), self.max_tokens)
+            self._apply_enhanced_text(endpoint, response.choices[0].message.content, cache_key)
             
         except Exception as e:
-            print(f"警告: 无法增强端点 {endpoint.operation_id} 的描述: {e}")
-            # 使用原始描述
-            endpoint.enhanced_summary = endpoint.summary
-            endpoint.enhanced_description = endpoint.description
+            self._apply_fallback(endpoint, e)
         
         return endpoint
     
-    def enhance_api_spec(self, api_spec: APISpec) -> APISpec:
+    def enhance_api_spec(
+        self,
+        api_spec: APISpec,
+        concurrency: Optional[int] = None,
+        batch_size: int = 1,
+        manifest: Optional[GenerationManifest] = None
+    ) -> APISpec:
         """
         增强整个 API 规范的描述
         
+        内容相同的端点（见 endpoint_fingerprint）只请求一次，结果复制给其余重复端点。
+        
         Args:
             api_spec: API 规范
+            concurrency: 最大并发请求数（默认取配置 max_concurrency；为 1 时逐个同步请求；
+                大于 1 时在独立事件循环中并发请求，已在事件循环中调用时退回逐个同步请求，
+                此时应直接 await aenhance_api_spec）
+            batch_size: 每次请求打包的端点数量（大于 1 时使用批量提示词）
+            manifest: 上次生成的清单（可选），指纹未变的端点直接复用其中的增强结果，
+                本次结果也会写回清单
+        """
+        concurrency = concurrency or self.config.max_concurrency
+        if concurrency > 1:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(self._run_async(api_spec, concurrency, batch_size, manifest))
+            print("⚠️  当前线程已有运行中的事件循环，改为逐个同步请求（可直接 await aenhance_api_spec）")
+        
+        context = self._build_context(api_spec)
+        groups = self._group_duplicates(api_spec.endpoints)
+        endpoints = self._skip_unchanged(groups, context, manifest)
+        
+        print(f"正在增强 API 规范: {api_spec.title}")
+        print(f"端点数量: {len(api_spec.endpoints)}（去重后: {len(groups)}，待增强: {len(endpoints)}）")
+        
+        if batch_size > 1:
+            print(f"  批量模式: 每次请求 {batch_size} 个端点")
+            self.batch_enhance_endpoints(endpoints, context, batch_size)
+        else:
+            for i, endpoint in enumerate(endpoints, 1):
+                print(f"  [{i}/{len(endpoints)}] 增强端点: {endpoint.method} {endpoint.path}")
+                self.enhance_endpoint(endpoint, context)
+        
+        self._fan_out(groups)
+        self._record_manifest(groups, context, manifest)
+        self._print_stats()
+        return api_spec
+    
+    async def aenhance_api_spec(
+        self,
+        api_spec: APISpec,
+        concurrency: Optional[int] = None,
+        batch_size: int = 1,
+        manifest: Optional[GenerationManifest] = None
+    ) -> APISpec:
         """
+        并发增强整个 API 规范的描述（异步版本）
+        
+        使用信号量限制同时进行的请求数；端点在 api_spec.endpoints 中的顺序保持不变。
+        内容相同的端点只请求一次。
+        
+        Args:
+            api_spec: API 规范
+            concurrency: 最大并发请求数（默认取配置 max_concurrency）
+            batch_size: 每次请求打包的端点数量（大于 1 时使用批量提示词）
+            manifest: 上次生成的清单（可选），见 enhance_api_spec
+        """
+        concurrency = max(1, concurrency or self.config.max_concurrency)
+        context = self._build_context(api_spec)
+        groups = self._group_duplicates(api_spec.endpoints)
+        endpoints = self._skip_unchanged(groups, context, manifest)
+        total = len(endpoints)
+        
+        print(f"正在增强 API 规范: {api_spec.title}")
+        print(f"端点数量: {len(api_spec.endpoints)}（去重后: {len(groups)}，待增强: {total}，并发: {concurrency}）")
+        
+        if batch_size > 1:
+            print(f"  批量模式: 每次请求 {batch_size} 个端点")
+            await self.abatch_enhance_endpoints(endpoints, context, batch_size, concurrency)
+        else:
+            semaphore = asyncio.Semaphore(concurrency)
+            
+            async def _enhance(i: int, endpoint: APIEndpoint):
+                async with semaphore:
+                    print(f"  [{i}/{total}] 增强端点: {endpoint.method} {endpoint.path}")
+                    await self.aenhance_endpoint(endpoint, context)
+            
+            await asyncio.gather(*(
+                _enhance(i, endpoint) for i, endpoint in enumerate(endpoints, 1)
+            ))
+        
+        self._fan_out(groups)
+        self._record_manifest(groups, context, manifest)
+        self._print_stats()
+        return api_spec
+    
+    def _group_duplicates(self, endpoints: List[APIEndpoint]) -> List[List[APIEndpoint]]:
+        """按指纹分组，每组第一个端点作为代表发送给模型，组的顺序与首次出现顺序一致"""
+        groups: Dict[str, List[APIEndpoint]] = {}
+        for endpoint in endpoints:
+            groups.setdefault(endpoint_fingerprint(endpoint), []).append(endpoint)
+        return list(groups.values())
+    
+    def _skip_unchanged(
+        self,
+        groups: List[List[APIEndpoint]],
+        context: str,
+        manifest: Optional[GenerationManifest]
+    ) -> List[APIEndpoint]:
+        """用清单中的记录填充未变化的端点，返回仍需请求模型的代表端点"""
+        representatives = [group[0] for group in groups]
+        if manifest is None:
+            return representatives
+        
+        enhance_context = self._enhance_context_key(context)
+        pending = []
+        for endpoint in representatives:
+            recorded = manifest.get_enhancement(endpoint_fingerprint(endpoint), enhance_context)
+            if recorded is None:
+                pending.append(endpoint)
+                continue
+            endpoint.enhanced_summary = recorded["summary"]
+            endpoint.enhanced_description = recorded["description"]
+        return pending
+    
+    def _record_manifest(
+        self,
+        groups: List[List[APIEndpoint]],
+        context: str,
+        manifest: Optional[GenerationManifest]
+    ):
+        """将本次增强结果写回清单（由生成器在生成完成后保存）"""
+        if manifest is not None:
+            manifest.record_enhancements(
+                self._enhance_context_key(context),
+                (group[0] for group in groups if id(group[0]) not in self._fallback_ids)
+            )
+    
+    def _enhance_context_key(self, context: str) -> str:
+        """增强上下文键: API 上下文、系统提示词、部署和温度任一变化都会使清单中的结果失效"""
+        payload = f"{self.config.deployment_name}\x00{self.temperature!r}\x00{SYSTEM_PROMPT}\x00{context}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _fan_out(self, groups: List[List[APIEndpoint]]):
+        """将代表端点的增强结果复制给同组的重复端点"""
+        for representative, *duplicates in groups:
+            for endpoint in duplicates:
+                endpoint.enhanced_summary = representative.enhanced_summary
+                endpoint.enhanced_description = representative.enhanced_description
+    
+    async def _run_async(
+        self,
+        api_spec: APISpec,
+        concurrency: int,
+        batch_size: int = 1,
+        manifest: Optional[GenerationManifest] = None
+    ) -> APISpec:
+        """在独立事件循环中运行异步增强，并在结束时关闭异步客户端"""
+        try:
+            return await self.aenhance_api_spec(api_spec, concurrency, batch_size, manifest)
+        finally:
+            await self.aclose()
+    
+    def _create_completion(self, messages: List[Dict[str, str]], max_tokens: int, **kwargs: Any):
+        """发送模型请求：先经过限流器，遇到限流或临时错误时按退避策略重试"""
+        estimated_tokens = self._estimate_tokens(messages, max_tokens)
+        attempt = 0
+        while True:
+            self.metrics.wait_seconds += self.rate_limiter.acquire(estimated_tokens)
+            try:
+                self.metrics.requests += 1
+                return self.client.chat.completions.create(
+                    model=self.config.deployment_name,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    **kwargs
+                )
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+    
+    async def _acreate_completion(self, messages: List[Dict[str, str]], max_tokens: int, **kwargs: Any):
+        """发送模型请求（异步版本）"""
+        estimated_tokens = self._estimate_tokens(messages, max_tokens)
+        attempt = 0
+        while True:
+            self.metrics.wait_seconds += await self.rate_limiter.aacquire(estimated_tokens)
+            try:
+                self.metrics.requests += 1
+                return await self.async_client.chat.completions.create(
+                    model=self.config.deployment_name,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    **kwargs
+                )
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        计算重试等待时间
+        
+        可重试的错误: 429 限流、408/409/5xx、连接错误和超时。
+        等待时间取指数退避（带随机抖动）与服务端 Retry-After 中的较大值；
+        收到 Retry-After 时同时暂停共享限流器，避免其他请求继续触发限流。
+        
+        Returns:
+            等待秒数；不可重试或已达到最大重试次数时返回 None
+        """
+        retry_after = None
+        if isinstance(error, RateLimitError):
+            self.metrics.throttled += 1
+            retry_after = parse_retry_after(error.response.headers)
+        elif isinstance(error, APIStatusError):
+            if error.status_code not in (408, 409) and error.status_code < 500:
+                return None
+            retry_after = parse_retry_after(error.response.headers)
+        elif not isinstance(error, APIConnectionError):
+            return None
+        
+        if attempt >= self.config.max_retries:
+            return None
+        
+        backoff = min(self.config.retry_backoff_max, self.config.retry_backoff_base * (2 ** attempt))
+        delay = backoff * random.uniform(0.5, 1.0)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.config.retry_backoff_max))
+            self.rate_limiter.pause(delay)
+        
+        self.metrics.retried += 1
+        print(f"  ⏳ 请求失败（{type(error).__name__}），{delay:.1f} 秒后重试 [{attempt + 1}/{self.config.max_retries}]")
+        return delay
+    
+    def _estimate_tokens(self, messages: List[Dict[str, str]], max_tokens: int) -> int:
+        """粗略估算一次请求占用的 token 数（输入按每 3 个字符 1 个 token 计，加上输出上限）"""
+        return sum(len(message["content"]) for message in messages) // 3 + max_tokens
+    
+    def _print_stats(self):
+        """输出缓存命中与调用统计"""
+        if self.cache is not None:
+            print(f"缓存命中: {self.cache.hits}，未命中: {self.cache.misses}")
+        metrics = self.metrics
+        print(
+            f"模型请求: {metrics.requests}，限流: {metrics.throttled}，重试: {metrics.retried}，"
+            f"回退原始描述: {metrics.fallback}，本地限流等待: {metrics.wait_seconds:.1f} 秒"
+        )
+    
+    def _build_context(self, api_spec: APISpec) -> str:
+        """构建 API 整体上下文"""
         context = f"API 名称: {api_spec.title}\n"
         if api_spec.description:
             context += f"API 描述: {api_spec.description}\n"
+        return context
+    
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """构建对话消息"""
+        return [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def _apply_enhanced_text(
+        self, endpoint: APIEndpoint, enhanced_text: str, cache_key: Optional[str] = None
+    ):
+        """解析模型输出并写回端点（提供 cache_key 时同时写入缓存）"""
+        enhanced_summary, enhanced_description = self._parse_enhanced_text(enhanced_text.strip())
+        endpoint.enhanced_summary = enhanced_summary
+        endpoint.enhanced_description = enhanced_description
         
-        print(f"正在增强 API 规范: {api_spec.title}")
-        print(f"端点数量: {len(api_spec.endpoints)}")
+        if self.cache is not None and cache_key:
+            self.cache.set(cache_key, enhanced_summary, enhanced_description)
+    
+    def _cache_key(self, prompt: str) -> Optional[str]:
+        """计算提示词对应的缓存键（未启用缓存时返回 None）"""
+        if self.cache is None:
+            return None
+        return self.cache.make_key(
+            SYSTEM_PROMPT + "\n" + prompt, self.config.deployment_name, self.temperature
+        )
+    
+    def _apply_cached(self, endpoint: APIEndpoint, cache_key: Optional[str]) -> bool:
+        """尝试用缓存结果填充端点，命中返回 True"""
+        if self.cache is None or not cache_key:
+            return False
         
-        for i, endpoint in enumerate(api_spec.endpoints, 1):
-            print(f"  [{i}/{len(api_spec.endpoints)}] 增强端点: {endpoint.method} {endpoint.path}")
-            self.enhance_endpoint(endpoint, context)
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return False
         
-        return api_spec
+        endpoint.enhanced_summary, endpoint.enhanced_description = cached
+        return True
+    
+    def _apply_fallback(self, endpoint: APIEndpoint, error: Exception):
+        """增强失败时回退到原始描述"""
+        print(f"警告: 无法增强端点 {endpoint.operation_id} 的描述: {error}")
+        self.metrics.fallback += 1
+        self._fallback_ids.add(id(endpoint))
+        endpoint.enhanced_summary = endpoint.summary
+        endpoint.enhanced_description = endpoint.description
     
     def _needs_enhancement(self, endpoint: APIEndpoint) -> bool:
         """
@@ -180,19 +559,189 @@ DESCRIPTION: [详细描述]
         """
         批量增强端点描述
         
+        每 batch_size 个端点打包为一次请求，要求模型返回结构化 JSON，
+        再按 index 拆分回各端点；解析失败的条目回退为单端点请求。
+        
         Args:
             endpoints: 端点列表
             context: 上下文信息
-            batch_size: 每批处理的数量
+            batch_size: 每次请求打包的端点数量
         """
-        enhanced_endpoints = []
+        pending = self._collect_pending(endpoints, context)
         
-        for i in range(0, len(endpoints), batch_size):
-            batch = endpoints[i:i + batch_size]
-            for endpoint in batch:
-                enhanced_endpoint = self.enhance_endpoint(endpoint, context)
-                enhanced_endpoints.append(enhanced_endpoint)
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i:i + batch_size]
+            for endpoint in self._enhance_batch(batch, context):
+                self.enhance_endpoint(endpoint, context)
         
-        return enhanced_endpoints
+        return endpoints
+    
+    async def abatch_enhance_endpoints(
+        self,
+        endpoints: List[APIEndpoint],
+        context: str = "",
+        batch_size: int = 5,
+        concurrency: Optional[int] = None
+    ) -> List[APIEndpoint]:
+        """
+        批量增强端点描述（异步版本，多个批次并发请求）
+        
+        Args:
+            endpoints: 端点列表
+            context: 上下文信息
+            batch_size: 每次请求打包的端点数量
+            concurrency: 最大并发请求数（默认取配置 max_concurrency）
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency or self.config.max_concurrency))
+        pending = self._collect_pending(endpoints, context)
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        
+        async def _enhance(batch: List[Tuple[APIEndpoint, Optional[str]]]):
+            async with semaphore:
+                failed = await self._aenhance_batch(batch, context)
+            for endpoint in failed:
+                async with semaphore:
+                    await self.aenhance_endpoint(endpoint, context)
+        
+        await asyncio.gather(*(_enhance(batch) for batch in batches))
+        
+        return endpoints
+    
+    def _collect_pending(
+        self, endpoints: List[APIEndpoint], context: str
+    ) -> List[Tuple[APIEndpoint, Optional[str]]]:
+        """筛选需要请求模型的端点（跳过无需增强和已命中缓存的端点）"""
+        pending = []
+        for endpoint in endpoints:
+            if not self._needs_enhancement(endpoint):
+                continue
+            
+            cache_key = self._cache_key(self._build_enhancement_prompt(endpoint, context))
+            if self._apply_cached(endpoint, cache_key):
+                continue
+            
+            pending.append((endpoint, cache_key))
+        return pending
+    
+    def _enhance_batch(
+        self, batch: List[Tuple[APIEndpoint, Optional[str]]], context: str
+    ) -> List[APIEndpoint]:
+        """
+        用一次请求增强一批端点
+        
+        Returns:
+            未能从批量结果中解析出描述、需要单独请求的端点
+        """
+        if len(batch) == 1:
+            return [batch[0][0]]
+        
+        prompt = self._build_batch_prompt([endpoint for endpoint, _ in batch], context)
+        
+        try:
+            response = self._create_completion(
+                self._build_messages(prompt),
+                self.max_tokens * len(batch),
+                response_format={"type": "json_object"}
+            )
+            return self._apply_batch_result(batch, response.choices[0].message.content)
+        except Exception as e:
+            print(f"警告: 批量增强请求失败，改为逐个请求: {e}")
+            return [endpoint for endpoint, _ in batch]
+    
+    async def _aenhance_batch(
+        self, batch: List[Tuple[APIEndpoint, Optional[str]]], context: str
+    ) -> List[APIEndpoint]:
+        """用一次请求增强一批端点（异步版本）"""
+        if len(batch) == 1:
+            return [batch[0][0]]
+        
+        prompt = self._build_batch_prompt([endpoint for endpoint, _ in batch], context)
+        
+        try:
+            response = await self._acreate_completion(
+                self._build_messages(prompt),
+                self.max_tokens * len(batch),
+                response_format={"type": "json_object"}
+            )
+            return self._apply_batch_result(batch, response.choices[0].message.content)
+        except Exception as e:
+            print(f"警告: 批量增强请求失败，改为逐个请求: {e}")
+            return [endpoint for endpoint, _ in batch]
+    
+    def _build_batch_prompt(self, endpoints: List[APIEndpoint], context: str) -> str:
+        """构建多端点批量增强提示词"""
+        items = []
+        for index, endpoint in enumerate(endpoints):
+            items.append({
+                "index": index,
+                "path": endpoint.path,
+                "method": endpoint.method,
+                "operation_id": endpoint.operation_id,
+                "summary": endpoint.summary,
+                "description": endpoint.description,
+                "parameters": [
+                    {"name": param.name, "type": param.type, "description": param.description}
+                    for param in endpoint.parameters
+                ],
+                "tags": endpoint.tags,
+            })
+        
+        return f"""请为以下 {len(endpoints)} 个 API 端点分别生成清晰的描述。描述应该让 AI Agent 能够准确理解每个端点的功能和使用方法。
+
+{context}
+
+端点列表（JSON）:
+{json.dumps(items, ensure_ascii=False, indent=2)}
 
+请为每个端点生成:
+1. 一行简洁的摘要（summary）
+2. 详细的描述（description），包括：
+   - 这个端点的主要功能
+   - 适用场景
+   - 关键参数说明
+   - 返回数据说明
 
+只返回一个 JSON 对象，results 中每一项的 index 与上面端点列表中的 index 对应:
+{{"results": [{{"index": <端点 index>, "summary": "<一行摘要>", "description": "<详细描述>"}}]}}
+"""
+    
+    def _apply_batch_result(
+        self, batch: List[Tuple[APIEndpoint, Optional[str]]], content: Optional[str]
+    ) -> List[APIEndpoint]:
+        """
+        将批量结果拆分回各端点
+        
+        Returns:
+            结果缺失或格式不正确的端点
+        """
+        try:
+            results = json.loads(content or "").get("results", [])
+        except (ValueError, AttributeError):
+            results = []
+        
+        parsed: Dict[int, Tuple[str, str]] = {}
+        for item in results if isinstance(results, list) else []:
+            if not isinstance(item, dict):
+                continue
+            index, summary, description = item.get("index"), item.get("summary"), item.get("description")
+            if (
+                isinstance(index, int) and 0 <= index < len(batch)
+                and isinstance(summary, str) and summary.strip()
+                and isinstance(description, str) and description.strip()
+            ):
+                parsed[index] = (summary.strip(), description.strip())
+        
+        failed = []
+        for index, (endpoint, cache_key) in enumerate(batch):
+            if index not in parsed:
+                failed.append(endpoint)
+                continue
+            
+            endpoint.enhanced_summary, endpoint.enhanced_description = parsed[index]
+            if self.cache is not None and cache_key:
+                self.cache.set(cache_key, *parsed[index])
+        
+        if failed:
+            print(f"警告: 批量结果中 {len(failed)} 个端点解析失败，改为逐个请求")
+        
+        return failed
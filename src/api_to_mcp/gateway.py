@@ -0,0 +1,621 @@
+"""
+多 API 网关模块 - 在同一个 FastMCP 进程中托管多个生成的 MCP 服务器
+"""
+import ast
+import asyncio
+import importlib.util
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from urllib.parse import quote, urlsplit
+
+import httpx
+from fastmcp import FastMCP
+from fastmcp.server.dependencies import get_http_headers
+from fastmcp.tools.tool import Tool, ToolResult
+from pydantic import PrivateAttr
+
+from .config import HTTPClientProfile
+from .generator import MCPGenerator
+from .parsers import OpenAPIParser
+
+
+# 认证 header 模板中 API Key 的占位符
+API_KEY_PLACEHOLDER = "\x00API_KEY\x00"
+
+# 网关不实现的生成服务器功能: server.py 中定义的函数/类名 -> 功能说明
+UNSUPPORTED_FEATURES = {
+    "_cache_ttl": "响应缓存（--cache-ttl）",
+    "_fetch_coalesced": "请求合并（--coalesce-requests）",
+    "_project": "响应裁剪（--response-projection）",
+    "MetricsTransport": "Prometheus 指标（--metrics）",
+}
+
+# RapidAPI 服务器的限流设置（server.py 中以 os.getenv 读取的环境变量名）
+RAPIDAPI_SETTINGS = ("RATE_LIMIT_PER_SECOND", "RATE_LIMIT_BURST", "RETRY_429_MAX", "RETRY_429_MAX_WAIT", "QUOTA_GUARD")
+
+# 请求扩展中的键: 请求所属 API 的 RapidAPIGuard（见 GatewayTransport）
+GUARD_EXTENSION = "api_to_mcp.rapidapi_guard"
+
+
+@dataclass
+class GatewayAPI:
+    """网关中托管的单个 API（来自一个生成的服务器目录）"""
+    name: str                       # 命名空间，工具名前缀
+    base_url: str
+    tool_table: List[List[Any]]     # [名称, 描述, 输入 schema, HTTP 方法, 路径]
+    auth_headers: Dict[str, str]    # 设置了 API Key 时发送的 headers（值中含 API_KEY_PLACEHOLDER）
+    source: str                     # 工具定义的来源文件
+    auth_params: Dict[str, str] = field(default_factory=dict)   # 设置了 API Key 时发送的查询参数
+    unsupported: List[str] = field(default_factory=list)        # 网关未实现（已忽略）的功能
+    rate_limits: Dict[str, str] = field(default_factory=dict)   # RapidAPI 限流设置的默认值，为空时不限流
+
+    @property
+    def env_prefix(self) -> str:
+        """该 API 专属环境变量的前缀，如 JSEARCH"""
+        return re.sub(r"[^0-9A-Za-z]+", "_", self.name).strip("_").upper()
+
+    @property
+    def env_var(self) -> str:
+        """该 API 凭据的环境变量名，如 JSEARCH_API_KEY"""
+        return self.env_prefix + "_API_KEY"
+
+    def setting(self, name: str) -> str:
+        """RapidAPI 限流设置: <PREFIX>_<设置> 环境变量 > <设置> 环境变量 > server.py 中的默认值"""
+        return os.getenv(f"{self.env_prefix}_{name}") or os.getenv(name) or self.rate_limits[name]
+
+    def guard(self) -> Optional["RapidAPIGuard"]:
+        """按限流设置创建该 API 的 RapidAPIGuard（不是 RapidAPI 服务器时返回 None）"""
+        if not self.rate_limits:
+            return None
+        return RapidAPIGuard(
+            per_second=float(self.setting("RATE_LIMIT_PER_SECOND")),
+            burst=float(self.setting("RATE_LIMIT_BURST")),
+            retry_max=int(self.setting("RETRY_429_MAX")),
+            retry_max_wait=float(self.setting("RETRY_429_MAX_WAIT")),
+            quota_guard=self.setting("QUOTA_GUARD").lower() in ("1", "true", "yes"),
+        )
+
+    def headers(self, api_key: str) -> Dict[str, str]:
+        """渲染认证 headers（未设置 API Key 时与生成的服务器一样不发送）"""
+        if not api_key:
+            return {}
+        return {name: value.replace(API_KEY_PLACEHOLDER, api_key) for name, value in self.auth_headers.items()}
+
+    def params(self, api_key: str) -> Dict[str, str]:
+        """渲染认证查询参数（未设置 API Key 时不发送）"""
+        if not api_key:
+            return {}
+        return {name: value.replace(API_KEY_PLACEHOLDER, api_key) for name, value in self.auth_params.items()}
+
+
+def inspect_server(source: str) -> Dict[str, Any]:
+    """
+    静态分析生成的 server.py（不执行），提取网关需要的信息
+
+    Returns:
+        {"base_url", "auth_headers", "auth_params", "lazy", "openapi_spec", "tool_table", "features",
+        "rate_limits"}；openapi_spec / tool_table 只在内嵌于 server.py（inline 模式）时有值，
+        features 为 server.py 启用的、网关不实现的功能（UNSUPPORTED_FEATURES 中的说明），
+        rate_limits 为 RapidAPI 服务器的限流设置默认值（RAPIDAPI_SETTINGS -> 字符串）
+    """
+    result: Dict[str, Any] = {
+        "base_url": None,
+        "auth_headers": {},
+        "auth_params": {},
+        "lazy": False,
+        "openapi_spec": None,
+        "tool_table": None,
+        "features": [],
+        "rate_limits": {},
+    }
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            feature = UNSUPPORTED_FEATURES.get(node.name)
+            if feature and feature not in result["features"]:
+                result["features"].append(feature)
+        elif isinstance(node, ast.Call) and _call_name(node) == "AsyncClient":
+            for keyword in node.keywords:
+                if keyword.arg == "base_url" and isinstance(keyword.value, ast.Constant):
+                    result["base_url"] = keyword.value.value
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+            if isinstance(target, ast.Name) and target.id in RAPIDAPI_SETTINGS:
+                default = _getenv_default(node.value, target.id)
+                if default is not None:
+                    result["rate_limits"][target.id] = default
+            elif isinstance(target, ast.Name) and target.id == "OPENAPI_SPEC":
+                if isinstance(node.value, ast.Constant):
+                    result["openapi_spec"] = json.loads(node.value.value)
+            elif isinstance(target, ast.Name) and target.id == "TOOL_TABLE":
+                result["lazy"] = True
+                value = node.value
+                if isinstance(value, ast.Call) and _call_name(value) == "loads" and value.args \
+                        and isinstance(value.args[0], ast.Constant):
+                    result["tool_table"] = json.loads(value.args[0].value)
+            elif _is_header_target(target):
+                name = target.slice.value
+                value = _header_value(node.value)
+                # Content-Type 由 httpx 根据请求体设置
+                if value is not None and name.lower() != "content-type":
+                    result["auth_headers"][name] = value
+            elif _is_client_attribute(target, ("params", "cookies")) and isinstance(node.value, ast.Dict):
+                # in: query / in: cookie 的 API Key: client.params = {"name": API_KEY}
+                values = {
+                    key.value: _header_value(value) for key, value in zip(node.value.keys, node.value.values)
+                    if isinstance(key, ast.Constant) and _header_value(value) is not None
+                }
+                if target.attr == "params":
+                    result["auth_params"].update(values)
+                elif values:
+                    result["auth_headers"]["Cookie"] = "; ".join(f"{key}={value}" for key, value in values.items())
+    return result
+
+
+def _call_name(node: ast.Call) -> Optional[str]:
+    func = node.func
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    if isinstance(func, ast.Name):
+        return func.id
+    return None
+
+
+def _is_header_target(target: ast.AST) -> bool:
+    """default_headers["X"] = ...（以及旧模板中的 kwargs['headers']["X"] = ...）"""
+    if not (isinstance(target, ast.Subscript) and isinstance(target.slice, ast.Constant)
+            and isinstance(target.slice.value, str)):
+        return False
+    container = target.value
+    if isinstance(container, ast.Name):
+        return container.id == "default_headers"
+    return (isinstance(container, ast.Subscript) and isinstance(container.slice, ast.Constant)
+            and container.slice.value == "headers")
+
+
+def _getenv_default(node: ast.AST, name: str) -> Optional[str]:
+    """表达式中 os.getenv(name, "默认值") 的默认值"""
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call) and _call_name(child) == "getenv" and len(child.args) == 2 \
+                and all(isinstance(arg, ast.Constant) for arg in child.args) and child.args[0].value == name:
+            return str(child.args[1].value)
+    return None
+
+
+def _is_client_attribute(target: ast.AST, attrs) -> bool:
+    """client.<attr> = ..."""
+    return (isinstance(target, ast.Attribute) and target.attr in attrs
+            and isinstance(target.value, ast.Name) and target.value.id == "client")
+
+
+def _header_value(node: ast.AST) -> Optional[str]:
+    """header 值: API_KEY、字符串常量或 f"Bearer {API_KEY}"，其他表达式返回 None"""
+    if isinstance(node, ast.Name) and node.id == "API_KEY":
+        return API_KEY_PLACEHOLDER
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(str(value.value))
+            elif isinstance(value, ast.FormattedValue) and isinstance(value.value, ast.Name) \
+                    and value.value.id == "API_KEY":
+                parts.append(API_KEY_PLACEHOLDER)
+            else:
+                return None
+        return "".join(parts)
+    return None
+
+
+def load_api(server_dir: Path, name: Optional[str] = None, allow_unsupported: bool = False) -> GatewayAPI:
+    """
+    从生成的服务器目录加载 API
+
+    工具定义依次取自: 延迟注册模式的 tools.json / server.py 内嵌的工具表，
+    或 sidecar 的 openapi.json / server.py 内嵌的 OpenAPI 规范（按生成器的规则转换为工具表）。
+
+    Raises:
+        ValueError: 服务器启用了网关不实现的功能（见 UNSUPPORTED_FEATURES）且未设置
+            allow_unsupported；设置时加载并忽略这些功能，记录在 GatewayAPI.unsupported 中
+    """
+    server_dir = Path(server_dir)
+    info = inspect_server((server_dir / "server.py").read_text(encoding="utf-8"))
+    if info["features"] and not allow_unsupported:
+        raise ValueError(f"依赖网关不支持的功能: {'、'.join(info['features'])}（--allow-unsupported 可忽略这些功能加载）")
+
+    base_url = info["base_url"]
+    if info["lazy"]:
+        if info["tool_table"] is not None:
+            tool_table, source = info["tool_table"], "server.py"
+        else:
+            with open(server_dir / "tools.json", encoding="utf-8") as f:
+                tool_table, source = json.load(f), "tools.json"
+        tool_table = [_strip_projection(entry) for entry in tool_table]
+    else:
+        openapi_spec, source = info["openapi_spec"], "server.py"
+        if openapi_spec is None:
+            with open(server_dir / "openapi.json", encoding="utf-8") as f:
+                openapi_spec, source = json.load(f), "openapi.json"
+        tool_table = _tool_table_from_openapi(openapi_spec, server_dir)
+        if not base_url:
+            servers = openapi_spec.get("servers") or [{}]
+            base_url = servers[0].get("url")
+
+    if not base_url:
+        raise ValueError(f"{server_dir} 中没有找到 API 的 base_url")
+
+    return GatewayAPI(
+        name=name or server_dir.name,
+        base_url=base_url.rstrip("/"),
+        tool_table=tool_table,
+        auth_headers=info["auth_headers"],
+        source=source,
+        auth_params=info["auth_params"],
+        unsupported=info["features"],
+        rate_limits=info["rate_limits"],
+    )
+
+
+def _strip_projection(entry: List[Any]) -> List[Any]:
+    """去掉工具表条目中的响应裁剪参数（网关不实现裁剪，避免这些参数被发送给上游）"""
+    if len(entry) <= 5:
+        return entry
+    name, description, schema, method, path, projection = entry[:6]
+    properties = {
+        key: value for key, value in (schema.get("properties") or {}).items() if key not in projection
+    }
+    return [name, description, {**schema, "properties": properties}, method, path]
+
+
+def _tool_table_from_openapi(openapi_spec: Dict[str, Any], server_dir: Path) -> List[List[Any]]:
+    """
+    按生成器延迟注册模式的规则把 OpenAPI 规范转换为工具表
+
+    工具名、注册顺序和重名后缀与生成的服务器中 FastMCP.from_openapi 的结果一致
+    """
+    api_spec = OpenAPIParser().parse_dict(openapi_spec)
+    generator = MCPGenerator(output_dir=str(server_dir))
+    tools = generator._convert_endpoints_to_tools(api_spec.endpoints)
+    return generator._dedupe_tool_table([generator._tool_table_entry(tool) for tool in tools])
+
+
+def discover_apis(root: Path, allow_unsupported: bool = False) -> List[GatewayAPI]:
+    """
+    加载 root 下所有含 server.py 的子目录（即 generate-batch 的输出目录），跳过无法加载的目录
+
+    启用了网关不实现的功能的服务器默认跳过，allow_unsupported 时加载并提示被忽略的功能
+    """
+    apis = []
+    for server_dir in sorted(path.parent for path in Path(root).glob("*/server.py")):
+        try:
+            api = load_api(server_dir, allow_unsupported=allow_unsupported)
+        except (OSError, ValueError, SyntaxError) as e:
+            print(f"⚠️  跳过 {server_dir.name}: {e}", file=sys.stderr)
+            continue
+        if api.unsupported:
+            print(f"⚠️  {api.name}: 网关不支持 {'、'.join(api.unsupported)}，已忽略", file=sys.stderr)
+        apis.append(api)
+    return apis
+
+
+class RateLimiter:
+    """
+    令牌桶限流（与生成的服务器中的 RateLimiter 相同）
+
+    按 per_second 匀速补充、容量为 burst。采用"预约"方式扣减: 余量不足时余额为负，
+    调用方按返回的等待时间排队休眠而不是失败。暂停（Retry-After）期间不发放令牌:
+    暂停开始时作废已有的预约，暂停结束后桶从一个令牌开始按速率放行。
+    """
+
+    def __init__(self, per_second: float, burst: float):
+        self.rate = per_second
+        self.capacity = max(1.0, burst)
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    async def acquire(self) -> float:
+        """等待直到允许发送请求，返回实际等待的秒数"""
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            if self._paused_until > now:
+                delay = self._paused_until - now
+                await asyncio.sleep(delay)
+                waited += delay
+                continue
+            if self.rate <= 0:
+                return waited
+            self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+            self._updated = now
+            self._available -= 1
+            if self._available >= 0:
+                return waited
+            paused_until = self._paused_until
+            delay = -self._available / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+            # 等待期间开始了新的暂停时预约已作废，暂停结束后重新排队
+            if self._paused_until == paused_until:
+                return waited
+
+    def pause(self, seconds: float):
+        """在 seconds 秒内暂停所有请求（用于遵守服务端的 Retry-After）"""
+        paused_until = time.monotonic() + seconds
+        if paused_until > self._paused_until:
+            self._paused_until = paused_until
+            self._available = 1.0
+            self._updated = paused_until
+
+
+def _retry_after(headers: httpx.Headers) -> Optional[float]:
+    """从 429 响应头中解析重试等待时间（秒数或 HTTP 日期），无法解析时返回 None"""
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RapidAPIGuard:
+    """
+    单个 RapidAPI API 的限流状态（与生成的服务器中 UpstreamTransport 的 RapidAPI 部分一致）
+
+    - 令牌桶限流: 超出速率时排队等待而不是失败
+    - 429 响应按 Retry-After 暂停该 API 的所有请求后重试
+    - x-ratelimit-requests-remaining 显示月度配额用完后，在重置前直接拒绝请求
+    """
+
+    def __init__(self, per_second: float, burst: float, retry_max: int = 3,
+                 retry_max_wait: float = 60.0, quota_guard: bool = True):
+        self.limiter = RateLimiter(per_second, burst)
+        self.retry_max = retry_max
+        self.retry_max_wait = retry_max_wait
+        self.quota_guard = quota_guard
+        self._quota_blocked_until = 0.0
+        self.throttled = 0
+        self.retries = 0
+        self.quota_remaining: Optional[int] = None
+
+    async def send(self, transport: httpx.AsyncBaseTransport, request: httpx.Request) -> httpx.Response:
+        """限流后通过 transport 发送请求，429 时按 Retry-After 等待并重试"""
+        if self.quota_guard and self._quota_blocked_until > time.monotonic():
+            raise httpx.RequestError(
+                f"RapidAPI 月度配额已用完，约 {self._quota_blocked_until - time.monotonic():.0f} 秒后重置"
+                "（设置 QUOTA_GUARD=0 可关闭此检查）",
+                request=request
+            )
+
+        for attempt in range(self.retry_max + 1):
+            if await self.limiter.acquire() > 0:
+                self.throttled += 1
+            response = await transport.handle_async_request(request)
+            self._update_quota(response)
+            if response.status_code != 429 or attempt == self.retry_max:
+                return response
+
+            delay = _retry_after(response.headers)
+            if delay is None:
+                delay = 2 ** attempt
+            if delay > self.retry_max_wait:
+                return response
+            await response.aclose()
+            self.retries += 1
+            self.limiter.pause(delay)
+        return response
+
+    def _update_quota(self, response: httpx.Response):
+        remaining = response.headers.get("x-ratelimit-requests-remaining")
+        if remaining is None:
+            return
+        try:
+            self.quota_remaining = int(remaining)
+        except ValueError:
+            return
+        if self.quota_remaining <= 0:
+            try:
+                reset = float(response.headers.get("x-ratelimit-requests-reset", ""))
+            except ValueError:
+                reset = 3600.0
+            self._quota_blocked_until = time.monotonic() + reset
+
+    def stats(self) -> Dict[str, Any]:
+        """限流、重试与剩余配额统计"""
+        return {"throttled": self.throttled, "retries_429": self.retries, "quota_remaining": self.quota_remaining}
+
+
+class GatewayTransport(httpx.AsyncBaseTransport):
+    """
+    包装上游主机共用的传输层
+
+    请求扩展中带有 RapidAPIGuard（GUARD_EXTENSION）时经由该 API 的令牌桶、429 重试和
+    配额检查发送，同一主机上的各 API 共用连接池但各自限流；其他请求直接发送。
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        guard = request.extensions.get(GUARD_EXTENSION)
+        if guard is None:
+            return await self._transport.handle_async_request(request)
+        return await guard.send(self._transport, request)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class GatewayTool(Tool):
+    """网关中的单个工具，请求在调用时才构建（与生成的服务器中的 LazyAPITool 一致）"""
+
+    _route: "_Route" = PrivateAttr()
+
+    async def run(self, arguments):
+        route = self._route
+        url, params = route.build(arguments)
+        try:
+            # 与 LazyAPITool 一样转发 MCP 客户端的 HTTP headers（同名时覆盖认证 headers）
+            response = await route.client.request(
+                route.method, url, params=params, headers={**route.headers, **get_http_headers()},
+                extensions=route.extensions
+            )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            error_message = f"HTTP error {e.response.status_code}: {e.response.reason_phrase}"
+            if e.response.text:
+                error_message += f" - {e.response.text}"
+            raise ValueError(error_message)
+        except httpx.RequestError as e:
+            raise ValueError(f"Request error: {str(e)}")
+
+        try:
+            result = response.json()
+        except json.JSONDecodeError:
+            return ToolResult(content=response.text)
+        return ToolResult(structured_content=result if isinstance(result, dict) else {"result": result})
+
+
+class _Route:
+    """工具对应的上游请求"""
+
+    def __init__(self, client: httpx.AsyncClient, base_url: str, method: str, path: str, headers: Dict[str, str],
+                 params: Optional[Dict[str, str]] = None, guard: Optional[RapidAPIGuard] = None):
+        self.client = client
+        self.url = base_url + path
+        self.method = method
+        self.headers = headers
+        self.params = params or {}
+        self.extensions = {GUARD_EXTENSION: guard} if guard is not None else {}
+        self.path_params = re.findall(r"{([^{}/]+)}", path)
+
+    def build(self, arguments: Dict[str, Any]):
+        """将工具参数拆分为 (URL, 查询参数)，忽略空值；认证查询参数在前，可被同名工具参数覆盖"""
+        url = self.url
+        params = dict(self.params)
+        for name, value in arguments.items():
+            if value is None or value == "" or (isinstance(value, (list, dict)) and not value):
+                continue
+            if name in self.path_params:
+                url = url.replace("{" + name + "}", quote(str(value), safe=""))
+            else:
+                params[name] = value
+        return url, params
+
+
+class Gateway:
+    """
+    多 API 网关
+
+    把多个生成的服务器注册到同一个 FastMCP 进程中，省去每个 API 一个解释器、
+    一次 fastmcp 导入和一个连接池的开销：
+    - 工具名加上 API 命名空间前缀（<目录名>_<工具名>）
+    - 同一上游主机（scheme + host）的 API 共用一个 httpx.AsyncClient 连接池，
+      连接池配置读取 HTTPClientProfile.from_env()
+    - 各 API 的凭据读取 <NAME>_API_KEY（NAME 为大写的目录名），未设置时回退到 API_KEY；
+      认证 headers、查询参数和 cookie 的格式取自各自的 server.py
+    - RapidAPI 服务器的令牌桶限流、429 重试和配额检查由共享客户端的 GatewayTransport
+      按 API 分别执行，设置读取 <NAME>_RATE_LIMIT_PER_SECOND 等（回退到 RATE_LIMIT_PER_SECOND
+      等，再回退到 server.py 中的默认值）
+    - 与 LazyAPITool 一样转发 MCP 客户端的 HTTP headers
+
+    网关不包含生成服务器中的 UpstreamTransport 缓存/合并部分和 MetricsTransport，
+    因此不支持响应缓存（含 x-cache-ttl）、请求合并、响应裁剪和 /metrics 指标
+    （启用这些功能的服务器默认不加载，见 load_api）。
+    """
+
+    def __init__(self, apis: List[GatewayAPI], profile: Optional[HTTPClientProfile] = None,
+                 name: str = "api-to-mcp-gateway"):
+        self.apis = apis
+        self.profile = profile or HTTPClientProfile.from_env()
+        self.name = name
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        self.routes: Dict[str, _Route] = {}
+        self.guards: Dict[str, RapidAPIGuard] = {}
+
+    def client_for(self, base_url: str) -> httpx.AsyncClient:
+        """获取上游主机共用的 HTTP 客户端"""
+        parts = urlsplit(base_url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        client = self.clients.get(host)
+        if client is None:
+            profile = self.profile
+            client = self.clients[host] = httpx.AsyncClient(
+                timeout=httpx.Timeout(profile.read_timeout, connect=profile.connect_timeout),
+                # 连接池与 HTTP/2 配置在实际发起请求的传输层上生效
+                transport=GatewayTransport(httpx.AsyncHTTPTransport(
+                    limits=httpx.Limits(
+                        max_connections=profile.max_connections,
+                        max_keepalive_connections=profile.max_keepalive_connections,
+                        keepalive_expiry=profile.keepalive_expiry
+                    ),
+                    # HTTP/2 需要 h2（pip install httpx[http2]），未安装时退回 HTTP/1.1
+                    http2=profile.http2 and importlib.util.find_spec("h2") is not None,
+                )),
+            )
+        return client
+
+    def build(self) -> FastMCP:
+        """创建 FastMCP 服务器并注册所有 API 的工具"""
+        mcp = FastMCP(name=self.name)
+        for api in self.apis:
+            api_key = os.getenv(api.env_var) or os.getenv("API_KEY", "")
+            if (api.auth_headers or api.auth_params) and not api_key:
+                print(f"⚠️  {api.name}: 未设置 {api.env_var}（或 API_KEY），请求将不带认证信息", file=sys.stderr)
+            headers = api.headers(api_key)
+            params = api.params(api_key)
+            guard = api.guard()
+            if guard is not None:
+                self.guards[api.name] = guard
+            client = self.client_for(api.base_url)
+            for tool_name, description, schema, method, path in api.tool_table:
+                name = f"{api.name}_{tool_name}"
+                if name in self.routes:
+                    print(f"⚠️  工具名冲突，已跳过: {name}", file=sys.stderr)
+                    continue
+                route = self.routes[name] = _Route(client, api.base_url, method, path, headers, params, guard)
+                tool = GatewayTool(name=name, description=description, parameters=schema)
+                tool._route = route
+                mcp.add_tool(tool)
+        return mcp
+
+    async def aclose(self):
+        for client in self.clients.values():
+            await client.aclose()
+
+
+def serve_many(root: str, transport: str = "stdio", host: str = "localhost", port: int = 8000,
+               allow_unsupported: bool = False):
+    """在同一个进程中托管 root 下所有生成的 MCP 服务器"""
+    apis = discover_apis(Path(root), allow_unsupported=allow_unsupported)
+    if not apis:
+        raise ValueError(f"{root} 下没有可加载的 MCP 服务器（需要含 server.py 的子目录）")
+
+    gateway = Gateway(apis)
+    mcp = gateway.build()
+
+    # stdio 模式下 stdout 用于 MCP 协议，提示信息写到 stderr
+    print(f"🚀 网关已加载 {len(apis)} 个 API、{len(gateway.routes)} 个工具，"
+          f"{len(gateway.clients)} 个上游连接池", file=sys.stderr)
+    for api in apis:
+        guard = gateway.guards.get(api.name)
+        limit = f"，RapidAPI 限流 {guard.limiter.rate:g} 次/秒" if guard and guard.limiter.rate > 0 else ""
+        print(f"   - {api.name}: {len(api.tool_table)} 个工具（{api.source}），凭据 {api.env_var}{limit}", file=sys.stderr)
+
+    if transport == "stdio":
+        mcp.run(transport="stdio")
+    else:
+        print(f"🌐 监听地址: http://{host}:{port}", file=sys.stderr)
+        mcp.run(transport=transport, host=host, port=port)
@@ -1,8 +1,6 @@
 """
 MCP 服务器生成器模块
 """
-from .mcp_generator import MCPGenerator
-
-__all__ = ['MCPGenerator']
-
+from .mcp_generator import MCPGenerator, BatchGenerationResult, ServerOptions
 
+__all__ = ['MCPGenerator', 'BatchGenerationResult', 'ServerOptions']
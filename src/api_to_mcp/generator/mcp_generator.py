@@ -1,12 +1,103 @@
 """
 MCP 服务器代码生成器
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterable, Sequence
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader, Template
+from urllib.parse import urlsplit
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from jinja2 import Environment, DictLoader, FileSystemBytecodeCache, Template
+import hashlib
 import json
+import os
+import re
+import threading
 
+from ..config import HTTPClientProfile
 from ..models import APISpec, APIEndpoint, MCPServer, MCPTool
+from ..manifest import GenerationManifest, content_hash, write_if_changed
+
+
+# OpenAPI 规范在生成的 server.py 中的存放方式
+# - inline: 缩进 JSON 转义后嵌入字符串常量，导入时 json.loads（默认，兼容旧版本）
+# - sidecar: 紧凑 JSON 写入同目录的 openapi.json，启动时读取；server.py 只有几 KB，
+#   规范体积约减半，加载也更快（见 benchmarks/bench_spec_mode.py）
+SPEC_MODES = ['inline', 'sidecar']
+
+# FastMCP 解析 OpenAPI 路径项时遍历 HTTP 方法的顺序（决定工具注册顺序和重名后缀）
+OPENAPI_METHOD_ORDER = ['GET', 'PUT', 'POST', 'DELETE', 'OPTIONS', 'HEAD', 'PATCH', 'TRACE']
+
+# FastMCP.from_openapi 生成的工具名最大长度
+OPENAPI_TOOL_NAME_MAX = 56
+
+
+@dataclass(frozen=True)
+class ServerOptions:
+    """
+    影响生成的 server.py / pyproject.toml 的服务器选项（构造时校验并规范化类型）
+    
+    Attributes:
+        spec_mode: OpenAPI 规范的存放方式 (inline, sidecar)
+        lazy_tools: 是否生成延迟注册工具的服务器（见 MCPGenerator._render_server_template）
+        client_profile: HTTP 客户端的连接池、HTTP/2 与超时配置（默认沿用 httpx 的默认
+            连接池和 30 秒超时）
+        cache_ttl: GET 响应缓存的默认 TTL（秒），0 表示不生成缓存；操作上的
+            x-cache-ttl 扩展优先
+        coalesce_requests: 是否在生成的服务器中合并并发的相同 GET/HEAD 请求
+        rate_limit: RapidAPI 服务器默认的每秒请求数上限，0 表示不限制（只对
+            rapidapi.com 的 base_url 生效，运行时可用 RATE_LIMIT_PER_SECOND 覆盖）
+        response_projection: 是否为工具添加 fields / max_items / max_bytes 参数，
+            在返回前裁剪上游响应（需要 lazy_tools）
+        metrics: 是否在 /metrics 路由上以 Prometheus 文本格式输出按工具统计的调用次数、
+            延迟直方图、上游状态码与收发字节数（需要 sse 或 streamable-http）
+    """
+    spec_mode: str = "inline"
+    lazy_tools: bool = False
+    client_profile: Optional[HTTPClientProfile] = None
+    cache_ttl: float = 0.0
+    coalesce_requests: bool = False
+    rate_limit: float = 0.0
+    response_projection: bool = False
+    metrics: bool = False
+    
+    def __post_init__(self):
+        if self.spec_mode not in SPEC_MODES:
+            raise ValueError(f"不支持的 spec_mode: {self.spec_mode}（可选: {', '.join(SPEC_MODES)}）")
+        if self.cache_ttl < 0:
+            raise ValueError("cache_ttl 不能为负数")
+        if self.rate_limit < 0:
+            raise ValueError("rate_limit 不能为负数")
+        if self.response_projection and not self.lazy_tools:
+            raise ValueError("response_projection 需要 lazy_tools（工具参数由预先计算的工具表定义）")
+        profile = self.client_profile
+        if profile is not None:
+            if profile.max_connections < 1 or profile.max_keepalive_connections < 0:
+                raise ValueError("max_connections 必须大于 0，max_keepalive_connections 不能为负数")
+            if profile.connect_timeout <= 0 or profile.read_timeout <= 0 or profile.keepalive_expiry < 0:
+                raise ValueError("超时时间必须大于 0")
+        # 规范化类型，使渲染结果和清单中的输入哈希不随调用方传入 int / float 变化
+        for name in ("lazy_tools", "coalesce_requests", "response_projection", "metrics"):
+            object.__setattr__(self, name, bool(getattr(self, name)))
+        for name in ("cache_ttl", "rate_limit"):
+            object.__setattr__(self, name, float(getattr(self, name)))
+    
+    def check_transport(self, transport: str) -> None:
+        """校验依赖传输协议的选项"""
+        if self.metrics and transport not in ("sse", "streamable-http"):
+            raise ValueError("metrics 需要 sse 或 streamable-http 传输协议（/metrics 路由与 MCP 服务共用 HOST/PORT）")
+
+
+@dataclass
+class BatchGenerationResult:
+    """批量生成结果"""
+    # 与输入顺序一致，生成失败的位置为 None
+    servers: List[Optional[MCPServer]] = field(default_factory=list)
+    # 输入下标 -> 错误信息
+    errors: Dict[int, str] = field(default_factory=dict)
+    
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for server in self.servers if server is not None)
 
 
 class MCPGenerator:
@@ -98,7 +189,23 @@ Visit **[EMCP Platform]({self.emcp_domain})** now to start your MCP journey!
 """
         }
     
-    def generate(self, api_spec: APISpec, transport: str = "stdio", custom_name: Optional[str] = None) -> MCPServer:
+    def server_dir_for(self, api_spec: APISpec, custom_name: Optional[str] = None) -> Path:
+        """获取 API 规范对应的生成目录"""
+        return self.output_dir / self._sanitize_name(custom_name if custom_name else api_spec.title)
+    
+    def load_manifest(self, api_spec: APISpec, custom_name: Optional[str] = None) -> GenerationManifest:
+        """加载上次生成时留下的清单（不存在时返回空清单）"""
+        return GenerationManifest.load(self.server_dir_for(api_spec, custom_name))
+    
+    def generate(
+        self,
+        api_spec: APISpec,
+        transport: str = "stdio",
+        custom_name: Optional[str] = None,
+        manifest: Optional[GenerationManifest] = None,
+        incremental: bool = False,
+        options: Optional[ServerOptions] = None
+    ) -> MCPServer:
         """
         从 API 规范生成 MCP 服务器
         
@@ -106,10 +213,16 @@ Visit **[EMCP Platform]({self.emcp_domain})** now to start your MCP journey!
             api_spec: API 规范
             transport: 传输协议类型 (stdio, sse, streamable-http)
             custom_name: 自定义服务器名称（可选）
+            manifest: 生成清单（可选，通常与增强器共用；默认从输出目录加载）
+            incremental: 是否跳过渲染输入未变化的文件（默认 False，全部重新生成）
+            options: 服务器选项（可选，默认 ServerOptions()）
         
         Returns:
             生成的 MCP 服务器对象
         """
+        options = options or ServerOptions()
+        options.check_transport(transport)
+        
         # 将 API 端点转换为 MCP 工具
         mcp_tools = self._convert_endpoints_to_tools(api_spec.endpoints)
         
@@ -132,7 +245,8 @@ Visit **[EMCP Platform]({self.emcp_domain})** now to start your MCP journey!
         mcp_server.package_name = package_name
         
         # 生成代码文件
-        output_path = self._generate_server_code(mcp_server, transport)
+        manifest = self._prepare_manifest(server_name, manifest, incremental)
+        output_path = self._generate_server_code(mcp_server, transport, manifest, options=options)
         mcp_server.output_path = str(output_path)
         
         print(f"✅ MCP 服务器已生成: {output_path}")
@@ -140,6 +254,283 @@ Visit **[EMCP Platform]({self.emcp_domain})** now to start your MCP journey!
         
         return mcp_server
     
+    def generate_stream(
+        self,
+        api_spec: APISpec,
+        endpoints: Iterable[APIEndpoint],
+        transport: str = "stdio",
+        custom_name: Optional[str] = None,
+        manifest: Optional[GenerationManifest] = None,
+        incremental: bool = False,
+        options: Optional[ServerOptions] = None
+    ) -> MCPServer:
+        """
+        从端点迭代器生成 MCP 服务器（适用于上万个操作的超大规范）
+        
+        与 generate() 生成的文件完全一致，但只遍历一次端点: 每个端点转换为工具后
+        立即写入 OpenAPI 文档并只保留 README 所需的字段，不会同时持有完整的
+        APIEndpoint / MCPTool 列表。返回的 MCPServer 中 tools 为空。
+        
+        Args:
+            api_spec: 只含基本信息的 API 规范（如 OpenAPIParser.parse_info 的结果）
+            endpoints: 端点迭代器（如 OpenAPIParser.iter_endpoints 的结果）
+            transport: 传输协议类型 (stdio, sse, streamable-http)
+            custom_name: 自定义服务器名称（可选）
+            manifest: 生成清单（可选，默认从输出目录加载）
+            incremental: 是否跳过渲染输入未变化的文件（默认 False，全部重新生成）
+            options: 服务器选项（可选，默认 ServerOptions()）
+        
+        Returns:
+            生成的 MCP 服务器对象
+        """
+        options = options or ServerOptions()
+        options.check_transport(transport)
+        server_name = self._sanitize_name(custom_name if custom_name else api_spec.title)
+        package_name = f"{self.package_prefix}-{server_name}" if self.package_prefix else server_name
+        
+        mcp_server = MCPServer(
+            name=server_name,
+            version=api_spec.version,
+            description=api_spec.description or f"MCP Server for {api_spec.title}",
+            tools=[],
+            api_spec=api_spec
+        )
+        mcp_server.package_name = package_name
+        
+        # 延迟注册模式只需要工具表，不构建 OpenAPI 文档
+        lazy_tools = options.lazy_tools
+        openapi_spec = None if lazy_tools else self._openapi_skeleton(api_spec)
+        tool_table = [] if lazy_tools else None
+        readme_tools = []
+        # 只保留带 x-cache-ttl 的端点，用于生成缓存 TTL 覆盖表
+        cached_endpoints = []
+        digest = hashlib.sha256()
+        for endpoint in endpoints:
+            tool = self._endpoint_to_tool(endpoint)
+            digest.update(tool.model_dump_json().encode('utf-8'))
+            if endpoint.cache_ttl is not None:
+                cached_endpoints.append(endpoint)
+            if lazy_tools:
+                tool_table.append(self._tool_table_entry(tool, options.response_projection))
+            else:
+                self._add_openapi_operation(openapi_spec, endpoint)
+            readme_tools.append(self._readme_tool_entry(tool))
+        
+        print(f"🔧 已流式转换 {len(readme_tools)} 个工具")
+        if lazy_tools:
+            self._dedupe_tool_table(tool_table)
+        
+        manifest = self._prepare_manifest(server_name, manifest, incremental)
+        output_path = self._generate_server_code(
+            mcp_server, transport, manifest, options=options,
+            tools_digest=digest.hexdigest(), openapi_spec=openapi_spec, tool_table=tool_table,
+            readme_tools=readme_tools, cache_overrides=self._cache_overrides(api_spec, cached_endpoints)
+        )
+        mcp_server.output_path = str(output_path)
+        
+        print(f"✅ MCP 服务器已生成: {output_path}")
+        print(f"📦 PyPI 包名: {package_name}")
+        
+        return mcp_server
+    
+    def generate_many(
+        self,
+        specs: Sequence[APISpec],
+        names: Optional[Sequence[Optional[str]]] = None,
+        transport: str = "stdio",
+        workers: Optional[int] = None,
+        incremental: bool = False,
+        options: Optional[ServerOptions] = None
+    ) -> BatchGenerationResult:
+        """
+        批量生成 MCP 服务器
+        
+        生成过程是纯 CPU 计算（schema 构建、JSON 序列化、模板渲染），workers > 1 时
+        按规范分发到进程池并行执行。单个规范失败不影响其他规范，错误按输入下标汇总。
+        
+        Args:
+            specs: API 规范列表
+            names: 与 specs 对应的自定义服务器名称（可选）
+            transport: 传输协议类型 (stdio, sse, streamable-http)
+            workers: 工作进程数（默认 CPU 核数，1 表示在当前进程中顺序执行）
+            incremental: 是否跳过渲染输入未变化的文件（默认 False）
+            options: 服务器选项（可选，默认 ServerOptions()）
+        
+        Returns:
+            BatchGenerationResult，servers 与输入顺序一致
+        """
+        options = options or ServerOptions()
+        options.check_transport(transport)
+        names = list(names) if names is not None else [None] * len(specs)
+        if len(names) != len(specs):
+            raise ValueError("names 的数量必须与 specs 一致")
+        
+        result = BatchGenerationResult(servers=[None] * len(specs))
+        
+        # 输出到同一目录的规范无法并行生成，只保留第一个
+        jobs = []
+        seen_dirs = set()
+        for index, (api_spec, name) in enumerate(zip(specs, names)):
+            server_dir = self.server_dir_for(api_spec, name)
+            if server_dir in seen_dirs:
+                result.errors[index] = f"输出目录已被前面的规范占用: {server_dir}"
+                continue
+            seen_dirs.add(server_dir)
+            jobs.append((index, api_spec, name))
+        
+        generator_options = {
+            "output_dir": str(self.output_dir),
+            "package_prefix": self.package_prefix,
+            "emcp_promotion": self.emcp_promotion,
+            "emcp_domain": self.emcp_domain,
+        }
+        
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(jobs) <= 1:
+            for index, api_spec, name in jobs:
+                try:
+                    result.servers[index] = self.generate(
+                        api_spec, transport=transport, custom_name=name, incremental=incremental,
+                        options=options
+                    )
+                except Exception as e:
+                    result.errors[index] = str(e)
+            return result
+        
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            futures = [
+                (index, executor.submit(
+                    _generate_in_worker, generator_options, api_spec, transport, name, incremental,
+                    options
+                ))
+                for index, api_spec, name in jobs
+            ]
+            for index, future in futures:
+                try:
+                    result.servers[index] = future.result()
+                except Exception as e:
+                    result.errors[index] = str(e)
+        
+        return result
+    
+    def _prepare_manifest(
+        self, server_name: str, manifest: Optional[GenerationManifest], incremental: bool
+    ) -> GenerationManifest:
+        """
+        加载生成清单
+        
+        全量生成时不复用文件记录，但保留上次生成的文件名，以便删除切换
+        spec_mode / lazy_tools 后不再生成的文件
+        """
+        if manifest is None:
+            manifest = GenerationManifest.load(self.output_dir / server_name)
+        if not incremental:
+            manifest.files = {name: {} for name in manifest.files}
+        return manifest
+    
+    def _cache_overrides(self, api_spec: APISpec, endpoints: Iterable[APIEndpoint]) -> List[List[Any]]:
+        """
+        由 x-cache-ttl 扩展得到的 GET 操作 TTL 覆盖表
+        
+        Returns:
+            [[请求路径模板（含 base_url 中的路径前缀）, TTL 秒数], ...]
+        """
+        base_path = urlsplit(api_spec.base_url or "").path.rstrip("/")
+        overrides: Dict[str, float] = {}
+        for endpoint in endpoints:
+            if endpoint.cache_ttl is not None and endpoint.method.upper() == "GET":
+                overrides[base_path + endpoint.path] = endpoint.cache_ttl
+        return [[path, ttl] for path, ttl in overrides.items()]
+    
+    def _tool_table_entry(self, tool: MCPTool, response_projection: bool = False) -> List[Any]:
+        """
+        延迟注册模式下的工具表条目: [名称, 描述, 输入 schema, HTTP 方法, 路径]
+        
+        response_projection 时在输入 schema 中追加响应裁剪参数（与 API 参数重名的跳过），
+        并在条目末尾追加实际添加的参数名列表
+        """
+        entry = [
+            self._openapi_tool_name(tool.endpoint), tool.description, tool.input_schema,
+            tool.endpoint.method.upper(), tool.endpoint.path
+        ]
+        if response_projection:
+            properties = tool.input_schema.get("properties") or {}
+            added = {
+                name: schema for name, schema in self._projection_properties(tool.endpoint).items()
+                if name not in properties
+            }
+            entry[2] = {**tool.input_schema, "properties": {**properties, **added}}
+            entry.append(list(added))
+        return entry
+    
+    def _projection_properties(self, endpoint: APIEndpoint) -> Dict[str, Dict[str, Any]]:
+        """响应裁剪参数的 JSON Schema，fields 的描述中列出成功响应 schema 里的字段路径"""
+        fields_description = (
+            "Only return these fields of the JSON response, as dot paths (e.g. data.title); "
+            "arrays are traversed element-wise"
+        )
+        paths = _response_field_paths(endpoint.responses)
+        if paths:
+            fields_description += f". Available: {', '.join(paths)}"
+        return {
+            "fields": {"type": "array", "items": {"type": "string"}, "description": fields_description},
+            "max_items": {
+                "type": "integer", "minimum": 1,
+                "description": "Return at most this many elements of every array in the response"
+            },
+            "max_bytes": {
+                "type": "integer", "minimum": 1,
+                "description": "Truncate the serialized response to this many bytes"
+            },
+        }
+    
+    def _dedupe_tool_table(self, tool_table: List[List[Any]]) -> List[List[Any]]:
+        """
+        按 FastMCP.from_openapi 注册工具的方式整理工具表（原地修改）
+        
+        同一路径和方法只保留最后一个端点（OpenAPI 文档中后写入的操作覆盖前者），
+        工具按路径首次出现的顺序和路径内的方法顺序排列，重名工具追加 _2、_3 等后缀
+        """
+        path_order: Dict[str, int] = {}
+        routes: Dict[tuple, List[Any]] = {}
+        for entry in tool_table:
+            path_order.setdefault(entry[4], len(path_order))
+            routes[(entry[4], entry[3])] = entry
+        
+        def route_key(entry: List[Any]):
+            method = entry[3]
+            method_index = OPENAPI_METHOD_ORDER.index(method) if method in OPENAPI_METHOD_ORDER else len(OPENAPI_METHOD_ORDER)
+            return path_order[entry[4]], method_index
+        
+        tool_table[:] = sorted(routes.values(), key=route_key)
+        counts: Dict[str, int] = {}
+        for entry in tool_table:
+            count = counts[entry[0]] = counts.get(entry[0], 0) + 1
+            if count > 1:
+                entry[0] = f"{entry[0]}_{count}"
+        return tool_table
+    
+    def _readme_tool_entry(self, tool: MCPTool) -> Dict[str, Any]:
+        """提取 README 模板用到的工具字段"""
+        endpoint = tool.endpoint
+        return {
+            "name": tool.name,
+            "description": tool.description,
+            "endpoint": {
+                "method": endpoint.method,
+                "path": endpoint.path,
+                "parameters": [
+                    {
+                        "name": param.name,
+                        "type": param.type,
+                        "required": param.required,
+                        "description": param.description,
+                    }
+                    for param in endpoint.parameters
+                ],
+            },
+        }
+    
     def _convert_endpoints_to_tools(self, endpoints: List[APIEndpoint]) -> List[MCPTool]:
         """将 API 端点转换为 MCP 工具"""
         tools = []
@@ -235,6 +626,22 @@ Visit **[EMCP Platform]({self.emcp_domain})** now to start your MCP journey!
         
         return type_mapping.get(api_type.lower(), 'string')
     
+    def _operation_id(self, endpoint: APIEndpoint) -> str:
+        """写入 OpenAPI 文档的 operationId（端点没有时由方法和路径生成）"""
+        return endpoint.operation_id or f"{endpoint.method.lower()}_{endpoint.path.replace('/', '_')}"
+    
+    def _openapi_tool_name(self, endpoint: APIEndpoint) -> str:
+        """
+        FastMCP.from_openapi 为端点生成的工具名（不含重名后缀）
+        
+        取 operationId 中 "__" 之前的部分，空白、"-"、"." 替换为下划线，只保留字母、
+        数字和下划线（保留大小写），截断到 56 个字符
+        """
+        name = re.sub(r"[\s\-\.]+", "_", self._operation_id(endpoint).split("__")[0])
+        name = re.sub(r"[^a-zA-Z0-9_]", "", name)
+        name = re.sub(r"_+", "_", name).strip("_")
+        return name[:OPENAPI_TOOL_NAME_MAX]
+    
     def _sanitize_name(self, name: str) -> str:
         """清理名称，使其符合 Python 标识符规范"""
         # 替换非法字符
@@ -247,52 +654,179 @@ Visit **[EMCP Platform]({self.emcp_domain})** now to start your MCP journey!
         
         return name.lower()
     
-    def _generate_server_code(self, mcp_server: MCPServer, transport: str = "stdio") -> Path:
-        """生成服务器代码"""
+    def _generate_server_code(
+        self,
+        mcp_server: MCPServer,
+        transport: str = "stdio",
+        manifest: Optional[GenerationManifest] = None,
+        tools_digest: Optional[str] = None,
+        openapi_spec: Optional[Dict[str, Any]] = None,
+        readme_tools: Optional[List[Any]] = None,
+        options: Optional[ServerOptions] = None,
+        tool_table: Optional[List[List[Any]]] = None,
+        cache_overrides: Optional[List[List[Any]]] = None
+    ) -> Path:
+        """
+        生成服务器代码
+        
+        每个文件的渲染输入（服务器定义、传输协议、模板源码等）取哈希记录在清单中；
+        输入未变且磁盘内容未被修改的文件跳过渲染和写入。重新渲染后内容与磁盘上
+        一致的文件也不写入（保持 mtime 不变），其余文件通过临时文件原子替换。
+        
+        流式生成时由调用方传入工具摘要、OpenAPI 文档（延迟注册模式下为工具表）、
+        README 工具列表和缓存 TTL 覆盖表，否则从 mcp_server 计算。
+        """
         server_dir = self.output_dir / mcp_server.name
         server_dir.mkdir(parents=True, exist_ok=True)
+        if manifest is None:
+            manifest = GenerationManifest(server_dir)
+        
+        options = options or ServerOptions()
+        if tools_digest is None:
+            tools_digest = self._tools_digest(mcp_server.tools)
+        server_key = self._server_input_hash(mcp_server, transport, tools_digest, options)
+        
+        # server.py 与 openapi.json 共用同一份 OpenAPI 文档，首次使用时才构建
+        openapi_holder = [openapi_spec]
         
-        # 生成主服务器文件
-        server_file = server_dir / "server.py"
-        server_code = self._render_server_template(mcp_server, transport)
-        server_file.write_text(server_code, encoding='utf-8')
+        def get_openapi_spec() -> Dict[str, Any]:
+            if openapi_holder[0] is None:
+                openapi_holder[0] = self._api_spec_to_openapi(mcp_server.api_spec)
+            return openapi_holder[0]
         
-        # 生成 pyproject.toml
-        pyproject_file = server_dir / "pyproject.toml"
-        pyproject_code = self._render_pyproject_template(mcp_server)
-        pyproject_file.write_text(pyproject_code, encoding='utf-8')
+        # 延迟注册模式下 server.py 只需要工具表，同样只构建一次
+        table_holder = [tool_table]
         
-        # 生成 README（中文）
-        readme_file = server_dir / "README.md"
-        readme_code = self._render_readme_template(mcp_server, transport, lang='zh')
-        readme_file.write_text(readme_code, encoding='utf-8')
+        def get_tool_table() -> List[List[Any]]:
+            if table_holder[0] is None:
+                table_holder[0] = self._dedupe_tool_table([
+                    self._tool_table_entry(tool, options.response_projection) for tool in mcp_server.tools
+                ])
+            return table_holder[0]
+        
+        lazy_tools = options.lazy_tools
+        spec_data = get_tool_table if lazy_tools else get_openapi_spec
+        pyproject_key = content_hash(json.dumps(
+            [mcp_server.package_name, mcp_server.version, mcp_server.description, asdict(options)],
+            ensure_ascii=False, sort_keys=True
+        ))
+        
+        # 文件名 -> (渲染输入键, 渲染函数)
+        files = {
+            # 主服务器文件
+            "server.py": (f"server.py:{server_key}", lambda: self._render_server_template(mcp_server, transport, spec_data(), options, cache_overrides)),
+            # pyproject.toml
+            "pyproject.toml": (f"pyproject.toml:{pyproject_key}", lambda: self._render_pyproject_template(mcp_server, options)),
+            # README（中文）
+            "README.md": (f"README.md:zh:{server_key}", lambda: self._render_readme_template(mcp_server, transport, lang='zh', tools=readme_tools)),
+            # README_EN.md（英文）
+            "README_EN.md": (f"README.md:en:{server_key}", lambda: self._render_readme_template(mcp_server, transport, lang='en', tools=readme_tools)),
+            # README_ZH-TW.md（繁体中文）
+            "README_ZH-TW.md": (f"README.md:zh_tw:{server_key}", lambda: self._render_readme_template(mcp_server, transport, lang='zh_tw', tools=readme_tools)),
+            # __init__.py
+            "__init__.py": (f"__init__.py:{content_hash(mcp_server.api_spec.title)}", lambda: f'"""MCP Server for {mcp_server.api_spec.title}"""\n'),
+        }
+        if options.spec_mode == "sidecar":
+            # 紧凑格式的 OpenAPI 规范（延迟注册模式下为工具表），由 server.py 启动时读取
+            sidecar_name = "tools.json" if lazy_tools else "openapi.json"
+            files[sidecar_name] = (
+                f"{sidecar_name}:{server_key}",
+                lambda: json.dumps(spec_data(), ensure_ascii=False, separators=(',', ':'))
+            )
+        
+        written, skipped = [], []
+        for filename, (input_key, render) in files.items():
+            input_hash = content_hash(f"{_TEMPLATE_SOURCE_HASH}\x00{input_key}")
+            if manifest.is_file_current(filename, input_hash):
+                skipped.append(filename)
+                continue
+            
+            content = render()
+            if write_if_changed(server_dir / filename, content):
+                written.append(filename)
+            else:
+                skipped.append(filename)
+            manifest.record_file(filename, input_hash, content)
         
-        # 生成 README_EN.md（英文）
-        readme_en_file = server_dir / "README_EN.md"
-        readme_en_code = self._render_readme_template(mcp_server, transport, lang='en')
-        readme_en_file.write_text(readme_en_code, encoding='utf-8')
+        print(f"📝 写入 {len(written)} 个文件，跳过 {len(skipped)} 个未变化的文件")
+        if skipped:
+            print(f"⏭️  未变化，跳过: {', '.join(skipped)}")
         
-        # 生成 README_ZH-TW.md（繁体中文）
-        readme_tw_file = server_dir / "README_ZH-TW.md"
-        readme_tw_code = self._render_readme_template(mcp_server, transport, lang='zh_tw')
-        readme_tw_file.write_text(readme_tw_code, encoding='utf-8')
+        # 删除上次生成、本次不再需要的文件（如切换 spec_mode / lazy_tools 后的 openapi.json）
+        for filename in set(manifest.files) - set(files):
+            stale_path = server_dir / filename
+            if stale_path.exists():
+                stale_path.unlink()
+                print(f"🗑️  已删除不再生成的文件: {filename}")
         
-        # 生成 __init__.py
-        init_file = server_dir / "__init__.py"
-        init_file.write_text(f'"""MCP Server for {mcp_server.api_spec.title}"""\n', encoding='utf-8')
+        manifest.prune_files(list(files))
+        manifest.save()
         
         return server_dir
     
-    def _render_server_template(self, mcp_server: MCPServer, transport: str) -> str:
-        """渲染服务器模板"""
-        import json
+    def _tools_digest(self, tools: Iterable[MCPTool]) -> str:
+        """计算工具列表（含端点）的摘要，可逐个累加，流式生成时无需持有完整列表"""
+        digest = hashlib.sha256()
+        for tool in tools:
+            digest.update(tool.model_dump_json().encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _server_input_hash(
+        self, mcp_server: MCPServer, transport: str, tools_digest: str, options: ServerOptions
+    ) -> str:
+        """计算所有渲染输入的哈希（服务器定义、工具摘要、传输协议、服务器选项、包名前缀与引流话术）"""
+        payload = json.dumps({
+            "server": mcp_server.model_dump(
+                mode='json', exclude={'output_path': True, 'tools': True, 'api_spec': {'endpoints'}}
+            ),
+            "tools": tools_digest,
+            "transport": transport,
+            "options": asdict(options),
+            "emcp_promotion": self.emcp_promotion,
+        }, ensure_ascii=False, sort_keys=True, default=str)
+        return content_hash(payload)
+    
+    def _render_server_template(
+        self,
+        mcp_server: MCPServer,
+        transport: str,
+        openapi_spec: Optional[Any] = None,
+        options: Optional[ServerOptions] = None,
+        cache_overrides: Optional[List[List[Any]]] = None
+    ) -> str:
+        """
+        渲染服务器模板
+        
+        默认生成的服务器在导入时调用 FastMCP.from_openapi，为每个操作解析 OpenAPI
+        并构建请求路由，启动耗时与操作数成正比。lazy_tools 模式下 openapi_spec 为
+        工具表（_tool_table_entry），服务器只用预先计算的名称、描述和输入 schema
+        注册轻量的 Tool 子类，不导入 OpenAPI 解析相关模块；各操作的请求构建在首次
+        调用时才进行并缓存。
+        
+        cache_ttl > 0 时客户端使用 UpstreamTransport 缓存 GET 响应，
+        cache_overrides 为空时从 mcp_server.api_spec 的端点计算。
+        """
+        options = options or ServerOptions()
+        spec_mode = options.spec_mode
+        lazy_tools = options.lazy_tools
         
         # 将 API 规范转换回 OpenAPI 格式
-        openapi_spec = self._api_spec_to_openapi(mcp_server.api_spec)
-        openapi_spec_json = json.dumps(openapi_spec, ensure_ascii=False, indent=2)
+        if openapi_spec is None:
+            if lazy_tools:
+                openapi_spec = self._dedupe_tool_table([
+                    self._tool_table_entry(tool, options.response_projection) for tool in mcp_server.tools
+                ])
+            else:
+                openapi_spec = self._api_spec_to_openapi(mcp_server.api_spec)
         
-        # 转义 JSON 字符串中的引号和换行符，以便嵌入到 Python 字符串中
-        openapi_spec_json = openapi_spec_json.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        if options.cache_ttl and cache_overrides is None:
+            cache_overrides = self._cache_overrides(mcp_server.api_spec, mcp_server.api_spec.endpoints)
+        
+        openapi_spec_json = None
+        if spec_mode == "inline":
+            openapi_spec_json = json.dumps(openapi_spec, ensure_ascii=False, indent=2)
+            # 转义 JSON 字符串中的引号和换行符，以便嵌入到 Python 字符串中
+            openapi_spec_json = openapi_spec_json.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
         
         template = self.templates['server.py']
         return template.render(
@@ -300,19 +834,35 @@ Visit **[EMCP Platform]({self.emcp_domain})** now to start your MCP journey!
             api_spec=mcp_server.api_spec,
             tools=mcp_server.tools,
             transport=transport,
+            spec_mode=spec_mode,
+            lazy_tools=lazy_tools,
+            client_profile=options.client_profile,
+            cache_ttl=options.cache_ttl,
+            cache_overrides=cache_overrides or [],
+            coalesce_requests=options.coalesce_requests,
+            rate_limit=options.rate_limit,
+            response_projection=options.response_projection,
+            metrics=options.metrics,
             openapi_spec_json=openapi_spec_json
         )
     
-    def _render_pyproject_template(self, mcp_server: MCPServer) -> str:
+    def _render_pyproject_template(self, mcp_server: MCPServer, options: Optional[ServerOptions] = None) -> str:
         """渲染 pyproject.toml 模板"""
+        options = options or ServerOptions()
         template = self.templates['pyproject.toml']
         return template.render(
             server=mcp_server,
-            api_spec=mcp_server.api_spec
+            api_spec=mcp_server.api_spec,
+            lazy_tools=options.lazy_tools,
+            client_profile=options.client_profile,
+            response_projection=options.response_projection,
+            metrics=options.metrics
         )
     
-    def _render_readme_template(self, mcp_server: MCPServer, transport: str, lang: str = 'zh') -> str:
-        """渲染 README 模板"""
+    def _render_readme_template(
+        self, mcp_server: MCPServer, transport: str, lang: str = 'zh', tools: Optional[List[Any]] = None
+    ) -> str:
+        """渲染 README 模板（tools 为空时使用 mcp_server.tools）"""
         template = self.templates['README.md']
         
         # 获取 EMCP 引流话术
@@ -322,25 +872,29 @@ Visit **[EMCP Platform]({self.emcp_domain})** now to start your MCP journey!
         return template.render(
             server=mcp_server,
             api_spec=mcp_server.api_spec,
-            tools=mcp_server.tools,
+            tools=mcp_server.tools if tools is None else tools,
             transport=transport,
             lang=lang,
             emcp_promotion=emcp_promo
         )
     
     def _load_builtin_templates(self) -> Dict[str, Template]:
-        """加载内置模板"""
-        templates = {}
-        
-        # 服务器模板
-        templates['server.py'] = Template(SERVER_TEMPLATE)
-        templates['pyproject.toml'] = Template(PYPROJECT_TEMPLATE)
-        templates['README.md'] = Template(README_TEMPLATE)
-        
-        return templates
+        """加载内置模板（来自进程内共享的模板环境，每个进程只编译一次）"""
+        environment = _get_template_environment()
+        return {name: environment.get_template(name) for name in _TEMPLATE_SOURCES}
     
     def _api_spec_to_openapi(self, api_spec: APISpec) -> Dict[str, Any]:
         """将内部 API 规范转换回 OpenAPI 格式"""
+        openapi = self._openapi_skeleton(api_spec)
+        
+        # 转换端点
+        for endpoint in api_spec.endpoints:
+            self._add_openapi_operation(openapi, endpoint)
+        
+        return openapi
+    
+    def _openapi_skeleton(self, api_spec: APISpec) -> Dict[str, Any]:
+        """生成不含任何操作的 OpenAPI 文档（基本信息、服务器和安全定义）"""
         openapi = {
             "openapi": "3.0.0",
             "info": {
@@ -354,48 +908,6 @@ Visit **[EMCP Platform]({self.emcp_domain})** now to start your MCP journey!
             "paths": {}
         }
         
-        # 转换端点
-        for endpoint in api_spec.endpoints:
-            path = endpoint.path
-            if path not in openapi["paths"]:
-                openapi["paths"][path] = {}
-            
-            # 处理响应定义，移除过于严格的 type 限制
-            responses = endpoint.responses or {"200": {"description": "Success"}}
-            # 修改响应 schema，移除 type 字段以支持灵活的返回类型
-            if "200" in responses and "content" in responses["200"]:
-                content = responses["200"]["content"]
-                if "application/json" in content and "schema" in content["application/json"]:
-                    schema = content["application/json"]["schema"]
-                    # 如果 schema 只定义了 type: object，移除它以允许任意类型
-                    if schema.get("type") == "object" and len(schema) == 1:
-                        # 不指定 type，让 FastMCP 自动处理
-                        content["application/json"]["schema"] = {}
-            
-            operation = {
-                "summary": endpoint.enhanced_summary or endpoint.summary or "",
-                "description": endpoint.enhanced_description or endpoint.description or "",
-                "operationId": endpoint.operation_id or f"{endpoint.method.lower()}_{path.replace('/', '_')}",
-                "parameters": [],
-                "responses": responses
-            }
-            
-            # 添加参数
-            for param in endpoint.parameters:
-                operation["parameters"].append({
-                    "name": param.name,
-                    "in": "query",  # 简化处理，实际应该根据参数位置判断
-                    "required": param.required,
-                    "description": param.description or "",
-                    "schema": {
-                        "type": param.type,
-                        "default": param.default,
-                        "enum": param.enum
-                    }
-                })
-            
-            openapi["paths"][path][endpoint.method.lower()] = operation
-        
         # 添加安全定义
         if api_spec.auth_type:
             openapi["components"] = {
@@ -406,22 +918,98 @@ Visit **[EMCP Platform]({self.emcp_domain})** now to start your MCP journey!
             openapi["security"] = [{"ApiAuth": []}]
         
         return openapi
-
+    
+    def _add_openapi_operation(self, openapi: Dict[str, Any], endpoint: APIEndpoint):
+        """将单个端点作为操作写入 OpenAPI 文档"""
+        path = endpoint.path
+        if path not in openapi["paths"]:
+            openapi["paths"][path] = {}
+        
+        # 处理响应定义，移除过于严格的 type 限制
+        responses = endpoint.responses or {"200": {"description": "Success"}}
+        # 修改响应 schema，移除 type 字段以支持灵活的返回类型
+        if "200" in responses and "content" in responses["200"]:
+            content = responses["200"]["content"]
+            if "application/json" in content and "schema" in content["application/json"]:
+                schema = content["application/json"]["schema"]
+                # 如果 schema 只定义了 type: object，移除它以允许任意类型
+                if schema.get("type") == "object" and len(schema) == 1:
+                    # 不指定 type，让 FastMCP 自动处理
+                    content["application/json"]["schema"] = {}
+        
+        operation = {
+            "summary": endpoint.enhanced_summary or endpoint.summary or "",
+            "description": endpoint.enhanced_description or endpoint.description or "",
+            "operationId": self._operation_id(endpoint),
+            "parameters": [],
+            "responses": responses
+        }
+        if endpoint.cache_ttl is not None:
+            operation["x-cache-ttl"] = endpoint.cache_ttl
+        
+        # 添加参数
+        for param in endpoint.parameters:
+            operation["parameters"].append({
+                "name": param.name,
+                "in": "query",  # 简化处理，实际应该根据参数位置判断
+                "required": param.required,
+                "description": param.description or "",
+                "schema": {
+                    "type": param.type,
+                    "default": param.default,
+                    "enum": param.enum
+                }
+            })
+        
+        openapi["paths"][path][endpoint.method.lower()] = operation
 
 # 内置模板
 
-SERVER_TEMPLATE = '''"""
+SERVER_TEMPLATE = '''{%- set rapidapi = api_spec.base_url and 'rapidapi.com' in api_spec.base_url -%}
+{%- set auth_in = api_spec.auth_config.get('in') if api_spec.auth_type and not rapidapi else none -%}
+{%- set auth_name = api_spec.auth_config.get('name', 'api_key') -%}
+{%- set upstream_transport = cache_ttl or coalesce_requests or rapidapi -%}
+{%- set upstream_send = '_send' if rapidapi else '_transport.handle_async_request' -%}
+"""
 {{ api_spec.title }} MCP Server
 
+{% if lazy_tools -%}
+使用预先计算的工具表延迟注册工具（首次调用时才构建请求）
+{%- else -%}
 使用 FastMCP 的 from_openapi 方法自动生成
+{%- endif %}
 
 Version: {{ server.version }}
 Transport: {{ transport }}
 """
 import os
-import json
+import json{% if coalesce_requests or rapidapi %}
+import asyncio{% endif %}{% if metrics %}
+import bisect{% endif %}{% if client_profile %}
+import importlib.util{% endif %}{% if lazy_tools or cache_ttl %}
+import re{% endif %}{% if cache_ttl or rapidapi or metrics %}
+import time{% endif %}{% if cache_ttl or metrics %}
+from collections import {{ ((['OrderedDict'] if cache_ttl else []) + (['defaultdict'] if metrics else []))|join(', ') }}{% endif %}{% if metrics %}
+from contextvars import ContextVar{% endif %}{% if spec_mode == 'sidecar' %}
+from pathlib import Path{% endif %}{% if lazy_tools %}
+from urllib.parse import quote{% endif %}
 import httpx
-from fastmcp import FastMCP
+from fastmcp import FastMCP{% if lazy_tools %}
+from fastmcp.server.dependencies import get_http_headers{% endif %}{% if metrics %}
+from fastmcp.server.middleware import Middleware{% endif %}{% if lazy_tools %}
+from fastmcp.tools.tool import Tool, ToolResult{% endif %}{% if metrics %}
+from starlette.responses import PlainTextResponse{% endif %}
+{%- if response_projection %}
+
+# 可选的流式 JSON 解析器（pip install ijson）；纯 Python 后端比 json.loads 慢得多，
+# 只使用 C 后端，否则读取完整响应后再裁剪
+try:
+    import ijson
+    if not ijson.backend.startswith("yajl2"):
+        ijson = None
+except ImportError:
+    ijson = None
+{%- endif %}
 
 # 服务器版本和配置
 __version__ = "{{ server.version }}"
@@ -437,11 +1025,187 @@ PORT = int(os.getenv("PORT", "8000"))  # SSE/HTTP 服务器端口
 HOST = os.getenv("HOST", "localhost")  # SSE/HTTP 服务器主机
 {% endif %}
 
+{% if lazy_tools -%}
+# 工具表: [名称, 描述, 输入 schema, HTTP 方法, 路径{{ ', 响应裁剪参数' if response_projection }}]，生成时预先计算
+{% if spec_mode == 'sidecar' -%}
+# 紧凑格式保存在同目录的 tools.json 中，启动时读取
+with open(Path(__file__).with_name("tools.json"), encoding="utf-8") as _tools_file:
+    TOOL_TABLE = json.load(_tools_file)
+{%- else -%}
+TOOL_TABLE = json.loads("""{{ openapi_spec_json }}""")
+{%- endif %}
+{%- else -%}
 # OpenAPI 规范
+{% if spec_mode == 'sidecar' -%}
+# 紧凑格式保存在同目录的 openapi.json 中，启动时读取
+with open(Path(__file__).with_name("openapi.json"), encoding="utf-8") as _spec_file:
+    openapi_dict = json.load(_spec_file)
+{%- else -%}
 OPENAPI_SPEC = """{{ openapi_spec_json }}"""
+{%- endif %}
+{%- endif %}
+{%- if metrics %}
+
+# Prometheus 指标（/metrics 路由）: 延迟直方图的桶上限（秒）
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 当前正在执行的工具，用于把上游请求归属到工具
+_current_tool = ContextVar("current_tool", default="")
+
+
+class Histogram:
+    """固定桶的延迟直方图（各桶单独计数，输出时累加）"""
+
+    def __init__(self):
+        self.buckets = [0] * len(METRICS_LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(METRICS_LATENCY_BUCKETS, seconds)
+        if index < len(self.buckets):
+            self.buckets[index] += 1
+        self.count += 1
+        self.sum += seconds
+
+
+def _labels(**labels):
+    """Prometheus 标签（JSON 字符串的转义规则与文本格式兼容）"""
+    return "{" + ",".join(f"{name}={json.dumps(str(value), ensure_ascii=False)}" for name, value in labels.items()) + "}"
+
+
+class Metrics:
+    """
+    按工具统计的指标
+
+    - 工具调用: 次数（ok / error）与总耗时
+    - 上游请求: 次数（按状态码，连接失败等记为 error）、耗时（到响应体读取完毕）与收发字节数
+    """
+
+    def __init__(self):
+        self.tool_calls = defaultdict(int)
+        self.tool_seconds = defaultdict(Histogram)
+        self.upstream_requests = defaultdict(int)
+        self.upstream_seconds = defaultdict(Histogram)
+        self.upstream_sent_bytes = defaultdict(int)
+        self.upstream_received_bytes = defaultdict(int)
+
+    def render(self, upstream_stats=None):
+        """以 Prometheus 文本格式输出"""
+        lines = []
+
+        def family(name, kind, description):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, histograms):
+            for tool, value in sorted(histograms.items()):
+                cumulative = 0
+                for bound, count in zip(METRICS_LATENCY_BUCKETS, value.buckets):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(tool=tool, le=bound)} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(tool=tool, le='+Inf')} {value.count}")
+                lines.append(f"{name}_sum{_labels(tool=tool)} {value.sum}")
+                lines.append(f"{name}_count{_labels(tool=tool)} {value.count}")
+
+        family("mcp_tool_calls_total", "counter", "Tool calls by result")
+        for (tool, status), count in sorted(self.tool_calls.items()):
+            lines.append(f"mcp_tool_calls_total{_labels(tool=tool, status=status)} {count}")
+        family("mcp_tool_duration_seconds", "histogram", "Total tool call latency")
+        histogram("mcp_tool_duration_seconds", self.tool_seconds)
+        family("mcp_upstream_requests_total", "counter", "Upstream HTTP requests by status code")
+        for (tool, code), count in sorted(self.upstream_requests.items()):
+            lines.append(f"mcp_upstream_requests_total{_labels(tool=tool, code=code)} {count}")
+        family("mcp_upstream_duration_seconds", "histogram", "Upstream request latency until the response body is read")
+        histogram("mcp_upstream_duration_seconds", self.upstream_seconds)
+        family("mcp_upstream_sent_bytes_total", "counter", "Upstream request body bytes")
+        for tool, count in sorted(self.upstream_sent_bytes.items()):
+            lines.append(f"mcp_upstream_sent_bytes_total{_labels(tool=tool)} {count}")
+        family("mcp_upstream_received_bytes_total", "counter", "Upstream response body bytes (as received)")
+        for tool, count in sorted(self.upstream_received_bytes.items()):
+            lines.append(f"mcp_upstream_received_bytes_total{_labels(tool=tool)} {count}")
+
+        # UpstreamTransport 的缓存、请求合并与限流统计
+        for key, value in (upstream_stats or {}).items():
+            if value is None:
+                continue
+            if key in ("cache_entries", "quota_remaining"):
+                family(f"mcp_upstream_{key}", "gauge", key.replace("_", " ").capitalize())
+                lines.append(f"mcp_upstream_{key} {value}")
+            else:
+                family(f"mcp_upstream_{key}_total", "counter", key.replace("_", " ").capitalize())
+                lines.append(f"mcp_upstream_{key}_total {value}")
+        return "\\n".join(lines) + "\\n"
+
+
+METRICS = Metrics()
+
+
+class MetricsTransport(httpx.AsyncBaseTransport):
+    """包装实际发起请求的传输层，按当前工具记录上游请求的状态码、耗时与收发字节数"""
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    async def handle_async_request(self, request):
+        tool = _current_tool.get()
+        METRICS.upstream_sent_bytes[tool] += int(request.headers.get("content-length", 0))
+        start = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError:
+            METRICS.upstream_requests[tool, "error"] += 1
+            METRICS.upstream_seconds[tool].observe(time.perf_counter() - start)
+            raise
+        METRICS.upstream_requests[tool, str(response.status_code)] += 1
+        response.stream = _MeteredStream(response.stream, tool, start)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class _MeteredStream(httpx.AsyncByteStream):
+    """统计响应体字节数，关闭时记录上游耗时"""
+
+    def __init__(self, stream, tool, start):
+        self._stream = stream
+        self._tool = tool
+        self._start = start
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            METRICS.upstream_received_bytes[self._tool] += len(chunk)
+            yield chunk
+
+    async def aclose(self):
+        await self._stream.aclose()
+        if not self._closed:
+            self._closed = True
+            METRICS.upstream_seconds[self._tool].observe(time.perf_counter() - self._start)
+
+
+class MetricsMiddleware(Middleware):
+    """记录每次工具调用的结果与总耗时，并让 MetricsTransport 知道请求属于哪个工具"""
+
+    async def on_call_tool(self, context, call_next):
+        tool = context.message.name
+        token = _current_tool.set(tool)
+        start = time.perf_counter()
+        status = "error"
+        try:
+            result = await call_next(context)
+            status = "ok"
+            return result
+        finally:
+            _current_tool.reset(token)
+            METRICS.tool_calls[tool, status] += 1
+            METRICS.tool_seconds[tool].observe(time.perf_counter() - start)
+{% endif %}
 
 # 创建 HTTP 客户端
-# 设置默认 headers
+# 默认 headers 在创建客户端时设置一次，请求时不再逐次合并
 default_headers = {}
 
 {% if api_spec.base_url and 'rapidapi.com' in api_spec.base_url %}
@@ -454,62 +1218,681 @@ else:
     print("   RapidAPI 需要 API Key 才能正常工作")
     print("   请设置: export API_KEY=你的RapidAPI-Key")
 
-# 对于 POST/PUT/PATCH 请求，自动添加 Content-Type
-default_headers["Content-Type"] = "application/json"
+# JSON 请求体的 Content-Type 由 httpx 自动设置
 
 {% elif api_spec.auth_type %}
 # 其他 API 的认证
-if API_KEY:
+{% if auth_in in ['query', 'cookie'] %}# API Key 以{{ '查询参数' if auth_in == 'query' else ' cookie ' }} {{ auth_name }} 发送，创建客户端后设置
+{% else %}if API_KEY:
     default_headers["{{ api_spec.auth_config.get('name', 'X-API-Key') if api_spec.auth_type == 'apikey' else 'Authorization' }}"] = API_KEY
+{% endif %}{% endif %}
+
+{% if client_profile %}
+# HTTP 客户端配置（连接池、keep-alive、HTTP/2、超时），可通过环境变量覆盖
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "{{ client_profile.max_connections }}"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "{{ client_profile.max_keepalive_connections }}"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "{{ client_profile.keepalive_expiry }}"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "{{ client_profile.connect_timeout }}"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "{{ client_profile.read_timeout }}"))
+# HTTP/2 需要 h2（pip install httpx[http2]），未安装时退回 HTTP/1.1
+HTTP2 = os.getenv("HTTP2", "{{ '1' if client_profile.http2 else '0' }}").lower() in ("1", "true", "yes")
+HTTP2 = HTTP2 and importlib.util.find_spec("h2") is not None
+{% if not upstream_transport and not metrics %}
+client = httpx.AsyncClient(
+{%- if api_spec.base_url %}
+    base_url="{{ api_spec.base_url }}",
+{%- endif %}
+    limits=httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    ),
+    timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+    http2=HTTP2,
+    headers=default_headers
+)
 {% endif %}
+{%- endif %}
+{%- if upstream_transport %}
+{%- if cache_ttl %}
+# 响应缓存（GET 请求，TTL + LRU），可通过环境变量覆盖；CACHE_TTL=0 时只缓存带 x-cache-ttl 的操作
+CACHE_TTL = float(os.getenv("CACHE_TTL", "{{ cache_ttl }}"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+# 来自 x-cache-ttl 扩展的操作级 TTL（秒）: (请求路径模板, TTL)
+CACHE_TTL_OVERRIDES = [
+{%- for path, ttl in cache_overrides %}
+    ({{ path|tojson }}, {{ ttl }}),
+{%- endfor %}
+]
+{%- endif %}
+{%- if rapidapi %}
+# RapidAPI 套餐限流，可通过环境变量覆盖: 每秒请求数（0 表示不限制）与突发容量
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "{{ rate_limit }}"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "1"))
+# 收到 429 时按 Retry-After 等待后重试的次数和单次最长等待秒数
+RETRY_429_MAX = int(os.getenv("RETRY_429_MAX", "3"))
+RETRY_429_MAX_WAIT = float(os.getenv("RETRY_429_MAX_WAIT", "60"))
+# 响应头显示月度配额已用完时，在重置前直接拒绝请求（避免超额计费）
+QUOTA_GUARD = os.getenv("QUOTA_GUARD", "1").lower() in ("1", "true", "yes")
+
+
+class RateLimiter:
+    """
+    令牌桶限流
+
+    按 RATE_LIMIT_PER_SECOND 匀速补充、容量为 RATE_LIMIT_BURST。采用"预约"方式扣减:
+    余量不足时余额为负，调用方按返回的等待时间排队休眠而不是失败。
+    暂停（Retry-After）期间不发放令牌: 暂停开始时作废已有的预约，调用方等到暂停结束后
+    才取令牌，桶从一个令牌开始按速率放行，排队的请求不会在暂停结束时同时发出。
+    """
+
+    def __init__(self, per_second, burst):
+        self.rate = per_second
+        self.capacity = max(1.0, burst)
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    async def acquire(self):
+        """等待直到允许发送请求，返回实际等待的秒数"""
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            if self._paused_until > now:
+                delay = self._paused_until - now
+                await asyncio.sleep(delay)
+                waited += delay
+                continue
+            if self.rate <= 0:
+                return waited
+            self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+            self._updated = now
+            self._available -= 1
+            if self._available >= 0:
+                return waited
+            paused_until = self._paused_until
+            delay = -self._available / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+            # 等待期间开始了新的暂停时预约已作废，暂停结束后重新排队
+            if self._paused_until == paused_until:
+                return waited
+
+    def pause(self, seconds):
+        """在 seconds 秒内暂停所有请求（用于遵守服务端的 Retry-After）"""
+        paused_until = time.monotonic() + seconds
+        if paused_until > self._paused_until:
+            self._paused_until = paused_until
+            self._available = 1.0
+            self._updated = paused_until
+
+
+def _retry_after(headers):
+    """从 429 响应头中解析重试等待时间（秒数或 HTTP 日期），无法解析时返回 None"""
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+{%- endif %}
+{%- if cache_ttl or rapidapi %}
+
+
+{% endif -%}
+class UpstreamTransport(httpx.AsyncBaseTransport):
+    """
+    包装实际发起请求的传输层
+{%- if cache_ttl or coalesce_requests %}
+
+    GET/HEAD 请求以 (方法, 路径, 排序后的查询参数, headers) 为键
+{%- endif %}
+{%- if cache_ttl %}
+    - 缓存 GET 请求的 2xx 响应: 条目在 TTL 后过期，超过 CACHE_MAX_ENTRIES 时淘汰最久未使用的
+      条目；hits / misses 记录命中情况
+{%- endif %}
+{%- if coalesce_requests %}
+    - 合并并发的相同请求（single-flight）: 同一个键只向上游发起一次请求，其余调用等待并共享
+      该响应；coalesced 记录被合并的调用数
+{%- endif %}
+{%- if rapidapi %}
+
+    发往上游的请求先经过令牌桶限流；429 响应按 Retry-After 暂停所有请求后重试；
+    根据 x-ratelimit-requests-remaining 响应头记录剩余月度配额
+{%- endif %}
+    """
+
+    def __init__(self, transport):
+        self._transport = transport
+{%- if cache_ttl %}
+        self._cache = OrderedDict()
+        self._static_ttls = {}
+        self._pattern_ttls = []
+        for template, ttl in CACHE_TTL_OVERRIDES:
+            if "{" in template:
+                pattern = re.sub(r"\\\\\\{[^/]+?\\\\\\}", "[^/]+", re.escape(template))
+                self._pattern_ttls.append((re.compile(pattern + "$"), ttl))
+            else:
+                self._static_ttls[template] = ttl
+        self.hits = 0
+        self.misses = 0
+{%- endif %}
+{%- if coalesce_requests %}
+        self._inflight = {}
+        self.coalesced = 0
+{%- endif %}
+{%- if rapidapi %}
+        self._limiter = RateLimiter(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+        self._quota_blocked_until = 0.0
+        self.throttled = 0
+        self.retries = 0
+        self.quota_remaining = None
+{%- endif %}
+
+    async def handle_async_request(self, request):
+{%- if cache_ttl or coalesce_requests %}
+        if request.method not in ("GET", "HEAD"):
+            return await self.{{ upstream_send }}(request)
+
+        key = (
+            request.method,
+            request.url.path,
+            tuple(sorted(request.url.params.multi_items())),
+            tuple(sorted(request.headers.multi_items())),
+        )
+{%- if cache_ttl %}
+        ttl = self._cache_ttl(request) if request.method == "GET" else 0
+        if ttl > 0:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return httpx.Response(entry[1], headers=entry[2], content=entry[3])
+            self.misses += 1
+{%- if not coalesce_requests %}
+        else:
+            return await self.{{ upstream_send }}(request)
+{%- endif %}
+{%- endif %}
+
+{%- if coalesce_requests %}
+        status_code, headers, content = await self._fetch_coalesced(key, request)
+{%- else %}
+        status_code, headers, content = await self._fetch(request)
+{%- endif %}
+{%- if cache_ttl %}
+        if ttl > 0 and 200 <= status_code < 300:
+            self._cache[key] = (time.monotonic() + ttl, status_code, headers, content)
+            self._cache.move_to_end(key)
+            while len(self._cache) > CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+{%- endif %}
+        return httpx.Response(status_code, headers=headers, content=content)
+
+    async def _fetch(self, request):
+        """向上游发起请求并读取完整响应: (状态码, headers, 解码后的内容)"""
+        response = await self.{{ upstream_send }}(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        # 内容已解码，共享或缓存的响应无需再次解压
+        headers = [
+            (name, value) for name, value in response.headers.multi_items()
+            if name not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        return response.status_code, headers, content
+{%- else %}
+        return await self._send(request)
+{%- endif %}
+{%- if coalesce_requests %}
+
+    async def _fetch_coalesced(self, key, request):
+        """相同的请求正在进行时等待并共享其结果，否则发起请求"""
+        future = self._inflight.get(key)
+        if future is not None:
+            await asyncio.wait((future,))
+            if not future.cancelled():
+                self.coalesced += 1
+                return future.result()
+            # 发起请求的调用被取消时自行请求
+            return await self._fetch(request)
+
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._fetch(request)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没有等待者时避免 "Future exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+{%- endif %}
+{%- if rapidapi %}
+
+    async def _send(self, request):
+        """限流后发送请求，429 时按 Retry-After 等待并重试"""
+        if QUOTA_GUARD and self._quota_blocked_until > time.monotonic():
+            raise httpx.RequestError(
+                f"RapidAPI 月度配额已用完，约 {self._quota_blocked_until - time.monotonic():.0f} 秒后重置"
+                "（设置 QUOTA_GUARD=0 可关闭此检查）",
+                request=request
+            )
+
+        for attempt in range(RETRY_429_MAX + 1):
+            if await self._limiter.acquire() > 0:
+                self.throttled += 1
+            response = await self._transport.handle_async_request(request)
+            self._update_quota(response)
+            if response.status_code != 429 or attempt == RETRY_429_MAX:
+                return response
+
+            delay = _retry_after(response.headers)
+            if delay is None:
+                delay = 2 ** attempt
+            if delay > RETRY_429_MAX_WAIT:
+                return response
+            await response.aclose()
+            self.retries += 1
+            self._limiter.pause(delay)
+
+    def _update_quota(self, response):
+        remaining = response.headers.get("x-ratelimit-requests-remaining")
+        if remaining is None:
+            return
+        try:
+            self.quota_remaining = int(remaining)
+        except ValueError:
+            return
+        if self.quota_remaining <= 0:
+            try:
+                reset = float(response.headers.get("x-ratelimit-requests-reset", ""))
+            except ValueError:
+                reset = 3600.0
+            self._quota_blocked_until = time.monotonic() + reset
+{%- endif %}
+{%- if cache_ttl %}
+
+    def _cache_ttl(self, request):
+        path = request.url.path
+        ttl = self._static_ttls.get(path)
+        if ttl is not None:
+            return ttl
+        for pattern, ttl in self._pattern_ttls:
+            if pattern.match(path):
+                return ttl
+        return CACHE_TTL
+{%- endif %}
+
+    def stats(self):
+        """缓存命中、请求合并与限流统计"""
+        return {
+{%- if cache_ttl %}
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_entries": len(self._cache),
+{%- endif %}
+{%- if coalesce_requests %}
+            "coalesced": self.coalesced,
+{%- endif %}
+{%- if rapidapi %}
+            "throttled": self.throttled,
+            "retries_429": self.retries,
+            "quota_remaining": self.quota_remaining,
+{%- endif %}
+        }
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# 连接池与 HTTP/2 配置在实际发起请求的传输层上生效
+upstream_transport = UpstreamTransport({{ 'MetricsTransport(' if metrics }}httpx.AsyncHTTPTransport(
+{%- if client_profile %}
+    limits=httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    ),
+    http2=HTTP2
+{% endif -%}
+)){{ ')' if metrics }}
 
-{% if api_spec.base_url %}
+client = httpx.AsyncClient(
+{%- if api_spec.base_url %}
+    base_url="{{ api_spec.base_url }}",
+{%- endif %}
+    timeout={{ 'httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)' if client_profile else '30.0' }},
+    headers=default_headers,
+    transport=upstream_transport
+)
+{% elif metrics %}
+# 连接池与 HTTP/2 配置在实际发起请求的传输层上生效
+client = httpx.AsyncClient(
+{%- if api_spec.base_url %}
+    base_url="{{ api_spec.base_url }}",
+{%- endif %}
+    timeout={{ 'httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)' if client_profile else '30.0' }},
+    headers=default_headers,
+    transport=MetricsTransport(httpx.AsyncHTTPTransport(
+{%- if client_profile %}
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        ),
+        http2=HTTP2
+    ))
+{%- else -%}
+))
+{%- endif %}
+)
+{% elif client_profile -%}
+{% elif api_spec.base_url %}
 client = httpx.AsyncClient(
     base_url="{{ api_spec.base_url }}", 
-    timeout=30.0
+    timeout=30.0,
+    headers=default_headers
 )
 {% else %}
 client = httpx.AsyncClient(
-    timeout=30.0
+    timeout=30.0,
+    headers=default_headers
 )
+{% endif %}{% if auth_in in ['query', 'cookie'] %}
+# 在客户端上设置一次，随每个请求发送
+if API_KEY:
+    client.{{ 'params' if auth_in == 'query' else 'cookies' }} = {"{{ auth_name }}": API_KEY}
 {% endif %}
 
+{% if lazy_tools -%}
+# 工具名 -> (HTTP 方法, 路径)；对应的 _Operation 在首次调用时构建
+_TOOL_ROUTES = {}
+_OPERATIONS = {}
+
+
+class _Operation:
+    """单个操作的请求构建器"""
+
+    def __init__(self, method, path{% if response_projection %}, projection=(){% endif %}):
+        self.method = method
+        self.path = path
+        self.path_params = re.findall(r"{([^{}/]+)}", path)
+{%- if response_projection %}
+        # 工具 schema 中追加的响应裁剪参数（不发送给上游）
+        self.projection = frozenset(projection)
+{%- endif %}
+
+    def build(self, arguments):
+        """将工具参数拆分为 (URL, 查询参数)，忽略空值（与 from_openapi 生成的工具一致）"""
+        url = self.path
+        params = {}
+        for name, value in arguments.items():
+            if value is None or value == "" or (isinstance(value, (list, dict)) and not value):
+                continue
+{%- if response_projection %}
+            if name in self.projection:
+                continue
+{%- endif %}
+            if name in self.path_params:
+                url = url.replace("{" + name + "}", quote(str(value), safe=""))
+            else:
+                params[name] = value
+        return url, params
+
+
+def _get_operation(name):
+    operation = _OPERATIONS.get(name)
+    if operation is None:
+        operation = _OPERATIONS[name] = _Operation(*_TOOL_ROUTES[name])
+    return operation
+{%- if response_projection %}
+
+
+# 工具结果的默认裁剪（工具参数 max_items / max_bytes 优先），0 表示不限制
+RESPONSE_MAX_ITEMS = int(os.getenv("RESPONSE_MAX_ITEMS", "0"))
+RESPONSE_MAX_BYTES = int(os.getenv("RESPONSE_MAX_BYTES", "0"))
+# 达到该大小（或长度未知）的 JSON 响应用 ijson 流式解析以限制内存，较小的响应整体解析更快
+RESPONSE_STREAM_MIN_BYTES = int(os.getenv("RESPONSE_STREAM_MIN_BYTES", str(8 * 1024 * 1024)))
+
+# 响应体尚未解析（未使用流式解析）
+_UNPARSED = object()
+
+
+def _field_selector(fields):
+    """把点路径列表（如 data.title、$.data[*].title）转换为选择器 {键: 子选择器}，None 表示保留整个子树"""
+    if not fields:
+        return None
+    selector = {}
+    for field in fields:
+        parts = [part for part in re.split(r"[.\\[\\]]+", str(field).lstrip("$")) if part and part != "*"]
+        node = selector
+        for index, part in enumerate(parts):
+            if index == len(parts) - 1:
+                node[part] = None
+            elif node.get(part, {}) is None:
+                # 已选择了整个父字段
+                break
+            else:
+                node = node.setdefault(part, {})
+    return selector or None
+
+
+def _project(value, selector, max_items):
+    """按选择器保留字段（数组按元素应用），并把每个数组截断为前 max_items 个元素"""
+    if selector is None and not max_items:
+        return value
+    if isinstance(value, list):
+        return [_project(item, selector, max_items) for item in value[:max_items or None]]
+    if isinstance(value, dict):
+        if selector is None:
+            return {key: _project(item, None, max_items) for key, item in value.items()}
+        return {key: _project(item, selector[key], max_items) for key, item in value.items() if key in selector}
+    return value
+
+
+def _streamable(response):
+    """是否对响应使用流式解析: 已安装 ijson 的 C 后端，且为较大或长度未知的 JSON 响应"""
+    if ijson is None or "json" not in response.headers.get("content-type", ""):
+        return False
+    length = response.headers.get("content-length", "")
+    return not length.isdigit() or int(length) >= RESPONSE_STREAM_MIN_BYTES
+
+
+class _ResponseReader:
+    """把流式响应包装成 ijson 需要的异步文件对象"""
+
+    def __init__(self, response):
+        self._chunks = response.aiter_bytes()
+        self._buffer = b""
+
+    async def read(self, size=-1):
+        # ijson 会先调用 read(0) 判断返回类型，数据需要缓冲而不能丢弃
+        if not self._buffer:
+            try:
+                self._buffer = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                return b""
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+async def _load_projected(response, selector, max_items):
+    """
+    边读取边解析 JSON 响应，结果与 _project(response.json(), ...) 相同，
+    但未选中的字段和超出 max_items 的数组元素不会被构建
+    """
+    root = []
+    # (容器, 其子元素的选择器)；数组对选择器透明
+    stack = [(root, selector)]
+    key = None
+    skip = 0
+    try:
+        async for _, event, value in ijson.parse_async(_ResponseReader(response), use_float=True):
+            if skip:
+                if event in ("start_map", "start_array"):
+                    skip += 1
+                elif event in ("end_map", "end_array"):
+                    skip -= 1
+                continue
+            if event == "map_key":
+                key = value
+                continue
+            if event in ("end_map", "end_array"):
+                stack.pop()
+                continue
+
+            parent, parent_selector = stack[-1]
+            if isinstance(parent, dict):
+                if parent_selector is not None and key not in parent_selector:
+                    skip = 1 if event in ("start_map", "start_array") else 0
+                    continue
+                child_selector = None if parent_selector is None else parent_selector[key]
+            else:
+                if max_items and parent is not root and len(parent) >= max_items:
+                    skip = 1 if event in ("start_map", "start_array") else 0
+                    continue
+                child_selector = parent_selector
+
+            if event == "start_map":
+                child = {}
+            elif event == "start_array":
+                child = []
+            else:
+                child = value
+            if isinstance(parent, dict):
+                parent[key] = child
+            else:
+                parent.append(child)
+            if event in ("start_map", "start_array"):
+                stack.append((child, child_selector))
+    except ijson.JSONError as e:
+        raise ValueError(f"Invalid JSON response: {e}")
+    return root[0] if root else None
+
+
+def _truncate(text, max_bytes):
+    """把文本截断到 max_bytes 个 UTF-8 字节，并注明原始大小"""
+    encoded = text.encode("utf-8")
+    if not max_bytes or len(encoded) <= max_bytes:
+        return text
+    kept = encoded[:max_bytes].decode("utf-8", errors="ignore")
+    return f"{kept}\\n... [truncated: {len(encoded)} bytes, max_bytes={max_bytes}]"
+{%- endif %}
+
+
+class LazyAPITool(Tool):
+    """只携带预先计算的名称、描述和输入 schema 的工具"""
+
+    async def run(self, arguments):
+        operation = _get_operation(self.name)
+        url, params = operation.build(arguments)
+{%- if response_projection %}
+        options = {name: arguments.get(name) for name in operation.projection}
+        selector = _field_selector(options.get("fields"))
+        max_items = options.get("max_items") or RESPONSE_MAX_ITEMS
+        max_bytes = options.get("max_bytes") or RESPONSE_MAX_BYTES
+        result = _UNPARSED
+        try:
+            async with client.stream(
+                operation.method, url, params=params, headers=get_http_headers()
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+                if (selector or max_items) and _streamable(response):
+                    result = await _load_projected(response, selector, max_items)
+                else:
+                    await response.aread()
+{%- else %}
+        try:
+            response = await client.request(
+                operation.method, url, params=params, headers=get_http_headers()
+            )
+            response.raise_for_status()
+{%- endif %}
+        except httpx.HTTPStatusError as e:
+            error_message = f"HTTP error {e.response.status_code}: {e.response.reason_phrase}"
+            if e.response.text:
+                error_message += f" - {e.response.text}"
+            raise ValueError(error_message)
+        except httpx.RequestError as e:
+            raise ValueError(f"Request error: {str(e)}")
+{%- if response_projection %}
+
+        if result is _UNPARSED:
+            try:
+                result = _project(response.json(), selector, max_items)
+            except json.JSONDecodeError:
+                return ToolResult(content=_truncate(response.text, max_bytes))
+        if max_bytes:
+            text = json.dumps(result, ensure_ascii=False)
+            truncated = _truncate(text, max_bytes)
+            if truncated is not text:
+                return ToolResult(content=truncated)
+{%- else %}
+
+        try:
+            result = response.json()
+        except json.JSONDecodeError:
+            return ToolResult(content=response.text)
+{%- endif %}
+        return ToolResult(structured_content=result if isinstance(result, dict) else {"result": result})
+
+
+# 创建 FastMCP 服务器并注册工具（不解析 OpenAPI 规范）
+mcp = FastMCP(
+    name="{{ server.name }}",
+    version=__version__
+)
+{%- if response_projection %}
+for _name, _description, _schema, _method, _path, _projection in TOOL_TABLE:
+    _TOOL_ROUTES[_name] = (_method, _path, _projection)
+{%- else %}
+for _name, _description, _schema, _method, _path in TOOL_TABLE:
+    _TOOL_ROUTES[_name] = (_method, _path)
+{%- endif %}
+    mcp.add_tool(LazyAPITool(name=_name, description=_description, parameters=_schema))
+{% else -%}
 # 从 OpenAPI 规范创建 FastMCP 服务器
+{% if spec_mode == 'inline' -%}
 openapi_dict = json.loads(OPENAPI_SPEC)
+{% endif -%}
 mcp = FastMCP.from_openapi(
     openapi_spec=openapi_dict,
     client=client,
     name="{{ server.name }}",
     version=__version__
 )
+{%- endif %}
+{%- if metrics %}
+
+mcp.add_middleware(MetricsMiddleware())
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request):
+    """Prometheus 文本格式的指标"""
+    return PlainTextResponse(
+        METRICS.render({{ 'upstream_transport.stats()' if upstream_transport }}), media_type="text/plain; version=0.0.4"
+    )
+{%- endif %}
 
-{% if api_spec.base_url and 'rapidapi.com' in api_spec.base_url %}
-# 注册请求拦截器，为所有请求添加 RapidAPI headers
-_original_request = client.request
-
-async def _add_rapidapi_headers(method, url, **kwargs):
-    """拦截所有请求，添加必需的 RapidAPI headers"""
-    # 确保 headers 存在
-    if 'headers' not in kwargs:
-        kwargs['headers'] = {}
-    
-    # 添加 RapidAPI 必需的 headers
-    if API_KEY:
-        kwargs['headers']['X-RapidAPI-Key'] = API_KEY
-        kwargs['headers']['X-RapidAPI-Host'] = "{{ api_spec.base_url.replace('https://', '').replace('http://', '') }}"
-    else:
-        print("⚠️  警告: API_KEY 未设置，请求可能失败")
-    
-    # 对于 POST/PUT/PATCH，添加 Content-Type
-    if method.upper() in ['POST', 'PUT', 'PATCH']:
-        if 'Content-Type' not in kwargs['headers']:
-            kwargs['headers']['Content-Type'] = 'application/json'
-    
-    return await _original_request(method, url, **kwargs)
-
-# 替换 request 方法
-client.request = _add_rapidapi_headers
-{% endif %}
 
 def main():
     """主入口点"""
@@ -519,6 +1902,9 @@ def main():
     {% if transport in ['sse', 'streamable-http'] %}
     print(f"🌐 监听地址: http://{HOST}:{PORT}")
     print(f"💡 提示: 可通过环境变量 PORT 和 HOST 修改监听地址")
+    {%- if metrics %}
+    print(f"📊 指标: http://{HOST}:{PORT}/metrics")
+    {%- endif %}
     {% endif %}
     print()
     
@@ -543,8 +1929,11 @@ description = "{{ server.description }}"
 readme = "README.md"
 requires-python = ">=3.10"
 dependencies = [
-    "fastmcp>=2.0.0",
-    "httpx>=0.25.0",
+    "fastmcp>={{ '2.10.0' if lazy_tools or metrics else '2.0.0' }}",
+    "httpx{{ '[http2]' if client_profile and client_profile.http2 }}>=0.25.0",
+{%- if response_projection %}
+    "ijson>=3.1",
+{%- endif %}
 ]
 
 [project.scripts]
@@ -818,3 +2207,92 @@ Version: {{ server.version }}
 {% endif %}
 '''
 
+
+_TEMPLATE_SOURCES = {
+    'server.py': SERVER_TEMPLATE,
+    'pyproject.toml': PYPROJECT_TEMPLATE,
+    'README.md': README_TEMPLATE,
+}
+
+# 模板源码哈希（模板变化时清单中记录的文件全部失效）
+_TEMPLATE_SOURCE_HASH = content_hash(SERVER_TEMPLATE + PYPROJECT_TEMPLATE + README_TEMPLATE)
+
+
+def _generate_in_worker(
+    generator_options: Dict[str, Any], api_spec: APISpec, transport: str,
+    custom_name: Optional[str], incremental: bool, options: ServerOptions
+) -> MCPServer:
+    """进程池工作函数（模板环境在每个工作进程内只编译一次）"""
+    generator = MCPGenerator(**generator_options)
+    return generator.generate(
+        api_spec, transport=transport, custom_name=custom_name, incremental=incremental, options=options
+    )
+
+
+def _response_field_paths(responses: Dict[str, Any], depth: int = 2, limit: int = 30) -> List[str]:
+    """
+    从成功响应的 JSON schema 中提取字段点路径（数组按元素展开），用作 fields 参数的提示
+
+    解析器不展开响应中的 $ref，引用的 schema 只列出字段本身，不列出其子字段。
+
+    Returns:
+        最多 limit 个路径，如 ["data", "data.title"]；没有 schema 时为空列表
+    """
+    schema = None
+    for status, response in (responses or {}).items():
+        if not str(status).startswith("2") or not isinstance(response, dict):
+            continue
+        content = response.get("content") or {}
+        media = content.get("application/json") or next(iter(content.values()), None) or {}
+        schema = media.get("schema") if isinstance(media, dict) else None
+        # Swagger 2.0 的 schema 直接位于响应对象中
+        schema = schema or response.get("schema")
+        if schema:
+            break
+
+    paths: List[str] = []
+
+    def walk(node: Any, prefix: str, remaining: int):
+        while isinstance(node, dict) and isinstance(node.get("items"), dict):
+            node = node["items"]
+        properties = node.get("properties") if isinstance(node, dict) else None
+        if not isinstance(properties, dict):
+            return
+        for name, child in properties.items():
+            if len(paths) >= limit:
+                return
+            path = f"{prefix}.{name}" if prefix else name
+            paths.append(path)
+            if remaining > 1:
+                walk(child, path, remaining - 1)
+
+    walk(schema, "", depth)
+    return paths
+
+
+_template_environment: Optional[Environment] = None
+_template_environment_lock = threading.Lock()
+
+
+def _get_template_environment() -> Environment:
+    """
+    获取进程内共享的模板环境
+    
+    编译后的模板由 Environment 缓存，批量生成时创建再多的 MCPGenerator 也只编译一次。
+    设置 API_TO_MCP_TEMPLATE_CACHE（目录）时额外启用字节码缓存，新进程（如多进程
+    批量生成的工作进程）也无需重新编译。
+    """
+    global _template_environment
+    with _template_environment_lock:
+        if _template_environment is None:
+            bytecode_cache = None
+            cache_dir = os.getenv("API_TO_MCP_TEMPLATE_CACHE")
+            if cache_dir:
+                cache_path = Path(cache_dir).expanduser()
+                cache_path.mkdir(parents=True, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(str(cache_path))
+            _template_environment = Environment(
+                loader=DictLoader(_TEMPLATE_SOURCES),
+                bytecode_cache=bytecode_cache,
+            )
+        return _template_environment
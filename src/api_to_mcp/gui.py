@@ -9,7 +9,7 @@ from pathlib import Path
 # 添加src目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from api_to_mcp.parsers import OpenAPIParser
+from api_to_mcp.parsers import OpenAPIParser, SpecCache
 from api_to_mcp.platforms import RapidAPISpecFetcher
 from api_to_mcp.platforms.rapidapi_helper import RapidAPIHelper
 from api_to_mcp.platforms.rapidapi_auto import auto_extract_rapidapi
@@ -71,6 +71,12 @@ def main():
             help="是否验证 HTTPS 证书"
         )
         
+        spec_cache = st.checkbox(
+            "缓存解析结果",
+            value=False,
+            help="按文件内容缓存解析结果，重新运行时不再重复解析（写入 ~/.cache/api-to-mcp/specs）"
+        )
+        
         st.divider()
         
         # EMCP 推广配置
@@ -270,8 +276,8 @@ export AZURE_OPENAI_DEPLOYMENT="gpt-4o"
                         with open(temp_file, "wb") as f:
                             f.write(uploaded_file.getbuffer())
                         
-                        # 解析
-                        parser = OpenAPIParser()
+                        # 解析（开启缓存时按文件内容缓存，重新运行时不再重复解析）
+                        parser = OpenAPIParser(cache=SpecCache() if spec_cache else None)
                         api_spec = parser.parse_file(temp_file)
                         
                         st.success(f"✅ 解析成功: {api_spec.title} v{api_spec.version}")
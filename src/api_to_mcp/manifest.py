@@ -0,0 +1,185 @@
+"""
+生成清单 - 记录每个生成项目的端点指纹、增强结果和文件哈希，用于增量重新生成
+"""
+from typing import Dict, Any, Optional, Iterable, List
+from pathlib import Path
+import hashlib
+import json
+import os
+import stat
+import uuid
+
+from .models import APIEndpoint
+
+
+MANIFEST_FILENAME = ".api_to_mcp_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def endpoint_fingerprint(endpoint: APIEndpoint) -> str:
+    """
+    计算端点内容指纹
+
+    由方法、摘要、描述、参数集合和标签规范化后取 SHA-256，不含路径和 operation_id，
+    因此 RapidAPI 中路径不同但内容完全相同的备用端点（如 x-get-xxxx）会得到相同指纹。
+
+    摘要和描述都为空的端点没有可比较的内容（如参数相同的 GET /health 与 GET /version），
+    此时指纹同时包含路径和 operation_id，只有同一个操作才会得到相同指纹。
+    """
+    canonical = {
+        "method": endpoint.method.upper(),
+        "summary": (endpoint.summary or "").strip(),
+        "description": (endpoint.description or "").strip(),
+        "parameters": sorted(
+            (
+                param.name,
+                param.type,
+                (param.description or "").strip(),
+                param.required,
+                json.dumps(param.default, sort_keys=True, ensure_ascii=False, default=str),
+                tuple(param.enum or ()),
+            )
+            for param in endpoint.parameters
+        ),
+        "tags": sorted(endpoint.tags),
+    }
+    if not canonical["summary"] and not canonical["description"]:
+        canonical["path"] = endpoint.path
+        canonical["operation_id"] = endpoint.operation_id
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def content_hash(content: str) -> str:
+    """计算文本内容的 SHA-256"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def atomic_write_text(path: Path, content: str):
+    """
+    原子写入文本文件
+    
+    先写入同目录下的临时文件再替换目标文件，并发读取方只会看到旧内容或完整的新内容。
+    新文件的权限遵循 umask，已存在文件保留原有权限。
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(path.stat().st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """
+    内容与磁盘上的文件不一致时才（原子地）写入
+    
+    Returns:
+        是否写入了文件
+    """
+    try:
+        if Path(path).read_text(encoding='utf-8') == content:
+            return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    atomic_write_text(path, content)
+    return True
+
+
+class GenerationManifest:
+    """
+    生成清单
+
+    保存在生成项目目录下的 .api_to_mcp_manifest.json 中:
+    - enhancements: 端点指纹 -> 增强后的 summary/description（附带增强上下文键，
+      API 描述、部署或提示词变化时整体失效）
+    - files: 文件名 -> 渲染输入哈希与输出内容哈希
+
+    下次生成时，指纹未变的端点直接复用增强结果，渲染输入未变且磁盘内容未被
+    修改的文件跳过渲染和写入。
+    """
+
+    def __init__(self, server_dir: Path, data: Optional[Dict[str, Any]] = None):
+        self.server_dir = Path(server_dir)
+        data = data or {}
+        self.enhance_context: Optional[str] = data.get("enhance_context")
+        self.enhancements: Dict[str, Dict[str, str]] = data.get("enhancements", {})
+        self.files: Dict[str, Dict[str, str]] = data.get("files", {})
+
+    @property
+    def path(self) -> Path:
+        return self.server_dir / MANIFEST_FILENAME
+
+    @classmethod
+    def load(cls, server_dir: Path) -> "GenerationManifest":
+        """加载清单，不存在或无法解析时返回空清单"""
+        path = Path(server_dir) / MANIFEST_FILENAME
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return cls(server_dir)
+
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(server_dir)
+        return cls(server_dir, data)
+
+    def save(self):
+        """写入清单"""
+        self.server_dir.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "enhance_context": self.enhance_context,
+            "enhancements": self.enhancements,
+            "files": self.files,
+        }
+        write_if_changed(self.path, json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True))
+
+    def get_enhancement(self, fingerprint: str, enhance_context: str) -> Optional[Dict[str, str]]:
+        """获取已记录的增强结果（增强上下文不一致时视为不存在）"""
+        if self.enhance_context != enhance_context:
+            return None
+        return self.enhancements.get(fingerprint)
+
+    def record_enhancements(self, enhance_context: str, endpoints: Iterable[APIEndpoint]):
+        """用本次运行的增强结果替换清单中的记录（已不存在的端点随之移除）"""
+        enhancements = {}
+        for endpoint in endpoints:
+            if endpoint.enhanced_summary is None and endpoint.enhanced_description is None:
+                continue
+            enhancements[endpoint_fingerprint(endpoint)] = {
+                "summary": endpoint.enhanced_summary or "",
+                "description": endpoint.enhanced_description or "",
+            }
+        self.enhance_context = enhance_context
+        self.enhancements = enhancements
+
+    def is_file_current(self, name: str, input_hash: str) -> bool:
+        """判断文件是否可以跳过: 渲染输入未变，且磁盘上的内容与上次写入时一致"""
+        entry = self.files.get(name)
+        if not entry or entry.get("input") != input_hash:
+            return False
+
+        path = self.server_dir / name
+        try:
+            return content_hash(path.read_text(encoding='utf-8')) == entry.get("output")
+        except OSError:
+            return False
+
+    def record_file(self, name: str, input_hash: str, content: str):
+        """记录文件的渲染输入哈希和输出内容哈希"""
+        self.files[name] = {"input": input_hash, "output": content_hash(content)}
+
+    def prune_files(self, names: List[str]):
+        """移除不再生成的文件记录"""
+        self.files = {name: entry for name, entry in self.files.items() if name in names}
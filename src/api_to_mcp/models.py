@@ -30,6 +30,9 @@ class APIEndpoint(BaseModel):
     # 优化后的描述
     enhanced_description: Optional[str] = None
     enhanced_summary: Optional[str] = None
+    
+    # 响应缓存时间（秒），来自操作的 x-cache-ttl 扩展
+    cache_ttl: Optional[float] = None
 
 
 class APISpec(BaseModel):
@@ -76,3 +79,108 @@ class MCPServer(BaseModel):
     # 生成的代码路径
     output_path: Optional[str] = None
 
+
+
+# 受信任数据的快速构造
+#
+# 解析器产出的字段类型已经确定，逐个对象走 pydantic 校验在上万个端点的规范中
+# 占解析耗时的大头。以下工厂直接填充模型实例的 __dict__，跳过校验（效果同
+# model_construct，但不逐字段查找默认值，比 model_construct 和校验构造都快）。
+# 只能用于 OpenAPIParser 等已检查过结构的数据；抓取或用户提供的原始数据应使用
+# 校验构造。模型新增字段时需同步更新工厂。
+
+_object_new = object.__new__
+_object_setattr = object.__setattr__
+
+# 每个模型的字段名，构造时复制为各实例自己的"已设置字段"集合
+_FIELD_NAMES: Dict[type, frozenset] = {}
+
+
+def _construct(cls, values: Dict[str, Any]):
+    """values 必须包含模型的全部字段"""
+    field_names = _FIELD_NAMES.get(cls)
+    if field_names is None:
+        field_names = _FIELD_NAMES[cls] = frozenset(cls.model_fields)
+    obj = _object_new(cls)
+    _object_setattr(obj, '__dict__', values)
+    _object_setattr(obj, '__pydantic_fields_set__', set(field_names))
+    _object_setattr(obj, '__pydantic_extra__', None)
+    _object_setattr(obj, '__pydantic_private__', None)
+    return obj
+
+
+def build_parameter(
+    name: str,
+    type: str = "string",
+    description: Optional[str] = None,
+    required: bool = False,
+    default: Optional[Any] = None,
+    enum: Optional[List[str]] = None,
+) -> APIParameter:
+    """跳过校验构造 APIParameter"""
+    return _construct(APIParameter, {
+        'name': name,
+        'type': type,
+        'description': description,
+        'required': required,
+        'default': default,
+        'enum': enum,
+    })
+
+
+def build_endpoint(
+    path: str,
+    method: str,
+    summary: Optional[str] = None,
+    description: Optional[str] = None,
+    operation_id: Optional[str] = None,
+    parameters: Optional[List[APIParameter]] = None,
+    request_body: Optional[Dict[str, Any]] = None,
+    responses: Optional[Dict[str, Any]] = None,
+    tags: Optional[List[str]] = None,
+    enhanced_description: Optional[str] = None,
+    enhanced_summary: Optional[str] = None,
+    cache_ttl: Optional[float] = None,
+) -> APIEndpoint:
+    """跳过校验构造 APIEndpoint（parameters 应为 build_parameter 的结果）"""
+    return _construct(APIEndpoint, {
+        'path': path,
+        'method': method,
+        'summary': summary,
+        'description': description,
+        'operation_id': operation_id,
+        'parameters': parameters if parameters is not None else [],
+        'request_body': request_body,
+        'responses': responses if responses is not None else {},
+        'tags': tags if tags is not None else [],
+        'enhanced_description': enhanced_description,
+        'enhanced_summary': enhanced_summary,
+        'cache_ttl': cache_ttl,
+    })
+
+
+def build_spec(
+    title: str,
+    version: str,
+    description: Optional[str] = None,
+    base_url: Optional[str] = None,
+    servers: Optional[List[Dict[str, Any]]] = None,
+    endpoints: Optional[List[APIEndpoint]] = None,
+    source_platform: str = "unknown",
+    source_url: Optional[str] = None,
+    auth_type: Optional[str] = None,
+    auth_config: Optional[Dict[str, Any]] = None,
+) -> APISpec:
+    """跳过校验构造 APISpec（endpoints 应为 build_endpoint 的结果）"""
+    return _construct(APISpec, {
+        'title': title,
+        'version': version,
+        'description': description,
+        'base_url': base_url,
+        'servers': servers if servers is not None else [],
+        'endpoints': endpoints if endpoints is not None else [],
+        'source_platform': source_platform,
+        'source_url': source_url,
+        'auth_type': auth_type,
+        'auth_config': auth_config if auth_config is not None else {},
+    })
@@ -2,7 +2,8 @@
 解析器模块
 """
 from .openapi_parser import OpenAPIParser
+from .spec_cache import SpecCache
 
-__all__ = ['OpenAPIParser']
+__all__ = ['OpenAPIParser', 'SpecCache']
 
 
@@ -0,0 +1,51 @@
+"""
+规范文件加载 - 优先使用 C 实现的 YAML/JSON 解析器
+"""
+from typing import Any
+from pathlib import Path
+import json
+import yaml
+
+# libyaml 可用时使用 C 实现的 SafeLoader，速度约为纯 Python 版本的 10 倍
+try:
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLLoader
+
+# orjson 为可选依赖: pip install api-to-mcp[fast]
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+JSON_SUFFIXES = ['.json']
+YAML_SUFFIXES = ['.yaml', '.yml']
+
+
+def loader_name(suffix: str) -> str:
+    """返回指定后缀实际使用的解析器名称"""
+    if suffix in JSON_SUFFIXES:
+        return 'orjson' if orjson is not None else 'json'
+    return YAMLLoader.__name__
+
+
+def load_spec_file(file_path: Path) -> Any:
+    """
+    加载 JSON/YAML 规范文件
+
+    Raises:
+        ValueError: 不支持的文件格式
+    """
+    file_path = Path(file_path)
+
+    if file_path.suffix in JSON_SUFFIXES:
+        if orjson is not None:
+            return orjson.loads(file_path.read_bytes())
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    elif file_path.suffix in YAML_SUFFIXES:
+        with open(file_path, 'rb') as f:
+            return yaml.load(f, Loader=YAMLLoader)
+    else:
+        raise ValueError(f"不支持的文件格式: {file_path.suffix}")
@@ -1,34 +1,73 @@
 """
 OpenAPI/Swagger 解析器
 """
-from typing import Dict, Any, List, Optional
-import json
+from typing import Dict, Any, List, Optional, Iterator, TYPE_CHECKING
 import yaml
 from pathlib import Path
 
-from ..models import APISpec, APIEndpoint, APIParameter
+from ..models import APISpec, APIEndpoint, build_parameter, build_endpoint, build_spec
+from .loader import load_spec_file
+from .ref_resolver import RefResolver
+
+if TYPE_CHECKING:
+    from .spec_cache import SpecCache
+
+
+HTTP_METHODS = ['get', 'post', 'put', 'delete', 'patch', 'options', 'head']
+
+# 解析逻辑变化（影响 APISpec 输出）时递增，使旧的解析结果缓存失效
+PARSER_VERSION = 2
 
 
 class OpenAPIParser:
     """OpenAPI/Swagger 规范解析器"""
     
+    def __init__(self, cache: Optional["SpecCache"] = None):
+        """
+        Args:
+            cache: 解析结果缓存（可选，仅用于 parse_file）
+        """
+        self.cache = cache
+        self._resolver: Optional[RefResolver] = None
+    
     def parse_file(self, file_path: str) -> APISpec:
-        """解析 OpenAPI/Swagger 文件"""
+        """解析 OpenAPI/Swagger 文件（配置了缓存时，文件内容未变则直接返回缓存结果）"""
         file_path = Path(file_path)
         
-        if file_path.suffix in ['.json']:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                spec_data = json.load(f)
-        elif file_path.suffix in ['.yaml', '.yml']:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                spec_data = yaml.safe_load(f)
-        else:
-            raise ValueError(f"不支持的文件格式: {file_path.suffix}")
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(file_path)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        spec_data = load_spec_file(file_path)
+        api_spec = self.parse_dict(spec_data, base_path=file_path)
+        
+        if key is not None:
+            self.cache.set(key, api_spec, self._resolver.external_documents)
+        return api_spec
+    
+    def parse_dict(self, spec_data: Dict[str, Any], base_path: Optional[Path] = None) -> APISpec:
+        """
+        解析 OpenAPI/Swagger 字典数据
         
-        return self.parse_dict(spec_data)
+        Args:
+            spec_data: 规范数据
+            base_path: 规范文件路径（用于解析相对文件 $ref，可选）
+        """
+        api_spec = self.parse_info(spec_data, base_path)
+        api_spec.endpoints = list(self.iter_endpoints(spec_data, base_path))
+        return api_spec
     
-    def parse_dict(self, spec_data: Dict[str, Any]) -> APISpec:
-        """解析 OpenAPI/Swagger 字典数据"""
+    def parse_info(self, spec_data: Dict[str, Any], base_path: Optional[Path] = None) -> APISpec:
+        """
+        只解析 API 基本信息（标题、版本、服务器、认证），不解析端点
+        
+        与 iter_endpoints 配合使用，可以在不构建完整端点列表的情况下处理大型规范。
+        """
+        self._resolver = RefResolver(spec_data, base_path)
+        
         # 检测版本
         if 'swagger' in spec_data:
             return self._parse_swagger_2(spec_data)
@@ -37,8 +76,40 @@ class OpenAPIParser:
         else:
             raise ValueError("无法识别的 API 规范格式")
     
+    def iter_endpoints(
+        self, spec_data: Dict[str, Any], base_path: Optional[Path] = None
+    ) -> Iterator[APIEndpoint]:
+        """
+        逐个解析端点
+        
+        按规范中的顺序惰性产出 APIEndpoint，调用方处理完一个端点后即可释放，
+        10k 级操作的规范也只需要常量级的端点内存。
+        
+        Args:
+            spec_data: 规范数据
+            base_path: 规范文件路径（用于解析相对文件 $ref，可选）
+        """
+        if 'swagger' in spec_data:
+            is_swagger = True
+        elif 'openapi' in spec_data:
+            is_swagger = False
+        else:
+            raise ValueError("无法识别的 API 规范格式")
+        
+        self._resolver = RefResolver(spec_data, base_path)
+        paths = spec_data.get('paths', {})
+        for path, path_item in paths.items():
+            path_item = self._resolve(path_item, paths)
+            for method, operation in path_item.items():
+                if method not in HTTP_METHODS:
+                    continue
+                if is_swagger:
+                    yield self._parse_swagger_operation(path, method, operation, path_item)
+                else:
+                    yield self._parse_openapi_operation(path, method, operation, spec_data, path_item)
+    
     def _parse_swagger_2(self, spec_data: Dict[str, Any]) -> APISpec:
-        """解析 Swagger 2.0 规范"""
+        """解析 Swagger 2.0 规范基本信息"""
         info = spec_data.get('info', {})
         
         # 构建 base_url
@@ -48,15 +119,6 @@ class OpenAPIParser:
             base_path = spec_data.get('basePath', '')
             base_url = f"{scheme}://{spec_data['host']}{base_path}"
         
-        # 解析端点
-        endpoints = []
-        paths = spec_data.get('paths', {})
-        for path, path_item in paths.items():
-            for method, operation in path_item.items():
-                if method in ['get', 'post', 'put', 'delete', 'patch', 'options', 'head']:
-                    endpoint = self._parse_swagger_operation(path, method, operation)
-                    endpoints.append(endpoint)
-        
         # 解析认证
         auth_type = None
         auth_config = {}
@@ -67,33 +129,37 @@ class OpenAPIParser:
                 auth_type = first_auth.get('type')
                 auth_config = first_auth
         
-        return APISpec(
+        return build_spec(
             title=info.get('title', 'Untitled API'),
             version=info.get('version', '1.0.0'),
             description=info.get('description'),
             base_url=base_url,
-            endpoints=endpoints,
             source_platform='swagger',
             auth_type=auth_type,
             auth_config=auth_config,
         )
     
     def _parse_swagger_operation(
-        self, path: str, method: str, operation: Dict[str, Any]
+        self, path: str, method: str, operation: Dict[str, Any],
+        path_item: Optional[Dict[str, Any]] = None
     ) -> APIEndpoint:
         """解析 Swagger 操作"""
         parameters = []
-        for param in operation.get('parameters', []):
-            parameters.append(APIParameter(
+        for param in self._merge_parameters(operation, path_item):
+            param_type = param.get('type')
+            if param_type is None and 'schema' in param:
+                # body 参数的类型在 schema 中
+                param_type = self._resolve(param['schema'], param).get('type')
+            parameters.append(build_parameter(
                 name=param.get('name', ''),
-                type=param.get('type', 'string'),
+                type=param_type or 'string',
                 description=param.get('description'),
                 required=param.get('required', False),
                 default=param.get('default'),
                 enum=param.get('enum'),
             ))
         
-        return APIEndpoint(
+        return build_endpoint(
             path=path,
             method=method.upper(),
             summary=operation.get('summary'),
@@ -101,28 +167,18 @@ class OpenAPIParser:
             operation_id=operation.get('operationId'),
             parameters=parameters,
             responses=operation.get('responses', {}),
-            tags=operation.get('tags', []),
+            tags=operation.get('tags') or [],
+            cache_ttl=_cache_ttl(operation),
         )
     
     def _parse_openapi_3(self, spec_data: Dict[str, Any]) -> APISpec:
-        """解析 OpenAPI 3.0+ 规范"""
+        """解析 OpenAPI 3.0+ 规范基本信息"""
         info = spec_data.get('info', {})
         
         # 解析服务器
         servers = spec_data.get('servers', [])
         base_url = servers[0]['url'] if servers else None
         
-        # 解析端点
-        endpoints = []
-        paths = spec_data.get('paths', {})
-        for path, path_item in paths.items():
-            for method, operation in path_item.items():
-                if method in ['get', 'post', 'put', 'delete', 'patch', 'options', 'head']:
-                    endpoint = self._parse_openapi_operation(
-                        path, method, operation, spec_data
-                    )
-                    endpoints.append(endpoint)
-        
         # 解析认证
         auth_type = None
         auth_config = {}
@@ -133,28 +189,28 @@ class OpenAPIParser:
             auth_type = first_scheme.get('type')
             auth_config = first_scheme
         
-        return APISpec(
+        return build_spec(
             title=info.get('title', 'Untitled API'),
             version=info.get('version', '1.0.0'),
             description=info.get('description'),
             base_url=base_url,
             servers=servers,
-            endpoints=endpoints,
             source_platform='openapi',
             auth_type=auth_type,
             auth_config=auth_config,
         )
     
     def _parse_openapi_operation(
-        self, path: str, method: str, operation: Dict[str, Any], spec_data: Dict[str, Any]
+        self, path: str, method: str, operation: Dict[str, Any], spec_data: Dict[str, Any],
+        path_item: Optional[Dict[str, Any]] = None
     ) -> APIEndpoint:
         """解析 OpenAPI 操作"""
         parameters = []
         
         # 解析路径/查询/头部参数
-        for param in operation.get('parameters', []):
-            param_schema = param.get('schema', {})
-            parameters.append(APIParameter(
+        for param in self._merge_parameters(operation, path_item):
+            param_schema = self._resolve(param.get('schema', {}), param)
+            parameters.append(build_parameter(
                 name=param.get('name', ''),
                 type=param_schema.get('type', 'string'),
                 description=param.get('description'),
@@ -165,8 +221,10 @@ class OpenAPIParser:
         
         # 解析请求体
         request_body = operation.get('requestBody')
+        if request_body is not None:
+            request_body = self._resolve(request_body, operation)
         
-        return APIEndpoint(
+        return build_endpoint(
             path=path,
             method=method.upper(),
             summary=operation.get('summary'),
@@ -175,7 +233,45 @@ class OpenAPIParser:
             parameters=parameters,
             request_body=request_body,
             responses=operation.get('responses', {}),
-            tags=operation.get('tags', []),
+            tags=operation.get('tags') or [],
+            cache_ttl=_cache_ttl(operation),
         )
+    
+    def _merge_parameters(
+        self, operation: Dict[str, Any], path_item: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """合并路径级与操作级参数（解析 $ref，同名同位置时操作级优先）"""
+        merged: Dict[tuple, Dict[str, Any]] = {}
+        
+        sources = []
+        if path_item:
+            sources.append((path_item.get('parameters', []), path_item))
+        sources.append((operation.get('parameters', []), operation))
+        
+        for params, parent in sources:
+            for param in params:
+                param = self._resolve(param, parent)
+                if not isinstance(param, dict) or not param:
+                    continue
+                merged[(param.get('name'), param.get('in'))] = param
+        
+        return list(merged.values())
+    
+    def _resolve(self, node: Any, parent: Any = None) -> Any:
+        """解析 $ref，无法解析时给出警告并按空对象处理"""
+        if self._resolver is None:
+            return node
+        try:
+            resolved = self._resolver.resolve(node, parent)
+        except (ValueError, OSError, yaml.YAMLError) as e:
+            print(f"警告: 无法解析 $ref: {e}")
+            return {}
+        return resolved if resolved is not None else {}
 
 
+def _cache_ttl(operation: Dict[str, Any]) -> Optional[float]:
+    """读取操作的 x-cache-ttl 扩展（秒），缺失或不是非负数时返回 None"""
+    ttl = operation.get('x-cache-ttl')
+    if isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl < 0:
+        return None
+    return float(ttl)
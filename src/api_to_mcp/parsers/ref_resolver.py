@@ -0,0 +1,126 @@
+"""
+$ref 解析器 - 按需解析 OpenAPI/Swagger 中的 JSON 引用
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from pathlib import Path
+from urllib.parse import unquote
+import yaml
+
+from .loader import load_spec_file, YAMLLoader, JSON_SUFFIXES, YAML_SUFFIXES
+
+
+# 根文档的键
+ROOT = ""
+
+
+class RefResolver:
+    """
+    $ref 解析器
+
+    - 支持本地引用（#/components/schemas/Pet）和相对文件引用
+      （schemas.yaml#/Pet、./common.json），外部文件按引用方所在文件的目录解析
+    - 每个 (文档, JSON 指针) 只解析一次，结果会被缓存，共享大量 schema 的规范
+      也能保持线性时间
+    - 只在调用 resolve() 时解析，不会预先展开整个文档
+    - 检测 $ref 链中的循环（A -> B -> A）
+    """
+
+    def __init__(self, document: Dict[str, Any], base_path: Optional[Path] = None):
+        """
+        Args:
+            document: 根文档
+            base_path: 根文档的文件路径（用于解析相对文件引用，可选）
+        """
+        self._base_path = Path(base_path).resolve() if base_path else None
+        self._documents: Dict[str, Any] = {ROOT: document}
+        self._cache: Dict[Tuple[str, str], Any] = {}
+        # 已解析对象 -> 所在文档，用于解析外部文件内部的本地引用
+        self._origins: Dict[int, str] = {}
+
+    def resolve(self, node: Any, parent: Any = None) -> Any:
+        """
+        解析节点
+
+        如果 node 是 {"$ref": ...}，返回其最终指向的对象（会继续跟随链式引用）；
+        否则原样返回 node。
+
+        Args:
+            node: 待解析的节点
+            parent: 包含 node 的对象（应为之前 resolve() 的返回值或根文档中的对象），
+                用于确定相对引用所在的文档
+        """
+        origin = self._origins.get(id(parent), ROOT) if parent is not None else ROOT
+        seen = set()
+
+        while isinstance(node, dict) and '$ref' in node:
+            ref = node['$ref']
+            if not isinstance(ref, str):
+                raise ValueError(f"无效的 $ref: {ref!r}")
+
+            key = self._split_ref(ref, origin)
+            if key in seen:
+                raise ValueError(f"检测到循环 $ref: {ref}")
+            seen.add(key)
+
+            if key not in self._cache:
+                self._cache[key] = self._lookup(*key)
+            origin = key[0]
+            node = self._cache[key]
+
+        if isinstance(node, (dict, list)):
+            self._origins[id(node)] = origin
+        return node
+
+    @property
+    def external_documents(self) -> List[str]:
+        """已加载的外部文件路径（不含根文档）"""
+        return [key for key in self._documents if key != ROOT]
+
+    def _split_ref(self, ref: str, origin: str) -> Tuple[str, str]:
+        """将引用拆分为 (文档键, JSON 指针)"""
+        file_part, _, pointer = ref.partition('#')
+
+        if not file_part:
+            return origin, pointer
+
+        if '://' in file_part:
+            raise ValueError(f"不支持远程 $ref: {ref}")
+
+        if origin == ROOT:
+            if self._base_path is None:
+                raise ValueError(f"无法解析相对文件引用（未提供规范文件路径）: {ref}")
+            base_dir = self._base_path.parent
+        else:
+            base_dir = Path(origin).parent
+
+        return str((base_dir / unquote(file_part)).resolve()), pointer
+
+    def _lookup(self, document_key: str, pointer: str) -> Any:
+        """按 JSON 指针在文档中查找对象"""
+        node = self._load_document(document_key)
+
+        for token in pointer.split('/')[1:] if pointer else []:
+            token = unquote(token).replace('~1', '/').replace('~0', '~')
+            if isinstance(node, list):
+                try:
+                    node = node[int(token)]
+                except (ValueError, IndexError):
+                    raise ValueError(f"$ref 指向不存在的位置: {document_key}#{pointer}")
+            elif isinstance(node, dict) and token in node:
+                node = node[token]
+            else:
+                raise ValueError(f"$ref 指向不存在的位置: {document_key}#{pointer}")
+
+        return node
+
+    def _load_document(self, document_key: str) -> Any:
+        """加载（并缓存）外部文档"""
+        if document_key not in self._documents:
+            path = Path(document_key)
+            if path.suffix not in JSON_SUFFIXES + YAML_SUFFIXES:
+                # 无扩展名或其他扩展名的外部文件按 YAML 解析（兼容 JSON）
+                with open(path, 'rb') as f:
+                    self._documents[document_key] = yaml.load(f, Loader=YAMLLoader)
+            else:
+                self._documents[document_key] = load_spec_file(path)
+        return self._documents[document_key]
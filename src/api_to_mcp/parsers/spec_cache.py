@@ -0,0 +1,170 @@
+"""
+解析结果缓存 - 以文件内容哈希为键缓存解析后的 APISpec
+"""
+from typing import Dict, Any, Optional, List
+from pathlib import Path
+import hashlib
+import marshal
+import os
+import tempfile
+
+from ..config import SpecCacheConfig
+from ..models import APISpec, build_parameter, build_endpoint, build_spec
+from .openapi_parser import PARSER_VERSION
+
+# msgpack 为可选依赖: pip install api-to-mcp[fast]
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+if msgpack is not None:
+    CODEC = "msgpack"
+
+    def _encode(data: Dict[str, Any]) -> bytes:
+        return msgpack.packb(data, use_bin_type=True)
+
+    def _decode(payload: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+else:
+    # marshal 格式与 Python 版本相关，因此版本号计入缓存键
+    CODEC = f"marshal{marshal.version}"
+
+    def _encode(data: Dict[str, Any]) -> bytes:
+        return marshal.dumps(data)
+
+    def _decode(payload: bytes) -> Dict[str, Any]:
+        return marshal.loads(payload)
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+class SpecCache:
+    """
+    APISpec 解析结果缓存
+
+    键为 (规范文件内容 SHA-256 + 解析器版本 + 编码格式)，值为 model_dump 后的
+    紧凑二进制（优先 msgpack，未安装时使用标准库 marshal）。条目中同时记录
+    通过相对 $ref 引用的外部文件哈希，外部文件变化时视为未命中。
+
+    命中时直接用 models.build_* 工厂重建模型，跳过 YAML/JSON 解析、$ref 解析和
+    pydantic 校验。缓存目录总大小超过上限时按最近访问时间（mtime）淘汰。
+    """
+
+    def __init__(self, config: Optional[SpecCacheConfig] = None):
+        self.config = config or SpecCacheConfig.from_env()
+        self.path = Path(self.config.path).expanduser()
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, file_path: Path) -> str:
+        """计算规范文件的缓存键"""
+        payload = f"{PARSER_VERSION}\x00{CODEC}\x00{_file_hash(file_path)}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[APISpec]:
+        """读取缓存，未命中、条目损坏或外部引用文件已变化时返回 None"""
+        entry_path = self._entry_path(key)
+        try:
+            entry = _decode(entry_path.read_bytes())
+            current = all(
+                _file_hash(Path(dep)) == digest for dep, digest in entry["dependencies"].items()
+            )
+        except (OSError, ValueError, KeyError, TypeError, EOFError):
+            current = False
+
+        if not current:
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        self.hits += 1
+        return _construct_spec(entry["spec"])
+
+    def set(self, key: str, api_spec: APISpec, dependencies: Optional[List[str]] = None) -> bool:
+        """
+        写入缓存
+
+        Args:
+            key: make_key 返回的缓存键
+            api_spec: 解析结果
+            dependencies: 解析时加载的外部文件路径
+
+        Returns:
+            是否写入成功（规范中含有无法编码的值，如 YAML 日期时不缓存）
+        """
+        try:
+            payload = _encode({
+                "dependencies": {dep: _file_hash(Path(dep)) for dep in dependencies or []},
+                "spec": api_spec.model_dump(),
+            })
+        except (OSError, TypeError, ValueError):
+            return False
+
+        # 先写临时文件再原子替换，避免并发读取到半个条目
+        fd, tmp_name = tempfile.mkstemp(dir=self.path, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_name, self._entry_path(key))
+        except OSError:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            return False
+
+        self.evict()
+        return True
+
+    def evict(self) -> int:
+        """
+        按最近访问时间淘汰条目，直到总大小不超过上限
+
+        Returns:
+            被删除的条目数
+        """
+        if self.config.max_mb <= 0:
+            return 0
+
+        entries = []
+        for entry_path in self.path.glob("*.bin"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+
+        total = sum(size for _, size, _ in entries)
+        limit = self.config.max_mb * 1024 * 1024
+        removed = 0
+        for _, size, entry_path in sorted(entries, key=lambda item: item[0]):
+            if total <= limit:
+                break
+            try:
+                entry_path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f"{key}.bin"
+
+
+def _construct_spec(data: Dict[str, Any]) -> APISpec:
+    """从 model_dump 的结果重建 APISpec（不经过 pydantic 校验）"""
+    endpoints = []
+    for endpoint in data.get("endpoints", []):
+        parameters = [build_parameter(**param) for param in endpoint.get("parameters", [])]
+        endpoints.append(build_endpoint(**{**endpoint, "parameters": parameters}))
+    return build_spec(**{**data, "endpoints": endpoints})
@@ -83,8 +83,12 @@ class RapidAPISpecFetcher:
     这个类提供了从已导出的 OpenAPI 文件中读取的功能
     """
     
-    def __init__(self):
-        self.parser = OpenAPIParser()
+    def __init__(self, parser: Optional[OpenAPIParser] = None):
+        """
+        Args:
+            parser: 规范解析器（可选，可传入启用了解析缓存的解析器）
+        """
+        self.parser = parser or OpenAPIParser()
     
     def fetch_from_url(self, spec_url: str, api_key: Optional[str] = None, verify_ssl: bool = True) -> APISpec:
         """
@@ -0,0 +1,131 @@
+"""
+速率限制模块 - 令牌桶限流（每分钟请求数 / 每分钟 token 数）
+"""
+from typing import Dict, Optional, Tuple
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    令牌桶
+
+    容量为每分钟配额，按 capacity / 60 每秒匀速补充。采用"预约"方式扣减：
+    余量不足时余额可以为负，调用方按返回的等待时间休眠，因此同步和异步
+    调用方可以共享同一个桶。
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._available = self.capacity
+        self._updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """扣减 amount，返回需要等待的秒数"""
+        elapsed = now - self._updated
+        self._updated = now
+        self._available = min(self.capacity, self._available + elapsed * self.rate)
+        self._available -= amount
+
+        if self._available >= 0:
+            return 0.0
+        return -self._available / self.rate
+
+
+class RateLimiter:
+    """
+    请求速率限制器
+
+    同时限制每分钟请求数（RPM）和每分钟 token 数（TPM），并支持在收到
+    Retry-After 时暂停所有调用方。值为 0 表示不限制。
+    """
+
+    _shared: Dict[Tuple[str, int, int], "RateLimiter"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, key: str, requests_per_minute: int = 0, tokens_per_minute: int = 0) -> "RateLimiter":
+        """
+        获取进程内共享的限流器
+
+        同一个 Azure 部署的配额是共享的，因此以 key（如 "endpoint/deployment"）区分，
+        同一进程中的多个 DescriptionEnhancer 实例会使用同一个限流器。
+        """
+        registry_key = (key, requests_per_minute, tokens_per_minute)
+        with cls._shared_lock:
+            limiter = cls._shared.get(registry_key)
+            if limiter is None:
+                limiter = cls(requests_per_minute, tokens_per_minute)
+                cls._shared[registry_key] = limiter
+            return limiter
+
+    def reserve(self, tokens: int = 0) -> float:
+        """预约一次请求（含 tokens 个 token），返回需要等待的秒数"""
+        now = time.monotonic()
+        with self._lock:
+            delay = max(0.0, self._paused_until - now)
+            if self._requests is not None:
+                delay = max(delay, self._requests.reserve(1, now))
+            if self._tokens is not None and tokens > 0:
+                delay = max(delay, self._tokens.reserve(tokens, now))
+            return delay
+
+    def acquire(self, tokens: int = 0) -> float:
+        """阻塞直到允许发送请求，返回实际等待的秒数"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def aacquire(self, tokens: int = 0) -> float:
+        """等待直到允许发送请求（异步版本），返回实际等待的秒数"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def pause(self, seconds: float):
+        """在 seconds 秒内暂停所有调用方（用于遵守服务端的 Retry-After）"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """
+    从响应头中解析重试等待时间（秒）
+
+    支持 retry-after-ms、retry-after（秒数或 HTTP 日期）
+    """
+    if headers is None:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+
+    from email.utils import parsedate_to_datetime
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
@@ -0,0 +1,332 @@
+"""
+测试公共夹具
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+import asyncio
+import importlib.util
+import json
+import re
+import threading
+import time
+import uuid
+
+import pytest
+
+from api_to_mcp.config import AzureOpenAIConfig
+from api_to_mcp.models import APIEndpoint, APIParameter, APISpec
+
+
+# 回复函数: 请求体 -> (状态码, 额外响应头, 模型输出文本)
+Reply = Callable[[Dict[str, Any]], Tuple[int, Dict[str, str], str]]
+
+
+class FakeChatServer:
+    """
+    模拟 Azure OpenAI chat completions 接口的本地 HTTP 服务器
+
+    默认回复: 单端点提示词返回 "SUMMARY: ... / DESCRIPTION: ..."，批量提示词
+    （response_format 为 json_object）按端点列表返回 results。记录所有请求体和
+    同时处理中的最大请求数；reply 可替换为自定义回复函数，delay 为每个请求的处理耗时。
+    """
+
+    def __init__(self):
+        self.requests: List[Dict[str, Any]] = []
+        self.reply: Reply = self.default_reply
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @staticmethod
+    def default_reply(body: Dict[str, Any]) -> Tuple[int, Dict[str, str], str]:
+        prompt = body["messages"][-1]["content"]
+        if body.get("response_format", {}).get("type") == "json_object":
+            items = json.loads(re.search(r"端点列表（JSON）:\n(.*?)\n\n请为每个端点", prompt, re.S).group(1))
+            results = [
+                {
+                    "index": item["index"],
+                    "summary": f"Summary of {item['operation_id']}",
+                    "description": f"Description of {item['operation_id']}",
+                }
+                for item in items
+            ]
+            return 200, {}, json.dumps({"results": results})
+        operation_id = re.search(r"- 操作 ID: (.*)", prompt).group(1)
+        return 200, {}, f"SUMMARY: Summary of {operation_id}\nDESCRIPTION: Description of {operation_id}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server._lock:
+                    server.requests.append(body)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    if server.delay:
+                        time.sleep(server.delay)
+                    status, headers, content = server.reply(body)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+                if status == 200:
+                    payload = {
+                        "id": "chatcmpl-test",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body.get("model", "gpt-4o"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                    }
+                else:
+                    payload = {"error": {"code": str(status), "message": content}}
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def _clear_proxy_env(monkeypatch):
+    for name in ("HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "http_proxy", "https_proxy", "all_proxy"):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture
+def chat_server(monkeypatch):
+    """本地的假 chat completions 服务器（绕过代理设置）"""
+    _clear_proxy_env(monkeypatch)
+    server = FakeChatServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+class FakeUpstream:
+    """
+    模拟生成的服务器所调用的上游 API
+
+    记录每个请求的方法、路径、查询参数、headers 和请求体；默认以 JSON 回显请求，
+    reply 可替换为自定义回复函数（请求 -> (状态码, 额外响应头, 响应体)），delay 为
+    每个请求的处理耗时。
+    """
+
+    def __init__(self):
+        self.requests: List[Dict[str, Any]] = []
+        self.reply: Callable[[Dict[str, Any]], Tuple[int, Dict[str, str], Any]] = self.default_reply
+        self.delay = 0.0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @staticmethod
+    def default_reply(request: Dict[str, Any]) -> Tuple[int, Dict[str, str], Any]:
+        return 200, {}, {"method": request["method"], "path": request["path"], "query": request["query"]}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self):
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                request = {
+                    "method": self.command,
+                    "path": url.path,
+                    "query": dict(parse_qsl(url.query)),
+                    "headers": {name.lower(): value for name, value in self.headers.items()},
+                    "body": self.rfile.read(length) if length else b"",
+                }
+                with server._lock:
+                    server.requests.append(request)
+                if server.delay:
+                    time.sleep(server.delay)
+                status, headers, body = server.reply(request)
+
+                data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", headers.pop("Content-Type", "application/json"))
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _handle
+
+        return Handler
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """本地的假上游 API（绕过代理设置）"""
+    _clear_proxy_env(monkeypatch)
+    server = FakeUpstream()
+    server.start()
+    yield server
+    server.stop()
+
+
+def load_server(server_dir) -> Any:
+    """导入生成的 server.py（每次使用独立的模块名，需要 fastmcp）"""
+    path = Path(server_dir) / "server.py"
+    spec = importlib.util.spec_from_file_location(f"generated_server_{uuid.uuid4().hex}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_client(module: Any, func: Callable[[Any], Awaitable[Any]]) -> Any:
+    """通过 fastmcp 的内存客户端连接生成的服务器并执行 func(client)"""
+    from fastmcp import Client
+
+    async def main():
+        async with Client(module.mcp) as client:
+            return await func(client)
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def azure_config(chat_server) -> AzureOpenAIConfig:
+    """指向假服务器的 Azure OpenAI 配置（短退避，测试中不会长时间等待）"""
+    return AzureOpenAIConfig(
+        endpoint=chat_server.url,
+        api_key="test-key",
+        max_retries=3,
+        retry_backoff_base=0.01,
+        retry_backoff_max=5.0,
+    )
+
+
+def make_endpoint(
+    operation_id: str,
+    path: Optional[str] = None,
+    method: str = "GET",
+    summary: Optional[str] = None,
+    description: Optional[str] = None,
+    parameters: Optional[List[APIParameter]] = None,
+    **kwargs: Any,
+) -> APIEndpoint:
+    """构造测试用端点（默认没有摘要和描述，因此需要增强）"""
+    return APIEndpoint(
+        path=path or f"/{operation_id}",
+        method=method,
+        operation_id=operation_id,
+        summary=summary,
+        description=description,
+        parameters=parameters or [],
+        **kwargs,
+    )
+
+
+def make_spec(endpoints: List[APIEndpoint], title: str = "Test API", **kwargs: Any) -> APISpec:
+    """构造测试用 API 规范"""
+    kwargs.setdefault("base_url", "https://api.example.com")
+    return APISpec(title=title, version="1.0.0", endpoints=endpoints, **kwargs)
+
+
+def sample_openapi(base_url: str = "https://api.example.com/v1") -> Dict[str, Any]:
+    """测试用的 OpenAPI 3 规范（含路径参数、x-cache-ttl、响应 schema 和 apiKey 认证）"""
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "Sample API", "version": "1.2.0", "description": "用于测试的示例 API"},
+        "servers": [{"url": base_url}],
+        "components": {
+            "securitySchemes": {"ApiKeyAuth": {"type": "apiKey", "in": "header", "name": "X-API-Key"}},
+            "schemas": {
+                "Item": {
+                    "type": "object",
+                    "properties": {"id": {"type": "integer"}, "name": {"type": "string"}},
+                },
+            },
+        },
+        "paths": {
+            "/items": {
+                "get": {
+                    "operationId": "listItems",
+                    "summary": "List items",
+                    "x-cache-ttl": 60,
+                    "parameters": [
+                        {"name": "limit", "in": "query", "schema": {"type": "integer", "default": 10}},
+                        {"name": "q", "in": "query", "schema": {"type": "string"}, "description": "Search text"},
+                    ],
+                    "responses": {"200": {"description": "OK", "content": {"application/json": {"schema": {
+                        "type": "object",
+                        "properties": {
+                            "total": {"type": "integer"},
+                            "items": {"type": "array", "items": {"$ref": "#/components/schemas/Item"}},
+                        },
+                    }}}}},
+                },
+                "post": {
+                    "operationId": "createItem",
+                    "summary": "Create an item",
+                    "parameters": [{"name": "name", "in": "query", "required": True, "schema": {"type": "string"}}],
+                    "responses": {"201": {"description": "Created"}},
+                },
+            },
+            "/items/{item_id}": {
+                "get": {
+                    "operationId": "getItem",
+                    "description": "Fetch a single item by id",
+                    "parameters": [{"name": "item_id", "in": "path", "required": True, "schema": {"type": "integer"}}],
+                    "responses": {"200": {"description": "OK"}},
+                },
+            },
+            "/health": {
+                "get": {"operationId": "health", "responses": {"200": {"description": "OK"}}},
+            },
+        },
+    }
@@ -0,0 +1,87 @@
+"""
+启动基准测试
+"""
+import json
+
+import pytest
+
+from api_to_mcp.bench import StartupBenchmark, parse_importtime, percentile
+from api_to_mcp.generator import MCPGenerator
+from api_to_mcp.parsers import OpenAPIParser
+
+from conftest import sample_openapi
+
+
+# 不依赖 fastmcp 的最小 stdio 服务器；替换了 sys.stderr，基准拿不到导入耗时标记
+FAKE_SERVER = '''
+import json, os, sys
+sys.stderr = open(os.devnull, "w")
+
+
+class _FakeMCP:
+    def run(self, transport):
+        for line in sys.stdin:
+            message = json.loads(line)
+            if "id" not in message:
+                continue
+            result = {"tools": [{"name": "ping"}]} if message["method"] == "tools/list" else {}
+            sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}) + "\\n")
+            sys.stdout.flush()
+
+
+mcp = _FakeMCP()
+'''
+
+
+def test_percentile():
+    assert percentile([], 50) == 0.0
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert percentile([1.0, 2.0], 95) == pytest.approx(1.95)
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   json.decoder\n"
+        "import time:       900 |       1020 | server\n"
+        "unrelated line\n"
+    )
+    entries = parse_importtime(stderr)
+    assert [entry["module"] for entry in entries] == ["server", "json.decoder"]
+    assert entries[0]["cumulative_us"] == 1020
+
+
+def test_runs_must_be_positive(tmp_path):
+    with pytest.raises(ValueError, match="runs"):
+        StartupBenchmark(tmp_path).run(runs=0)
+
+
+def test_server_crash_reports_stderr(tmp_path):
+    (tmp_path / "server.py").write_text('import sys\nsys.stderr.write("kaboom\\n")\nsys.exit(3)\n', encoding="utf-8")
+    with pytest.raises(RuntimeError, match="initialize 响应前退出") as excinfo:
+        StartupBenchmark(tmp_path, timeout=30).measure_once()
+    assert "kaboom" in str(excinfo.value)
+
+
+def test_missing_import_marker(tmp_path, capsys):
+    (tmp_path / "server.py").write_text(FAKE_SERVER, encoding="utf-8")
+
+    result = StartupBenchmark(tmp_path, timeout=30).run(runs=2, warmup=0, top=3)
+
+    assert result["tools"] == 1
+    assert result["import"] == {"p50": None, "p95": None, "samples": []}
+    assert len(result["tools_list"]["samples"]) == 2
+    output = capsys.readouterr().out
+    assert "n/a" in output and "无数据" in output
+
+
+def test_generated_server(tmp_path):
+    pytest.importorskip("fastmcp", exc_type=ImportError)
+    server = MCPGenerator(output_dir=str(tmp_path)).generate(OpenAPIParser().parse_dict(sample_openapi()))
+
+    result = StartupBenchmark(server.output_path, timeout=60).run(runs=1, warmup=0, top=3)
+
+    assert result["tools"] == 4
+    assert result["import"]["p50"] > 0
+    assert len(result["importtime_top"]) == 3
+    json.dumps(result)
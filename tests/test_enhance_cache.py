@@ -0,0 +1,104 @@
+"""
+EnhancementCache 测试
+"""
+import json
+import time
+
+from click.testing import CliRunner
+
+from api_to_mcp.cli import cli
+from api_to_mcp.config import EnhanceCacheConfig
+from api_to_mcp.enhance_cache import EnhancementCache
+from api_to_mcp.enhancer import DescriptionEnhancer
+
+from conftest import make_endpoint, make_spec
+
+
+def _cache(tmp_path, **kwargs) -> EnhancementCache:
+    return EnhancementCache(EnhanceCacheConfig(path=str(tmp_path / "enhance.sqlite3"), **kwargs))
+
+
+def test_get_set_and_persistence(tmp_path):
+    key = EnhancementCache.make_key("prompt", "gpt-4o", 0.3)
+    with _cache(tmp_path) as cache:
+        assert cache.get(key) is None
+        cache.set(key, "summary", "description")
+        assert cache.get(key) == ("summary", "description")
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    with _cache(tmp_path) as cache:
+        assert cache.get(key) == ("summary", "description")
+
+
+def test_key_depends_on_prompt_deployment_and_temperature():
+    keys = {
+        EnhancementCache.make_key("prompt", "gpt-4o", 0.3),
+        EnhancementCache.make_key("prompt!", "gpt-4o", 0.3),
+        EnhancementCache.make_key("prompt", "gpt-4o-mini", 0.3),
+        EnhancementCache.make_key("prompt", "gpt-4o", 0.5),
+    }
+    assert len(keys) == 4
+
+
+def test_evicts_least_recently_accessed(tmp_path):
+    with _cache(tmp_path, max_entries=2) as cache:
+        for name in ("a", "b", "c"):
+            cache.set(name, name, name)
+            time.sleep(0.01)
+        cache.get("a")
+        assert cache.evict() == 1
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") == ("a", "a")
+
+
+def test_expired_entries_are_misses(tmp_path):
+    with _cache(tmp_path, max_age_days=1) as cache:
+        cache.set("old", "s", "d")
+        cache._conn.execute("UPDATE enhancements SET created_at = ?", (time.time() - 2 * 86400,))
+        assert cache.get("old") is None
+        assert cache.evict() == 1
+
+
+def test_close_is_idempotent(tmp_path):
+    cache = _cache(tmp_path)
+    cache.close()
+    cache.close()
+    assert cache.closed
+
+
+def test_cache_hit_skips_model_request(chat_server, azure_config, tmp_path):
+    with _cache(tmp_path) as cache:
+        spec = make_spec([make_endpoint("op0", summary="Op 0")])
+        DescriptionEnhancer(config=azure_config, cache=cache).enhance_api_spec(spec)
+        assert len(chat_server.requests) == 1
+
+        spec = make_spec([make_endpoint("op0", summary="Op 0")])
+        DescriptionEnhancer(config=azure_config, cache=cache).enhance_api_spec(spec)
+        assert len(chat_server.requests) == 1
+        assert spec.endpoints[0].enhanced_summary == "Summary of op0"
+
+
+def test_cli_closes_cache(chat_server, tmp_path, monkeypatch):
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", chat_server.url)
+    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("API_TO_MCP_ENHANCE_CACHE", str(tmp_path / "enhance.sqlite3"))
+    closed = []
+    original_close = EnhancementCache.close
+    monkeypatch.setattr(EnhancementCache, "close", lambda self: closed.append(self) or original_close(self))
+
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps({
+        "openapi": "3.0.0",
+        "info": {"title": "Cache Test", "version": "1.0.0"},
+        "servers": [{"url": "https://api.example.com"}],
+        "paths": {"/items": {"get": {"operationId": "listItems", "responses": {"200": {"description": "OK"}}}}},
+    }))
+
+    result = CliRunner().invoke(cli, [
+        "convert", str(spec_file), "-o", str(tmp_path / "out"), "--enhance-cache", "--no-spec-cache"
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert len(chat_server.requests) == 1
+    assert len(closed) == 1 and closed[0].closed
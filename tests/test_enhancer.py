@@ -0,0 +1,234 @@
+"""
+DescriptionEnhancer 测试（使用本地的假 chat completions 服务器）
+"""
+import asyncio
+import json
+import time
+
+import pytest
+
+from api_to_mcp.config import AzureOpenAIConfig
+from api_to_mcp.enhancer import DescriptionEnhancer
+from api_to_mcp.models import APIParameter
+
+from conftest import make_endpoint, make_spec
+
+
+def _spec(count: int):
+    # 摘要过短，仍需要增强；各端点内容不同，不会被去重
+    return make_spec([make_endpoint(f"op{i}", summary=f"Op {i}") for i in range(count)])
+
+
+def test_default_config_is_sequential(monkeypatch):
+    monkeypatch.delenv("AZURE_OPENAI_MAX_CONCURRENCY", raising=False)
+    assert AzureOpenAIConfig().max_concurrency == 1
+    assert AzureOpenAIConfig.from_env().max_concurrency == 1
+
+
+def test_sequential_enhancement(chat_server, azure_config):
+    chat_server.delay = 0.05
+    spec = _spec(4)
+
+    DescriptionEnhancer(config=azure_config).enhance_api_spec(spec)
+
+    assert chat_server.max_in_flight == 1
+    assert len(chat_server.requests) == 4
+    for i, endpoint in enumerate(spec.endpoints):
+        assert endpoint.enhanced_summary == f"Summary of op{i}"
+        assert endpoint.enhanced_description == f"Description of op{i}"
+
+
+def test_concurrent_enhancement_respects_limit(chat_server, azure_config):
+    chat_server.delay = 0.2
+    spec = _spec(8)
+
+    started = time.monotonic()
+    DescriptionEnhancer(config=azure_config).enhance_api_spec(spec, concurrency=4)
+    elapsed = time.monotonic() - started
+
+    assert 1 < chat_server.max_in_flight <= 4
+    assert len(chat_server.requests) == 8
+    # 8 个请求、并发 4: 约两轮，远小于顺序执行的 1.6 秒
+    assert elapsed < 1.2
+    # 端点顺序与结果一一对应
+    assert [endpoint.enhanced_summary for endpoint in spec.endpoints] == [f"Summary of op{i}" for i in range(8)]
+
+
+def test_sync_call_inside_running_loop_falls_back(chat_server, azure_config):
+    spec = _spec(3)
+
+    async def main():
+        return DescriptionEnhancer(config=azure_config).enhance_api_spec(spec, concurrency=4)
+
+    asyncio.run(main())
+
+    assert chat_server.max_in_flight == 1
+    assert all(endpoint.enhanced_summary for endpoint in spec.endpoints)
+
+
+def test_aenhance_api_spec_inside_running_loop(chat_server, azure_config):
+    chat_server.delay = 0.1
+    spec = _spec(4)
+
+    async def main():
+        enhancer = DescriptionEnhancer(config=azure_config)
+        try:
+            await enhancer.aenhance_api_spec(spec, concurrency=2)
+        finally:
+            await enhancer.aclose()
+
+    asyncio.run(main())
+
+    assert chat_server.max_in_flight == 2
+    assert all(endpoint.enhanced_summary for endpoint in spec.endpoints)
+
+
+@pytest.mark.parametrize("concurrency", [1, 2])
+def test_retry_after_on_429(chat_server, azure_config, concurrency):
+    default_reply = chat_server.reply
+    throttled = []
+
+    def reply(body):
+        if not throttled:
+            throttled.append(time.monotonic())
+            return 429, {"Retry-After": "0.3"}, "Rate limit exceeded"
+        return default_reply(body)
+
+    chat_server.reply = reply
+    spec = _spec(1)
+    enhancer = DescriptionEnhancer(config=azure_config)
+
+    enhancer.enhance_api_spec(spec, concurrency=concurrency)
+
+    assert len(chat_server.requests) == 2
+    assert enhancer.metrics.throttled == 1
+    assert enhancer.metrics.retried == 1
+    assert enhancer.metrics.fallback == 0
+    assert spec.endpoints[0].enhanced_summary == "Summary of op0"
+    # 按 Retry-After 等待后才重试
+    assert time.monotonic() - throttled[0] >= 0.3
+
+
+def test_retries_exhausted_fall_back_to_original(chat_server, azure_config):
+    chat_server.reply = lambda body: (500, {}, "boom")
+    azure_config.max_retries = 1
+    spec = make_spec([make_endpoint("op0", summary="Short")])
+    enhancer = DescriptionEnhancer(config=azure_config)
+
+    enhancer.enhance_api_spec(spec)
+
+    assert len(chat_server.requests) == 2
+    assert enhancer.metrics.fallback == 1
+    assert spec.endpoints[0].enhanced_summary == "Short"
+
+
+def test_batch_falls_back_to_single_requests(chat_server, azure_config):
+    default_reply = chat_server.reply
+
+    def reply(body):
+        status, headers, content = default_reply(body)
+        if body.get("response_format"):
+            # 批量结果缺少 index 1，且 index 2 的描述为空
+            results = json.loads(content)["results"]
+            results = [item for item in results if item["index"] != 1]
+            results[1]["description"] = ""
+            content = json.dumps({"results": results})
+        return status, headers, content
+
+    chat_server.reply = reply
+    spec = _spec(4)
+
+    DescriptionEnhancer(config=azure_config).enhance_api_spec(spec, batch_size=4)
+
+    batch_requests = [body for body in chat_server.requests if body.get("response_format")]
+    single_requests = [body for body in chat_server.requests if not body.get("response_format")]
+    assert len(batch_requests) == 1
+    assert len(single_requests) == 2
+    assert [endpoint.enhanced_summary for endpoint in spec.endpoints] == [f"Summary of op{i}" for i in range(4)]
+
+
+@pytest.mark.parametrize("concurrency", [1, 2])
+def test_invalid_batch_response_falls_back(chat_server, azure_config, concurrency):
+    default_reply = chat_server.reply
+
+    def reply(body):
+        if body.get("response_format"):
+            return 200, {}, "not json"
+        return default_reply(body)
+
+    chat_server.reply = reply
+    spec = _spec(3)
+
+    DescriptionEnhancer(config=azure_config).enhance_api_spec(spec, concurrency=concurrency, batch_size=3)
+
+    assert len(chat_server.requests) == 4
+    assert all(endpoint.enhanced_description for endpoint in spec.endpoints)
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_batch_packs_endpoints(chat_server, azure_config, concurrency):
+    spec = _spec(5)
+
+    DescriptionEnhancer(config=azure_config).enhance_api_spec(spec, concurrency=concurrency, batch_size=2)
+
+    batch_requests = [body for body in chat_server.requests if body.get("response_format")]
+    single_requests = [body for body in chat_server.requests if not body.get("response_format")]
+    # 5 个端点按 2 个一批: 两次批量请求，剩下的单个端点使用单端点提示词
+    assert len(batch_requests) == 2
+    assert len(single_requests) == 1
+    assert all(body["max_tokens"] == 2 * DescriptionEnhancer.max_tokens for body in batch_requests)
+    assert [endpoint.enhanced_summary for endpoint in spec.endpoints] == [f"Summary of op{i}" for i in range(5)]
+
+
+def test_batch_prompt_lists_endpoints(azure_config):
+    enhancer = DescriptionEnhancer(config=azure_config)
+    endpoints = [make_endpoint("op0", summary="Op 0"), make_endpoint("op1", path="/items/{id}", method="DELETE")]
+
+    prompt = enhancer._build_batch_prompt(endpoints, "API 名称: Test API\n")
+
+    items = json.loads(prompt.split("端点列表（JSON）:\n", 1)[1].split("\n\n请为每个端点", 1)[0])
+    assert [(item["index"], item["operation_id"], item["method"], item["path"]) for item in items] == [
+        (0, "op0", "GET", "/op0"),
+        (1, "op1", "DELETE", "/items/{id}"),
+    ]
+    assert "API 名称: Test API" in prompt
+
+
+def test_batch_result_ignores_out_of_range_indexes(azure_config):
+    enhancer = DescriptionEnhancer(config=azure_config)
+    batch = [(make_endpoint("op0"), None), (make_endpoint("op1"), None)]
+    content = json.dumps({"results": [
+        {"index": 0, "summary": "S0", "description": "D0"},
+        {"index": 5, "summary": "S5", "description": "D5"},
+        {"index": "1", "summary": "S1", "description": "D1"},
+    ]})
+
+    failed = enhancer._apply_batch_result(batch, content)
+
+    assert failed == [batch[1][0]]
+    assert (batch[0][0].enhanced_summary, batch[0][0].enhanced_description) == ("S0", "D0")
+
+
+def test_duplicate_endpoints_are_enhanced_once(chat_server, azure_config):
+    spec = make_spec([
+        make_endpoint("getQuote", path="/quote", summary="Quote"),
+        make_endpoint("x-get-quote", path="/x-get-quote", summary="Quote"),
+    ])
+
+    DescriptionEnhancer(config=azure_config).enhance_api_spec(spec)
+
+    assert len(chat_server.requests) == 1
+    assert spec.endpoints[1].enhanced_summary == spec.endpoints[0].enhanced_summary == "Summary of getQuote"
+
+
+def test_undocumented_endpoints_get_own_descriptions(chat_server, azure_config):
+    spec = make_spec([
+        make_endpoint("health", path="/health", parameters=[APIParameter(name="verbose", type="boolean")]),
+        make_endpoint("version", path="/version", parameters=[APIParameter(name="verbose", type="boolean")]),
+    ])
+
+    DescriptionEnhancer(config=azure_config).enhance_api_spec(spec)
+
+    assert len(chat_server.requests) == 2
+    assert spec.endpoints[0].enhanced_description == "Description of health"
+    assert spec.endpoints[1].enhanced_description == "Description of version"
@@ -0,0 +1,199 @@
+"""
+多 API 网关测试（需要 fastmcp，调用本地的假上游 API）
+"""
+from types import SimpleNamespace
+import asyncio
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from api_to_mcp.generator import MCPGenerator, ServerOptions
+from api_to_mcp.models import APIParameter
+
+from conftest import FakeUpstream, load_server, make_endpoint, make_spec, run_client
+
+pytest.importorskip("fastmcp", exc_type=ImportError)
+
+from api_to_mcp.gateway import Gateway, discover_apis, inspect_server, load_api  # noqa: E402
+
+
+def _spec(upstream, **kwargs):
+    kwargs.setdefault("base_url", f"{upstream.url}/v1")
+    return make_spec([
+        make_endpoint("createItem", path="/items", method="POST", summary="Create"),
+        make_endpoint("list-items.v2", path="/items", summary="List",
+                      parameters=[APIParameter(name="limit", type="integer")]),
+        make_endpoint("getItem__internal", path="/items/{item_id}", summary="Get",
+                      parameters=[APIParameter(name="item_id", type="integer", required=True)]),
+        make_endpoint("dup", path="/a", summary="A"),
+        make_endpoint("dup", path="/b", summary="B"),
+        make_endpoint(None, path="/Health/check", summary="Health"),
+    ], **kwargs)
+
+
+def _tool_names(module):
+    async def names(client):
+        return [tool.name for tool in await client.list_tools()]
+    return run_client(module, names)
+
+
+@pytest.mark.parametrize("options", [
+    ServerOptions(),
+    ServerOptions(spec_mode="sidecar"),
+    ServerOptions(lazy_tools=True),
+    ServerOptions(lazy_tools=True, spec_mode="sidecar"),
+])
+def test_gateway_tool_names_match_server(tmp_path, upstream, options):
+    server = MCPGenerator(output_dir=str(tmp_path)).generate(_spec(upstream), custom_name="shop", options=options)
+    gateway = Gateway([load_api(server.output_path)])
+
+    names = _tool_names(SimpleNamespace(mcp=gateway.build()))
+
+    assert names == [f"shop_{name}" for name in _tool_names(load_server(server.output_path))]
+    assert "shop_list_items_v2" in names and "shop_dup_2" in names
+
+
+@pytest.mark.parametrize("auth_config, expected_query, expected_headers", [
+    ({"type": "apiKey", "in": "header", "name": "X-Key"}, {}, {"x-key": "secret"}),
+    ({"type": "apiKey", "in": "query", "name": "key"}, {"key": "secret"}, {}),
+    ({"type": "apiKey", "in": "cookie", "name": "session"}, {}, {"cookie": "session=secret"}),
+])
+def test_gateway_sends_api_key(tmp_path, upstream, monkeypatch, auth_config, expected_query, expected_headers):
+    monkeypatch.setenv("SHOP_API_KEY", "secret")
+    api_spec = _spec(upstream, auth_type="apikey", auth_config=auth_config)
+    server = MCPGenerator(output_dir=str(tmp_path)).generate(api_spec, custom_name="shop")
+    gateway = Gateway([load_api(server.output_path)])
+
+    async def call(client):
+        await client.call_tool("shop_getItem", {"item_id": 3})
+        await client.call_tool("shop_list_items_v2", {"limit": 2})
+
+    run_client(SimpleNamespace(mcp=gateway.build()), call)
+
+    first, second = upstream.requests
+    assert first["path"] == "/v1/items/3" and first["query"] == expected_query
+    assert second["query"] == {**expected_query, "limit": "2"}
+    for request in (first, second):
+        assert {name: request["headers"].get(name) for name in expected_headers} == expected_headers
+        assert "authorization" not in request["headers"]
+
+
+@pytest.mark.parametrize("options, transport, base_path, feature", [
+    (ServerOptions(cache_ttl=30), "stdio", "/v1", "响应缓存"),
+    (ServerOptions(coalesce_requests=True), "stdio", "/v1", "请求合并"),
+    (ServerOptions(lazy_tools=True, response_projection=True), "stdio", "/v1", "响应裁剪"),
+    (ServerOptions(metrics=True), "sse", "/v1", "Prometheus 指标"),
+])
+def test_gateway_rejects_unsupported_features(tmp_path, upstream, capsys, options, transport, base_path, feature):
+    generator = MCPGenerator(output_dir=str(tmp_path))
+    generator.generate(_spec(upstream), custom_name="plain")
+    featured = generator.generate(
+        _spec(upstream, base_url=f"{upstream.url}{base_path}"), custom_name="featured",
+        transport=transport, options=options
+    )
+
+    features = inspect_server((tmp_path / "featured" / "server.py").read_text(encoding="utf-8"))["features"]
+    assert len(features) == 1 and features[0].startswith(feature)
+    assert inspect_server((tmp_path / "plain" / "server.py").read_text(encoding="utf-8"))["features"] == []
+
+    with pytest.raises(ValueError, match=feature):
+        load_api(featured.output_path)
+    assert [api.name for api in discover_apis(tmp_path)] == ["plain"]
+    assert f"跳过 featured: 依赖网关不支持的功能: {feature}" in capsys.readouterr().err
+
+    apis = discover_apis(tmp_path, allow_unsupported=True)
+    assert [(api.name, api.unsupported) for api in apis] == [("featured", features), ("plain", [])]
+    assert "featured: 网关不支持" in capsys.readouterr().err
+    # 响应裁剪参数不会出现在网关的工具中
+    schema = apis[0].tool_table[0][2]
+    assert "max_items" not in schema["properties"]
+
+
+def test_gateway_forwards_client_headers(tmp_path, upstream, monkeypatch):
+    monkeypatch.setenv("SHOP_API_KEY", "secret")
+    # 与 LazyAPITool 一样转发 MCP 客户端的 HTTP headers，同名时覆盖认证 headers
+    monkeypatch.setattr("api_to_mcp.gateway.get_http_headers", lambda: {"authorization": "override", "x-trace": "1"})
+    api_spec = _spec(upstream, auth_type="http", auth_config={"type": "http", "scheme": "bearer"})
+    server = MCPGenerator(output_dir=str(tmp_path)).generate(api_spec, custom_name="shop")
+    gateway = Gateway([load_api(server.output_path)])
+
+    run_client(SimpleNamespace(mcp=gateway.build()), lambda client: client.call_tool("shop_dup", {}))
+
+    headers = upstream.requests[-1]["headers"]
+    assert headers["authorization"] == "override" and headers["x-trace"] == "1"
+
+
+def _rapidapi_gateway(tmp_path, upstream, names=("alpha",)):
+    """默认选项生成的 RapidAPI 服务器（及一个普通服务器）经 discover_apis 加载到网关"""
+    generator = MCPGenerator(output_dir=str(tmp_path))
+    generator.generate(_spec(upstream), custom_name="plain")
+    for name in names:
+        generator.generate(_spec(upstream, base_url=f"{upstream.url}/rapidapi.com"), custom_name=name)
+    apis = discover_apis(tmp_path)
+    assert [api.name for api in apis] == sorted([*names, "plain"])
+    gateway = Gateway(apis)
+    return gateway, SimpleNamespace(mcp=gateway.build())
+
+
+def _timed_reply(times, first=None):
+    """记录每个上游请求的时间；first 为第一个请求的回复"""
+    def reply(request):
+        times.append(time.monotonic())
+        if len(times) == 1 and first is not None:
+            return first
+        return FakeUpstream.default_reply(request)
+    return reply
+
+
+def test_gateway_rapidapi_rate_limit(tmp_path, upstream, monkeypatch):
+    monkeypatch.setenv("ALPHA_RATE_LIMIT_PER_SECOND", "10")
+    monkeypatch.setenv("RATE_LIMIT_PER_SECOND", "5")
+    times = []
+    upstream.reply = _timed_reply(times)
+    gateway, server = _rapidapi_gateway(tmp_path, upstream, names=("alpha", "beta"))
+
+    async def run(client):
+        return await asyncio.gather(*(client.call_tool("alpha_dup", {}) for _ in range(4)))
+
+    results = run_client(server, run)
+
+    assert not any(result.is_error for result in results)
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert min(gaps) >= 0.08
+    # 同一主机共用一个客户端，各 API 分别限流
+    assert len(gateway.clients) == 1
+    assert {name: guard.limiter.rate for name, guard in gateway.guards.items()} == {"alpha": 10.0, "beta": 5.0}
+    assert gateway.guards["alpha"].stats()["throttled"] == 3
+    assert gateway.guards["beta"].stats()["throttled"] == 0
+
+
+def test_gateway_rapidapi_retry_after_and_quota(tmp_path, upstream):
+    times = []
+    upstream.reply = _timed_reply(times, first=(429, {"Retry-After": "0.3"}, {"error": "slow down"}))
+    gateway, server = _rapidapi_gateway(tmp_path, upstream)
+    quota_exhausted = (200, {"x-ratelimit-requests-remaining": "0", "x-ratelimit-requests-reset": "3600"}, {"ok": True})
+
+    async def run(client):
+        retried = await client.call_tool("alpha_dup", {}, raise_on_error=False)
+        upstream.reply = lambda request: quota_exhausted
+        last = await client.call_tool("alpha_dup", {}, raise_on_error=False)
+        blocked = await client.call_tool("alpha_dup", {}, raise_on_error=False)
+        return retried, last, blocked
+
+    retried, last, blocked = run_client(server, run)
+
+    assert not retried.is_error
+    assert len(times) == 2 and times[1] - times[0] >= 0.25
+    assert not last.is_error and blocked.is_error
+    assert "配额" in blocked.content[0].text
+    assert len(upstream.requests) == 3
+    # 重试在暂停结束前等待，计为一次限流
+    assert gateway.guards["alpha"].stats() == {"throttled": 1, "retries_429": 1, "quota_remaining": 0}
+
+
+def test_serve_many_cli_option():
+    from api_to_mcp.cli import cli
+
+    result = CliRunner().invoke(cli, ["serve-many", "--help"])
+    assert "--allow-unsupported" in result.output
@@ -0,0 +1,506 @@
+"""
+生成的服务器运行时测试（需要 fastmcp，调用本地的假上游 API）
+"""
+import asyncio
+import importlib.util
+import time
+
+import pytest
+
+from api_to_mcp.config import HTTPClientProfile
+from api_to_mcp.generator import MCPGenerator, ServerOptions
+from api_to_mcp.models import APIParameter
+from api_to_mcp.parsers import OpenAPIParser
+
+from conftest import FakeUpstream, load_server, make_endpoint, make_spec, run_client, sample_openapi
+
+pytest.importorskip("fastmcp", exc_type=ImportError)
+
+
+def _generate(tmp_path, upstream, options=None, name="server", transport="stdio", spec=None):
+    spec = spec or sample_openapi(base_url=f"{upstream.url}/v1")
+    api_spec = OpenAPIParser().parse_dict(spec)
+    server = MCPGenerator(output_dir=str(tmp_path / name)).generate(api_spec, transport=transport, options=options)
+    return load_server(server.output_path)
+
+
+async def _list_and_call(client):
+    tools = {tool.name: tool.inputSchema for tool in await client.list_tools()}
+    result = await client.call_tool("getItem", {"item_id": 7})
+    return tools, result.structured_content
+
+
+@pytest.mark.parametrize("lazy_tools", [False, True])
+def test_sidecar_server_matches_inline(tmp_path, upstream, lazy_tools):
+    inline = _generate(tmp_path, upstream, ServerOptions(lazy_tools=lazy_tools), name="inline")
+    sidecar = _generate(tmp_path, upstream, ServerOptions(spec_mode="sidecar", lazy_tools=lazy_tools), name="sidecar")
+
+    inline_tools, inline_result = run_client(inline, _list_and_call)
+    sidecar_tools, sidecar_result = run_client(sidecar, _list_and_call)
+
+    assert sidecar_tools == inline_tools
+    assert sidecar_result == inline_result
+    assert inline_result["path"].startswith("/v1/items/")
+    assert len(upstream.requests) == 2
+
+
+def _tricky_spec(upstream):
+    return make_spec([
+        make_endpoint("createItem", path="/items", method="POST", summary="Create"),
+        make_endpoint("list-items.v2", path="/items", summary="List"),
+        make_endpoint("getItem__internal", path="/items/{item_id}", summary="Get",
+                      parameters=[APIParameter(name="item_id", type="integer", required=True)]),
+        make_endpoint(None, path="/Health/check", summary="Health"),
+        make_endpoint("dup", path="/a", summary="A"),
+        make_endpoint("dup", path="/b", summary="B"),
+        make_endpoint("dup", path="/a", method="DELETE", summary="Delete A"),
+        make_endpoint("x" * 70, path="/long", summary="Long"),
+        # 同一路径和方法的后一个操作覆盖前者
+        make_endpoint("replaced", path="/b", summary="Old"),
+        make_endpoint("ListItems", path="/items", method="PUT", summary="Replace"),
+    ], base_url=f"{upstream.url}/v1")
+
+
+def test_lazy_tool_names_match_from_openapi(tmp_path, upstream):
+    api_spec = _tricky_spec(upstream)
+    eager = MCPGenerator(output_dir=str(tmp_path / "eager")).generate(api_spec)
+    lazy = MCPGenerator(output_dir=str(tmp_path / "lazy")).generate(api_spec, options=ServerOptions(lazy_tools=True))
+
+    async def names(client):
+        return [tool.name for tool in await client.list_tools()]
+
+    eager_names = run_client(load_server(eager.output_path), names)
+    lazy_names = run_client(load_server(lazy.output_path), names)
+
+    assert lazy_names == eager_names
+    assert "list_items_v2" in lazy_names and "getItem" in lazy_names and "x" * 56 in lazy_names
+    assert lazy_names.count("dup") == 1 and "dup_2" in lazy_names and "dup_3" not in lazy_names
+
+    async def call(client):
+        return (await client.call_tool("getItem", {"item_id": 3})).structured_content
+
+    assert run_client(load_server(lazy.output_path), call)["path"] == "/v1/items/3"
+
+
+def _pool(transport):
+    # httpx.AsyncHTTPTransport 的 httpcore 连接池
+    return transport._pool
+
+
+def test_client_profile_applies_to_client(tmp_path, upstream, monkeypatch):
+    profile = HTTPClientProfile(max_connections=7, max_keepalive_connections=3, keepalive_expiry=4.0,
+                                http2=True, connect_timeout=2.0, read_timeout=9.0)
+    monkeypatch.setenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "2")
+    module = _generate(tmp_path, upstream, ServerOptions(client_profile=profile))
+
+    assert (module.HTTP_MAX_CONNECTIONS, module.HTTP_MAX_KEEPALIVE_CONNECTIONS) == (7, 2)
+    assert (module.client.timeout.connect, module.client.timeout.read) == (2.0, 9.0)
+    pool = _pool(module.client._transport)
+    assert (pool._max_connections, pool._max_keepalive_connections, pool._keepalive_expiry) == (7, 2, 4.0)
+    # 未安装 h2 时退回 HTTP/1.1
+    assert module.HTTP2 is (importlib.util.find_spec("h2") is not None)
+
+    result = run_client(module, lambda client: client.call_tool("health", {}))
+    assert result.structured_content["path"] == "/v1/health"
+
+
+def test_client_profile_with_upstream_transport(tmp_path, upstream):
+    profile = HTTPClientProfile(max_connections=5, read_timeout=3.0)
+    module = _generate(tmp_path, upstream, ServerOptions(client_profile=profile, cache_ttl=10))
+
+    assert module.client.timeout.read == 3.0
+    assert _pool(module.upstream_transport._transport)._max_connections == 5
+
+
+def test_default_client_keeps_httpx_defaults(tmp_path, upstream):
+    module = _generate(tmp_path, upstream)
+    assert not hasattr(module, "HTTP_MAX_CONNECTIONS")
+    assert module.client.timeout.read == 30.0
+
+
+@pytest.mark.parametrize("auth_type, auth_config, header", [
+    ("apikey", {"type": "apikey", "in": "header", "name": "X-Key"}, "x-key"),
+    ("http", {"type": "http", "scheme": "bearer"}, "authorization"),
+    ("oauth2", {"type": "oauth2"}, "authorization"),
+])
+def test_auth_header_sent_once_per_client(tmp_path, upstream, monkeypatch, auth_type, auth_config, header):
+    monkeypatch.setenv("API_KEY", "secret")
+    api_spec = make_spec([make_endpoint("health", summary="Health")], base_url=f"{upstream.url}/v1",
+                         auth_type=auth_type, auth_config=auth_config)
+    server = MCPGenerator(output_dir=str(tmp_path)).generate(api_spec)
+    module = load_server(server.output_path)
+
+    run_client(module, lambda client: client.call_tool("health", {}))
+
+    # 原样发送 API_KEY，不添加前缀
+    assert upstream.requests[-1]["headers"][header] == "secret"
+
+
+def test_rapidapi_headers(tmp_path, upstream, monkeypatch):
+    monkeypatch.setenv("API_KEY", "secret")
+    # base_url 包含 rapidapi.com 时按 RapidAPI 处理
+    api_spec = make_spec([make_endpoint("health", summary="Health")], base_url=f"{upstream.url}/rapidapi.com")
+    module = load_server(MCPGenerator(output_dir=str(tmp_path)).generate(api_spec).output_path)
+
+    run_client(module, lambda client: client.call_tool("health", {}))
+
+    headers = upstream.requests[-1]["headers"]
+    assert headers["x-rapidapi-key"] == "secret"
+    assert headers["x-rapidapi-host"] == f"{upstream.url[len('http://'):]}/rapidapi.com"
+    assert "content-type" not in headers
+
+
+@pytest.mark.parametrize("lazy_tools", [False, True])
+@pytest.mark.parametrize("location", ["query", "cookie"])
+def test_api_key_outside_headers(tmp_path, upstream, monkeypatch, location, lazy_tools):
+    monkeypatch.setenv("API_KEY", "secret")
+    api_spec = make_spec(
+        [make_endpoint("search", summary="Search", parameters=[APIParameter(name="q", type="string")])],
+        base_url=f"{upstream.url}/v1", auth_type="apiKey",
+        auth_config={"type": "apiKey", "in": location, "name": "key"},
+    )
+    server = MCPGenerator(output_dir=str(tmp_path)).generate(api_spec, options=ServerOptions(lazy_tools=lazy_tools))
+    module = load_server(server.output_path)
+
+    run_client(module, lambda client: client.call_tool("search", {"q": "shoes"}))
+
+    request = upstream.requests[-1]
+    assert "authorization" not in request["headers"]
+    if location == "query":
+        assert request["query"] == {"q": "shoes", "key": "secret"}
+    else:
+        assert request["query"] == {"q": "shoes"}
+        assert request["headers"]["cookie"] == "key=secret"
+
+
+def test_query_api_key_unset(tmp_path, upstream, monkeypatch):
+    monkeypatch.delenv("API_KEY", raising=False)
+    api_spec = make_spec([make_endpoint("health", summary="Health")], base_url=f"{upstream.url}/v1",
+                         auth_type="apiKey", auth_config={"type": "apiKey", "in": "query", "name": "key"})
+    module = load_server(MCPGenerator(output_dir=str(tmp_path)).generate(api_spec).output_path)
+
+    run_client(module, lambda client: client.call_tool("health", {}))
+
+    assert upstream.requests[-1]["query"] == {}
+
+
+def _call_all(*calls):
+    """依次调用工具，返回结构化结果列表"""
+    async def run(client):
+        return [(await client.call_tool(name, arguments)).structured_content for name, arguments in calls]
+    return run
+
+
+def test_cache_serves_repeated_gets(tmp_path, upstream):
+    module = _generate(tmp_path, upstream, ServerOptions(cache_ttl=30))
+
+    results = run_client(module, _call_all(
+        ("health", {}), ("health", {}),
+        ("listItems", {"limit": 5}), ("listItems", {"limit": 5}), ("listItems", {"limit": 6}),
+        ("createItem", {"name": "a"}), ("createItem", {"name": "a"}),
+    ))
+
+    assert results[0] == results[1] and results[2] == results[3]
+    assert [(r["method"], r["path"]) for r in upstream.requests] == [
+        ("GET", "/v1/health"), ("GET", "/v1/items"), ("GET", "/v1/items"), ("POST", "/v1/items"), ("POST", "/v1/items"),
+    ]
+    assert module.upstream_transport.stats() == {"cache_hits": 2, "cache_misses": 3, "cache_entries": 3}
+
+
+def test_cache_ttl_override_and_expiry(tmp_path, upstream, monkeypatch):
+    # CACHE_TTL=0 时只缓存带 x-cache-ttl（listItems: 60 秒）的操作
+    monkeypatch.setenv("CACHE_TTL", "0")
+    module = _generate(tmp_path, upstream, ServerOptions(cache_ttl=30))
+    run_client(module, _call_all(("health", {}), ("health", {}), ("listItems", {}), ("listItems", {})))
+    assert [r["path"] for r in upstream.requests] == ["/v1/health", "/v1/health", "/v1/items"]
+
+    monkeypatch.setenv("CACHE_TTL", "0.05")
+    module = _generate(tmp_path, upstream, ServerOptions(cache_ttl=30), name="expiry")
+    upstream.requests.clear()
+
+    async def expire(client):
+        await client.call_tool("health", {})
+        await client.call_tool("health", {})
+        await asyncio.sleep(0.1)
+        await client.call_tool("health", {})
+
+    run_client(module, expire)
+    assert len(upstream.requests) == 2
+
+
+def test_cache_evicts_least_recently_used(tmp_path, upstream, monkeypatch):
+    monkeypatch.setenv("CACHE_MAX_ENTRIES", "1")
+    module = _generate(tmp_path, upstream, ServerOptions(cache_ttl=30))
+
+    run_client(module, _call_all(("health", {}), ("listItems", {}), ("listItems", {}), ("health", {})))
+
+    assert [r["path"] for r in upstream.requests] == ["/v1/health", "/v1/items", "/v1/health"]
+    assert module.upstream_transport.stats()["cache_entries"] == 1
+
+
+def test_cache_skips_error_responses(tmp_path, upstream):
+    upstream.reply = lambda request: (503, {}, {"error": "busy"})
+    module = _generate(tmp_path, upstream, ServerOptions(cache_ttl=30))
+
+    async def call_twice(client):
+        return [(await client.call_tool("health", {}, raise_on_error=False)).is_error for _ in range(2)]
+
+    assert run_client(module, call_twice) == [True, True]
+    assert len(upstream.requests) == 2
+
+
+def _call_concurrently(*calls):
+    """并发调用工具，返回 CallToolResult 列表"""
+    async def run(client):
+        return await asyncio.gather(*(
+            client.call_tool(name, arguments, raise_on_error=False) for name, arguments in calls
+        ))
+    return run
+
+
+@pytest.mark.parametrize("cache_ttl", [0, 30])
+def test_coalesce_concurrent_gets(tmp_path, upstream, cache_ttl):
+    upstream.delay = 0.2
+    module = _generate(tmp_path, upstream, ServerOptions(coalesce_requests=True, cache_ttl=cache_ttl))
+
+    calls = [("listItems", {"limit": 1})] * 5 + [("listItems", {"limit": 2})] * 3 + [("createItem", {"name": "a"})] * 2
+    results = run_client(module, _call_concurrently(*calls))
+
+    assert not any(result.is_error for result in results)
+    assert len({str(result.structured_content) for result in results[:5]}) == 1
+    assert sorted((r["method"], r["query"].get("limit")) for r in upstream.requests) == [
+        ("GET", "1"), ("GET", "2"), ("POST", None), ("POST", None),
+    ]
+    assert module.upstream_transport.stats()["coalesced"] == 6
+
+
+def test_coalesce_shares_errors(tmp_path, upstream):
+    upstream.delay = 0.2
+    upstream.reply = lambda request: (500, {}, {"error": "boom"})
+    module = _generate(tmp_path, upstream, ServerOptions(coalesce_requests=True))
+
+    results = run_client(module, _call_concurrently(*[("health", {})] * 4))
+
+    assert all(result.is_error for result in results)
+    assert len(upstream.requests) == 1
+    assert module.upstream_transport.stats() == {"coalesced": 3}
+
+
+def _rapidapi_server(tmp_path, upstream, rate_limit):
+    api_spec = make_spec([make_endpoint("health", summary="Health")], base_url=f"{upstream.url}/rapidapi.com")
+    server = MCPGenerator(output_dir=str(tmp_path)).generate(api_spec, options=ServerOptions(rate_limit=rate_limit))
+    return load_server(server.output_path)
+
+
+def _timed_reply(times, first=None):
+    """记录每个上游请求的时间；first 为第一个请求的回复"""
+    def reply(request):
+        times.append(time.monotonic())
+        if len(times) == 1 and first is not None:
+            return first
+        return FakeUpstream.default_reply(request)
+    return reply
+
+
+def test_rapidapi_rate_limit_spaces_requests(tmp_path, upstream):
+    times = []
+    upstream.reply = _timed_reply(times)
+    module = _rapidapi_server(tmp_path, upstream, rate_limit=10)
+
+    results = run_client(module, _call_concurrently(*[("health", {})] * 4))
+
+    assert not any(result.is_error for result in results)
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert min(gaps) >= 0.08
+    assert module.upstream_transport.stats()["throttled"] == 3
+
+
+def test_rapidapi_retry_after_releases_queue_at_rate(tmp_path, upstream):
+    times = []
+    upstream.reply = _timed_reply(times, first=(429, {"Retry-After": "0.5"}, {"error": "slow down"}))
+    module = _rapidapi_server(tmp_path, upstream, rate_limit=10)
+
+    async def run(client):
+        first = asyncio.create_task(client.call_tool("health", {}, raise_on_error=False))
+        # 其余请求在暂停期间到达
+        await asyncio.sleep(0.1)
+        rest = [client.call_tool("health", {}, raise_on_error=False) for _ in range(3)]
+        return await asyncio.gather(first, *rest)
+
+    results = run_client(module, run)
+
+    assert not any(result.is_error for result in results)
+    assert len(times) == 5
+    # 暂停期间没有请求发出，暂停结束后按速率逐个放行而不是同时发出
+    assert times[1] - times[0] >= 0.45
+    gaps = [later - earlier for earlier, later in zip(times[1:], times[2:])]
+    assert min(gaps) >= 0.08
+    assert module.upstream_transport.stats()["retries_429"] == 1
+
+
+def test_rapidapi_quota_guard(tmp_path, upstream, monkeypatch):
+    upstream.reply = lambda request: (200, {
+        "x-ratelimit-requests-remaining": "0", "x-ratelimit-requests-reset": "3600",
+    }, {"ok": True})
+    module = _rapidapi_server(tmp_path, upstream, rate_limit=0)
+
+    async def call_twice(client):
+        return [await client.call_tool("health", {}, raise_on_error=False) for _ in range(2)]
+
+    first, second = run_client(module, call_twice)
+
+    assert not first.is_error and second.is_error
+    assert "配额" in second.content[0].text
+    assert len(upstream.requests) == 1
+    assert module.upstream_transport.stats()["quota_remaining"] == 0
+
+
+def _items_reply(count):
+    """listItems 的上游回复: count 条记录"""
+    items = [{"id": i, "name": f"item{i}", "extra": {"blob": "x" * 20}} for i in range(count)]
+    return lambda request: (200, {}, {"total": count, "items": items})
+
+
+def test_projection_tool_schema(tmp_path, upstream):
+    spec = sample_openapi(base_url=f"{upstream.url}/v1")
+    # 与 API 参数重名的裁剪参数不添加，参数照常发送给上游
+    spec["paths"]["/health"]["get"]["parameters"] = [{"name": "fields", "in": "query", "schema": {"type": "string"}}]
+    spec["paths"]["/items/{item_id}"]["get"]["responses"]["200"]["content"] = {"application/json": {"schema": {
+        "type": "object",
+        "properties": {"data": {"type": "object", "properties": {"id": {"type": "integer"}, "tags": {"type": "array"}}}},
+    }}}
+    module = _generate(tmp_path, upstream, ServerOptions(lazy_tools=True, response_projection=True), spec=spec)
+
+    async def run(client):
+        tools = {tool.name: tool.inputSchema for tool in await client.list_tools()}
+        await client.call_tool("health", {"fields": "status"})
+        return tools
+
+    tools = run_client(module, run)
+
+    listing = tools["listItems"]["properties"]
+    assert {"limit", "q", "fields", "max_items", "max_bytes"} <= set(listing)
+    # 响应中的 $ref 不展开
+    assert listing["fields"]["description"].endswith("Available: total, items")
+    assert tools["getItem"]["properties"]["fields"]["description"].endswith("Available: data, data.id, data.tags")
+    assert tools["health"]["properties"]["fields"] == {"type": "string"}
+    assert {"max_items", "max_bytes"} <= set(tools["health"]["properties"])
+    assert upstream.requests[-1]["query"] == {"fields": "status"}
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_projection_fields_and_max_items(tmp_path, upstream, monkeypatch, stream):
+    if stream:
+        pytest.importorskip("ijson")
+        monkeypatch.setenv("RESPONSE_STREAM_MIN_BYTES", "0")
+    upstream.reply = _items_reply(5)
+    module = _generate(tmp_path, upstream, ServerOptions(lazy_tools=True, response_projection=True))
+
+    results = run_client(module, _call_all(
+        ("listItems", {"limit": 5, "fields": ["items.name", "$.items[*].extra"], "max_items": 2}),
+        ("listItems", {"fields": ["total"]}),
+        ("listItems", {}),
+    ))
+
+    assert results[0] == {"items": [
+        {"name": "item0", "extra": {"blob": "x" * 20}}, {"name": "item1", "extra": {"blob": "x" * 20}},
+    ]}
+    assert results[1] == {"total": 5}
+    assert len(results[2]["items"]) == 5
+    # 裁剪参数不发送给上游
+    assert [r["query"] for r in upstream.requests] == [{"limit": "5"}, {}, {}]
+
+
+def test_projection_max_bytes_and_defaults(tmp_path, upstream, monkeypatch):
+    monkeypatch.setenv("RESPONSE_MAX_ITEMS", "1")
+    upstream.reply = _items_reply(50)
+    module = _generate(tmp_path, upstream, ServerOptions(lazy_tools=True, response_projection=True))
+
+    async def run(client):
+        default = await client.call_tool("listItems", {})
+        override = await client.call_tool("listItems", {"max_items": 3})
+        truncated = await client.call_tool("listItems", {"max_items": 50, "max_bytes": 100})
+        return default.structured_content, override.structured_content, truncated
+
+    default, override, truncated = run_client(module, run)
+
+    assert len(default["items"]) == 1 and len(override["items"]) == 3
+    text = truncated.content[0].text
+    assert truncated.structured_content is None
+    assert text.startswith('{"total": 50, "items": [') and "[truncated:" in text and "max_bytes=100" in text
+    assert len(text.split("\n...")[0].encode("utf-8")) <= 100
+
+
+def _scrape(module):
+    """通过 ASGI 应用请求 /metrics"""
+    import httpx
+
+    async def get():
+        transport = httpx.ASGITransport(app=module.mcp.http_app(transport="sse"))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await http.get("/metrics")
+
+    return asyncio.run(get())
+
+
+def _samples(text):
+    """解析 Prometheus 文本: {(指标名, 排序后的标签): 值}"""
+    parser = pytest.importorskip("prometheus_client.parser")
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in parser.text_string_to_metric_families(text) for sample in family.samples
+    }
+
+
+@pytest.mark.parametrize("lazy_tools", [False, True])
+def test_metrics_count_tool_calls_and_upstream_requests(tmp_path, upstream, lazy_tools):
+    upstream.reply = lambda request: (
+        (500, {}, {"error": "boom"}) if request["path"] == "/v1/health" else FakeUpstream.default_reply(request)
+    )
+    module = _generate(tmp_path, upstream, ServerOptions(metrics=True, lazy_tools=lazy_tools), transport="sse")
+
+    async def run(client):
+        await client.call_tool("getItem", {"item_id": 1})
+        await client.call_tool("getItem", {"item_id": 2})
+        await client.call_tool("createItem", {"name": "a"})
+        await client.call_tool("health", {}, raise_on_error=False)
+
+    run_client(module, run)
+    response = _scrape(module)
+
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    samples = _samples(response.text)
+    assert samples[("mcp_tool_calls_total", (("status", "ok"), ("tool", "getItem")))] == 2
+    assert samples[("mcp_tool_calls_total", (("status", "ok"), ("tool", "createItem")))] == 1
+    assert samples[("mcp_tool_calls_total", (("status", "error"), ("tool", "health")))] == 1
+    assert samples[("mcp_upstream_requests_total", (("code", "200"), ("tool", "getItem")))] == 2
+    assert samples[("mcp_upstream_requests_total", (("code", "500"), ("tool", "health")))] == 1
+    assert samples[("mcp_tool_duration_seconds_count", (("tool", "getItem"),))] == 2
+    assert samples[("mcp_tool_duration_seconds_bucket", (("le", "+Inf"), ("tool", "getItem")))] == 2
+    assert samples[("mcp_upstream_duration_seconds_count", (("tool", "health"),))] == 1
+    assert samples[("mcp_upstream_received_bytes_total", (("tool", "getItem"),))] > 0
+
+
+def test_metrics_exclude_cache_hits_from_upstream(tmp_path, upstream):
+    module = _generate(tmp_path, upstream, ServerOptions(metrics=True, cache_ttl=30), transport="sse")
+
+    run_client(module, _call_all(("health", {}), ("health", {})))
+    text = _scrape(module).text
+
+    assert 'mcp_tool_calls_total{tool="health",status="ok"} 2' in text
+    assert 'mcp_upstream_requests_total{tool="health",code="200"} 1' in text
+    assert "mcp_upstream_cache_hits_total 1" in text
+    assert "mcp_upstream_cache_entries 1" in text
+    assert len(upstream.requests) == 1
+
+
+def test_metrics_record_connection_errors(tmp_path, upstream):
+    upstream.stop()
+    module = _generate(tmp_path, upstream, ServerOptions(metrics=True, lazy_tools=True), transport="sse")
+
+    result = run_client(module, lambda client: client.call_tool("health", {}, raise_on_error=False))
+    text = _scrape(module).text
+
+    assert result.is_error
+    assert 'mcp_upstream_requests_total{tool="health",code="error"} 1' in text
+    assert 'mcp_tool_calls_total{tool="health",status="error"} 1' in text
@@ -0,0 +1,296 @@
+"""
+MCPGenerator 测试
+"""
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from api_to_mcp.cli import cli
+from api_to_mcp.config import HTTPClientProfile
+from api_to_mcp.generator import MCPGenerator, ServerOptions, mcp_generator
+from api_to_mcp.manifest import MANIFEST_FILENAME
+from api_to_mcp.parsers import OpenAPIParser
+
+from conftest import make_endpoint, make_spec, sample_openapi
+
+
+def _read_tree(directory):
+    return {
+        path.name: path.read_text(encoding="utf-8")
+        for path in sorted(directory.iterdir())
+        if path.is_file() and path.name != MANIFEST_FILENAME
+    }
+
+
+@pytest.mark.parametrize("transport, options", [
+    ("stdio", ServerOptions()),
+    ("sse", ServerOptions()),
+    ("stdio", ServerOptions(spec_mode="sidecar")),
+    ("stdio", ServerOptions(lazy_tools=True)),
+    ("stdio", ServerOptions(lazy_tools=True, spec_mode="sidecar", response_projection=True)),
+    ("stdio", ServerOptions(cache_ttl=30)),
+])
+def test_generate_stream_matches_generate(tmp_path, transport, options):
+    spec_data = sample_openapi()
+    parser = OpenAPIParser()
+
+    full = MCPGenerator(output_dir=str(tmp_path / "full")).generate(
+        parser.parse_dict(spec_data), transport=transport, options=options
+    )
+    streamed = MCPGenerator(output_dir=str(tmp_path / "stream")).generate_stream(
+        parser.parse_info(spec_data), parser.iter_endpoints(spec_data), transport=transport, options=options
+    )
+
+    assert streamed.tools == []
+    assert _read_tree(tmp_path / "stream" / streamed.name) == _read_tree(tmp_path / "full" / full.name)
+
+
+def test_convert_stream_cli(tmp_path):
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps(sample_openapi()), encoding="utf-8")
+
+    result = CliRunner().invoke(cli, ["convert", str(spec_file), "-o", str(tmp_path / "out"), "--stream", "--no-enhance"])
+
+    assert result.exit_code == 0, result.output
+    assert "已流式转换 4 个工具" in result.output
+    assert (tmp_path / "out" / "sample_api" / "server.py").exists()
+
+
+def test_generators_share_compiled_templates(tmp_path):
+    first = MCPGenerator(output_dir=str(tmp_path / "a"))
+    second = MCPGenerator(output_dir=str(tmp_path / "b"))
+    assert first.templates["server.py"] is second.templates["server.py"]
+
+
+def test_template_bytecode_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "bytecode"
+    monkeypatch.setenv("API_TO_MCP_TEMPLATE_CACHE", str(cache_dir))
+    monkeypatch.setattr(mcp_generator, "_template_environment", None)
+    api_spec = OpenAPIParser().parse_dict(sample_openapi())
+
+    cached = MCPGenerator(output_dir=str(tmp_path / "cached")).generate(api_spec)
+    assert len(list(cache_dir.iterdir())) == len(mcp_generator._TEMPLATE_SOURCES)
+
+    # 从字节码缓存加载的模板渲染结果不变
+    monkeypatch.setattr(mcp_generator, "_template_environment", None)
+    reloaded = MCPGenerator(output_dir=str(tmp_path / "reloaded")).generate(api_spec)
+    monkeypatch.delenv("API_TO_MCP_TEMPLATE_CACHE")
+    monkeypatch.setattr(mcp_generator, "_template_environment", None)
+    fresh = MCPGenerator(output_dir=str(tmp_path / "fresh")).generate(api_spec)
+
+    fresh_tree = _read_tree(Path(fresh.output_path))
+    assert _read_tree(Path(cached.output_path)) == fresh_tree
+    assert _read_tree(Path(reloaded.output_path)) == fresh_tree
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"spec_mode": "zip"}, "spec_mode"),
+    ({"cache_ttl": -1}, "cache_ttl"),
+    ({"rate_limit": -1}, "rate_limit"),
+    ({"response_projection": True}, "lazy_tools"),
+    ({"client_profile": HTTPClientProfile(max_connections=0)}, "max_connections"),
+    ({"client_profile": HTTPClientProfile(read_timeout=0)}, "超时"),
+])
+def test_server_options_validation(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        ServerOptions(**kwargs)
+
+
+def test_server_options_normalized_once(tmp_path):
+    options = ServerOptions(cache_ttl=30, rate_limit=2, lazy_tools=1)
+    assert (options.cache_ttl, options.rate_limit, options.lazy_tools) == (30.0, 2.0, True)
+    assert options == ServerOptions(cache_ttl=30.0, rate_limit=2.0, lazy_tools=True)
+
+    ServerOptions(metrics=True).check_transport("sse")
+    with pytest.raises(ValueError, match="metrics"):
+        ServerOptions(metrics=True).check_transport("stdio")
+    with pytest.raises(ValueError, match="metrics"):
+        MCPGenerator(output_dir=str(tmp_path)).generate(
+            OpenAPIParser().parse_dict(sample_openapi()), options=ServerOptions(metrics=True)
+        )
+
+
+def test_cli_rejects_invalid_server_options(tmp_path):
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps(sample_openapi()), encoding="utf-8")
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["convert", str(spec_file), "-o", str(tmp_path / "out"), "--no-enhance", "--response-projection"])
+    assert result.exit_code != 0
+    assert "response_projection 需要 lazy_tools" in result.output
+
+    result = runner.invoke(cli, ["convert", str(spec_file), "-o", str(tmp_path / "out"), "--no-enhance", "--metrics"])
+    assert result.exit_code != 0
+    assert "metrics 需要 sse 或 streamable-http" in result.output
+    assert not (tmp_path / "out" / "sample_api").exists()
+
+
+def _batch_specs():
+    parser = OpenAPIParser()
+    specs = []
+    for title in ["Alpha", "Beta", "Alpha", "Gamma"]:
+        data = sample_openapi()
+        data["info"]["title"] = title
+        specs.append(parser.parse_dict(data))
+    return specs
+
+
+def test_generate_many_sequential(tmp_path, monkeypatch):
+    specs = _batch_specs()
+    generator = MCPGenerator(output_dir=str(tmp_path))
+    convert = generator._convert_endpoints_to_tools
+
+    def failing_convert(endpoints):
+        if endpoints is specs[3].endpoints:
+            raise RuntimeError("boom")
+        return convert(endpoints)
+
+    monkeypatch.setattr(generator, "_convert_endpoints_to_tools", failing_convert)
+    result = generator.generate_many(specs, workers=1, options=ServerOptions(lazy_tools=True))
+
+    assert [server.name if server else None for server in result.servers] == ["alpha", "beta", None, None]
+    assert result.succeeded == 2
+    assert "输出目录已被前面的规范占用" in result.errors[2]
+    assert result.errors[3] == "boom"
+    assert "TOOL_TABLE" in (tmp_path / "alpha" / "server.py").read_text(encoding="utf-8")
+
+
+def test_generate_many_names_and_validation(tmp_path):
+    generator = MCPGenerator(output_dir=str(tmp_path))
+    specs = _batch_specs()[:2]
+    with pytest.raises(ValueError, match="names"):
+        generator.generate_many(specs, names=["only-one"])
+    with pytest.raises(ValueError, match="metrics"):
+        generator.generate_many(specs, options=ServerOptions(metrics=True))
+
+    result = generator.generate_many(specs, names=["first", None], workers=1)
+    assert [server.name for server in result.servers] == ["first", "beta"]
+
+
+def test_generate_many_process_pool_matches_sequential(tmp_path):
+    specs = _batch_specs()
+    options = ServerOptions(spec_mode="sidecar", cache_ttl=30)
+
+    pooled = MCPGenerator(output_dir=str(tmp_path / "pool")).generate_many(specs, workers=2, options=options)
+    sequential = MCPGenerator(output_dir=str(tmp_path / "seq")).generate_many(specs, workers=1, options=options)
+
+    assert [server and server.name for server in pooled.servers] == ["alpha", "beta", None, "gamma"]
+    assert [server and server.name for server in sequential.servers] == [server and server.name for server in pooled.servers]
+    assert list(pooled.errors) == [2]
+    for name in ["alpha", "beta", "gamma"]:
+        assert _read_tree(tmp_path / "pool" / name) == _read_tree(tmp_path / "seq" / name)
+    assert (tmp_path / "pool" / "gamma" / "openapi.json").exists()
+
+
+def test_generate_batch_cli(tmp_path):
+    spec_dir = tmp_path / "specs"
+    spec_dir.mkdir()
+    for title in ["Alpha", "Beta"]:
+        data = sample_openapi()
+        data["info"]["title"] = title
+        (spec_dir / f"{title.lower()}.json").write_text(json.dumps(data), encoding="utf-8")
+    (spec_dir / "broken.json").write_text("{not json", encoding="utf-8")
+
+    result = CliRunner().invoke(cli, ["generate-batch", str(spec_dir), "-o", str(tmp_path / "out"), "-w", "1", "--lazy-tools"])
+
+    assert result.exit_code == 1
+    assert "成功: 2/3" in result.output
+    assert "broken.json: 解析失败" in result.output
+    assert (tmp_path / "out" / "alpha" / "server.py").exists()
+    assert (tmp_path / "out" / "beta" / "server.py").exists()
+
+
+def test_sidecar_spec_is_compact_json(tmp_path):
+    api_spec = OpenAPIParser().parse_dict(sample_openapi())
+    inline = Path(MCPGenerator(output_dir=str(tmp_path / "inline")).generate(api_spec).output_path)
+    sidecar = Path(MCPGenerator(output_dir=str(tmp_path / "sidecar")).generate(
+        api_spec, options=ServerOptions(spec_mode="sidecar")
+    ).output_path)
+
+    sidecar_text = (sidecar / "openapi.json").read_text(encoding="utf-8")
+    assert "\n" not in sidecar_text and ", " not in sidecar_text
+    assert json.loads(sidecar_text) == MCPGenerator(output_dir=str(tmp_path))._api_spec_to_openapi(api_spec)
+    server_code = (sidecar / "server.py").read_text(encoding="utf-8")
+    assert "OPENAPI_SPEC" not in server_code and 'with_name("openapi.json")' in server_code
+    assert len(server_code) < len((inline / "server.py").read_text(encoding="utf-8"))
+    assert not (inline / "openapi.json").exists()
+
+
+def test_switching_spec_mode_removes_stale_sidecar(tmp_path, capsys):
+    generator = MCPGenerator(output_dir=str(tmp_path))
+    api_spec = OpenAPIParser().parse_dict(sample_openapi())
+    server_dir = Path(generator.generate(api_spec, options=ServerOptions(spec_mode="sidecar")).output_path)
+    assert (server_dir / "openapi.json").exists()
+
+    generator.generate(api_spec, options=ServerOptions(spec_mode="sidecar", lazy_tools=True))
+    assert "已删除不再生成的文件: openapi.json" in capsys.readouterr().out
+    assert (server_dir / "tools.json").exists() and not (server_dir / "openapi.json").exists()
+
+    generator.generate(api_spec)
+    assert not (server_dir / "tools.json").exists()
+    assert 'OPENAPI_SPEC = """' in (server_dir / "server.py").read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("operation_id, path, method, expected", [
+    ("listItems", "/items", "GET", "listItems"),
+    ("list-items.v2", "/items", "GET", "list_items_v2"),
+    ("getItem__internal", "/items/{id}", "GET", "getItem"),
+    ("  odd name!? ", "/x", "GET", "odd_name"),
+    # 生成的 operationId 为 post__users_list，与 from_openapi 一样只取 "__" 之前的部分
+    (None, "/users/list", "POST", "post"),
+    ("x" * 70, "/long", "GET", "x" * 56),
+])
+def test_lazy_tool_names_follow_from_openapi(tmp_path, operation_id, path, method, expected):
+    generator = MCPGenerator(output_dir=str(tmp_path))
+    entry = generator._tool_table_entry(generator._endpoint_to_tool(make_endpoint(operation_id, path=path, method=method)))
+    assert entry[0] == expected
+
+
+def test_lazy_tool_table_uses_route_order_and_suffixes(tmp_path):
+    generator = MCPGenerator(output_dir=str(tmp_path))
+    api_spec = make_spec([
+        make_endpoint("dup", path="/a", method="POST"),
+        make_endpoint("other", path="/b"),
+        make_endpoint("dup", path="/a"),
+        make_endpoint("old", path="/b"),
+    ])
+    table = generator._dedupe_tool_table([
+        generator._tool_table_entry(generator._endpoint_to_tool(endpoint)) for endpoint in api_spec.endpoints
+    ])
+    assert [(entry[0], entry[3], entry[4]) for entry in table] == [
+        ("dup", "GET", "/a"), ("dup_2", "POST", "/a"), ("old", "GET", "/b"),
+    ]
+
+
+def test_client_profile_from_env(monkeypatch):
+    monkeypatch.setenv("API_TO_MCP_HTTP_MAX_CONNECTIONS", "20")
+    monkeypatch.setenv("API_TO_MCP_HTTP2", "true")
+    monkeypatch.setenv("API_TO_MCP_HTTP_READ_TIMEOUT", "5")
+    profile = HTTPClientProfile.from_env()
+    assert (profile.max_connections, profile.http2, profile.read_timeout) == (20, True, 5.0)
+    assert profile.max_keepalive_connections == HTTPClientProfile.max_keepalive_connections
+
+
+def test_client_profile_cli_options(tmp_path, monkeypatch):
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps(sample_openapi()), encoding="utf-8")
+    monkeypatch.setenv("API_TO_MCP_HTTP_READ_TIMEOUT", "12")
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["convert", str(spec_file), "-o", str(tmp_path / "plain"), "--no-enhance"])
+    assert result.exit_code == 0, result.output
+    assert "HTTP_MAX_CONNECTIONS" not in (tmp_path / "plain" / "sample_api" / "server.py").read_text(encoding="utf-8")
+
+    # 单独指定任一连接选项即启用配置，其余字段取环境变量和默认值
+    result = runner.invoke(cli, [
+        "convert", str(spec_file), "-o", str(tmp_path / "tuned"), "--no-enhance", "--max-connections", "8", "--http2",
+    ])
+    assert result.exit_code == 0, result.output
+    server_dir = tmp_path / "tuned" / "sample_api"
+    server_code = (server_dir / "server.py").read_text(encoding="utf-8")
+    assert 'os.getenv("HTTP_MAX_CONNECTIONS", "8")' in server_code
+    assert 'os.getenv("HTTP_READ_TIMEOUT", "12.0")' in server_code
+    assert 'os.getenv("HTTP2", "1")' in server_code
+    assert '"httpx[http2]>=0.25.0"' in (server_dir / "pyproject.toml").read_text(encoding="utf-8")
@@ -0,0 +1,61 @@
+"""
+规范文件加载测试
+"""
+import json
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from api_to_mcp.cli import cli
+from api_to_mcp.parsers import loader
+from api_to_mcp.parsers.loader import load_spec_file, loader_name
+
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Loader Test", "version": "1.0.0", "description": "中文描述"},
+    "paths": {"/items": {"get": {"operationId": "listItems", "responses": {"200": {"description": "OK"}}}}},
+}
+
+
+@pytest.fixture
+def spec_files(tmp_path):
+    json_file = tmp_path / "spec.json"
+    json_file.write_text(json.dumps(SPEC, ensure_ascii=False), encoding="utf-8")
+    yaml_file = tmp_path / "spec.yaml"
+    yaml_file.write_text(yaml.safe_dump(SPEC, allow_unicode=True), encoding="utf-8")
+    return json_file, yaml_file
+
+
+def test_json_and_yaml_load_identically(spec_files):
+    json_file, yaml_file = spec_files
+    assert load_spec_file(json_file) == SPEC
+    assert load_spec_file(yaml_file) == SPEC
+
+
+def test_json_without_orjson(spec_files, monkeypatch):
+    monkeypatch.setattr(loader, "orjson", None)
+    assert load_spec_file(spec_files[0]) == SPEC
+    assert loader_name(".json") == "json"
+
+
+def test_loader_name():
+    assert loader_name(".json") in ("orjson", "json")
+    assert loader_name(".yaml") in ("CSafeLoader", "SafeLoader")
+
+
+def test_unsupported_suffix(tmp_path):
+    path = tmp_path / "spec.txt"
+    path.write_text("{}")
+    with pytest.raises(ValueError, match="不支持的文件格式"):
+        load_spec_file(path)
+
+
+def test_validate_profile(spec_files):
+    result = CliRunner().invoke(cli, ["validate", str(spec_files[1]), "--profile"])
+
+    assert result.exit_code == 0, result.output
+    assert "端点数量: 1" in result.output
+    assert "性能分析" in result.output
+    assert f"解析器: {loader_name('.yaml')}" in result.output
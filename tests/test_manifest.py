@@ -0,0 +1,195 @@
+"""
+端点指纹与生成清单测试
+"""
+import inspect
+import json
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from api_to_mcp.cli import cli
+from api_to_mcp.enhancer import DescriptionEnhancer
+from api_to_mcp.generator import MCPGenerator
+from api_to_mcp.manifest import (
+    MANIFEST_FILENAME, GenerationManifest, atomic_write_text, content_hash, endpoint_fingerprint, write_if_changed,
+)
+from api_to_mcp.models import APIParameter
+
+from conftest import make_endpoint, make_spec
+
+
+def _params():
+    return [APIParameter(name="verbose", type="boolean", description="Verbose output")]
+
+
+def test_documented_duplicates_share_fingerprint():
+    # RapidAPI 的备用端点: 路径和 operation_id 不同，内容完全相同
+    first = make_endpoint("getQuote", path="/quote", summary="Get a quote", parameters=_params())
+    alias = make_endpoint("x-get-quote", path="/x-get-quote", summary="Get a quote", parameters=_params())
+    assert endpoint_fingerprint(first) == endpoint_fingerprint(alias)
+
+
+def test_undocumented_endpoints_do_not_collide():
+    health = make_endpoint("health", path="/health", parameters=_params())
+    version = make_endpoint("version", path="/version", parameters=_params())
+    assert endpoint_fingerprint(health) != endpoint_fingerprint(version)
+    assert endpoint_fingerprint(health) == endpoint_fingerprint(make_endpoint("health", path="/health", parameters=_params()))
+
+
+def test_fingerprint_tracks_content():
+    base = make_endpoint("op", summary="Get a quote", parameters=_params())
+    assert endpoint_fingerprint(base) != endpoint_fingerprint(make_endpoint("op", summary="Get quotes", parameters=_params()))
+    assert endpoint_fingerprint(base) != endpoint_fingerprint(make_endpoint("op", method="POST", summary="Get a quote", parameters=_params()))
+    assert endpoint_fingerprint(base) != endpoint_fingerprint(make_endpoint("op", summary="Get a quote"))
+    # 参数顺序不影响指纹
+    two = [APIParameter(name="a", type="string"), APIParameter(name="b", type="string")]
+    assert endpoint_fingerprint(make_endpoint("op", summary="S", parameters=two)) == endpoint_fingerprint(
+        make_endpoint("op", summary="S", parameters=list(reversed(two)))
+    )
+
+
+def _undocumented_spec():
+    return make_spec([
+        make_endpoint("health", path="/health", parameters=_params()),
+        make_endpoint("version", path="/version", parameters=_params()),
+    ])
+
+
+def test_manifest_round_trip(tmp_path):
+    manifest = GenerationManifest(tmp_path)
+    endpoint = make_endpoint("op", enhanced_summary="S", enhanced_description="D")
+    manifest.record_enhancements("ctx", [endpoint, make_endpoint("untouched")])
+    manifest.record_file("server.py", "input", "content")
+    manifest.save()
+
+    loaded = GenerationManifest.load(tmp_path)
+    assert loaded.get_enhancement(endpoint_fingerprint(endpoint), "ctx") == {"summary": "S", "description": "D"}
+    # 增强上下文变化时记录失效
+    assert loaded.get_enhancement(endpoint_fingerprint(endpoint), "other") is None
+    # 未增强的端点不记录
+    assert len(loaded.enhancements) == 1
+    assert loaded.files["server.py"]["output"] == content_hash("content")
+
+
+def test_manifest_version_mismatch_is_empty(tmp_path):
+    (tmp_path / MANIFEST_FILENAME).write_text(json.dumps({"version": -1, "files": {"a": {}}}))
+    assert GenerationManifest.load(tmp_path).files == {}
+
+
+def test_incremental_enhancement_keeps_per_endpoint_results(chat_server, azure_config, tmp_path):
+    manifest = GenerationManifest(tmp_path)
+    DescriptionEnhancer(config=azure_config).enhance_api_spec(_undocumented_spec(), manifest=manifest)
+    manifest.save()
+    assert len(chat_server.requests) == 2
+
+    spec = _undocumented_spec()
+    DescriptionEnhancer(config=azure_config).enhance_api_spec(spec, manifest=GenerationManifest.load(tmp_path))
+
+    assert len(chat_server.requests) == 2
+    assert spec.endpoints[0].enhanced_description == "Description of health"
+    assert spec.endpoints[1].enhanced_description == "Description of version"
+
+
+def test_incremental_enhancement_only_requests_changed_endpoints(chat_server, azure_config, tmp_path):
+    manifest = GenerationManifest(tmp_path)
+    DescriptionEnhancer(config=azure_config).enhance_api_spec(_undocumented_spec(), manifest=manifest)
+    assert len(chat_server.requests) == 2
+
+    spec = _undocumented_spec()
+    spec.endpoints[1].parameters.append(APIParameter(name="format", type="string"))
+    DescriptionEnhancer(config=azure_config).enhance_api_spec(spec, manifest=manifest)
+
+    assert len(chat_server.requests) == 3
+    assert "- 操作 ID: version" in chat_server.requests[-1]["messages"][-1]["content"]
+
+
+def test_fallback_results_are_not_recorded(chat_server, azure_config, tmp_path):
+    chat_server.reply = lambda body: (400, {}, "bad request")
+    manifest = GenerationManifest(tmp_path)
+
+    DescriptionEnhancer(config=azure_config).enhance_api_spec(_undocumented_spec(), manifest=manifest)
+
+    assert manifest.enhancements == {}
+
+
+def test_generator_incremental_skips_unchanged_files(tmp_path):
+    generator = MCPGenerator(output_dir=str(tmp_path))
+    generator.generate(_undocumented_spec(), incremental=True)
+    server_dir = generator.server_dir_for(_undocumented_spec())
+    server_file = server_dir / "server.py"
+    original = server_file.read_text(encoding="utf-8")
+
+    # 渲染输入未变，清单中的记录与磁盘一致: 跳过渲染
+    renders = []
+    generator._render_server_template = lambda *args, **kwargs: renders.append(args) or original
+    generator.generate(_undocumented_spec(), incremental=True)
+    assert renders == []
+
+    # 磁盘上的文件被修改时重新生成
+    server_file.write_text("# edited", encoding="utf-8")
+    generator.generate(_undocumented_spec(), incremental=True)
+    assert len(renders) == 1
+    assert server_file.read_text(encoding="utf-8") == original
+
+
+def test_incremental_is_opt_in():
+    assert inspect.signature(MCPGenerator.generate).parameters["incremental"].default is False
+    for command in ("convert", "from-url", "generate-batch", "rapidapi"):
+        option = next(param for param in cli.commands[command].params if param.name == "incremental")
+        assert option.default is False
+
+
+def test_write_if_changed_keeps_unchanged_files(tmp_path):
+    path = tmp_path / "server.py"
+    assert write_if_changed(path, "print('a')\n") is True
+    os.utime(path, (1, 1))
+
+    assert write_if_changed(path, "print('a')\n") is False
+    assert path.stat().st_mtime == 1
+
+    assert write_if_changed(path, "print('b')\n") is True
+    assert path.read_text(encoding="utf-8") == "print('b')\n"
+    assert path.stat().st_mtime != 1
+
+
+def test_atomic_write_preserves_mode_and_cleans_up(tmp_path, monkeypatch):
+    path = tmp_path / "server.py"
+    path.write_text("old", encoding="utf-8")
+    path.chmod(0o750)
+
+    atomic_write_text(path, "new")
+    assert path.read_text(encoding="utf-8") == "new"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o750
+
+    # 替换失败时目标文件保持原内容，临时文件被删除
+    def fail_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail_replace)
+    with pytest.raises(OSError, match="disk full"):
+        atomic_write_text(path, "partial")
+    assert path.read_text(encoding="utf-8") == "new"
+    assert [child.name for child in tmp_path.iterdir()] == ["server.py"]
+
+
+def test_full_generation_skips_identical_files(tmp_path, capsys):
+    generator = MCPGenerator(output_dir=str(tmp_path))
+    server_dir = Path(generator.generate(_undocumented_spec()).output_path)
+    assert "写入 6 个文件，跳过 0 个未变化的文件" in capsys.readouterr().out
+    for path in server_dir.iterdir():
+        os.utime(path, (1, 1))
+
+    # --full 也重新渲染，但内容相同的文件不重写
+    generator.generate(_undocumented_spec())
+    assert "写入 0 个文件，跳过 6 个未变化的文件" in capsys.readouterr().out
+    assert all(path.stat().st_mtime == 1 for path in server_dir.iterdir() if path.name != MANIFEST_FILENAME)
+
+    changed = _undocumented_spec()
+    changed.version = "2.0.0"
+    generator.generate(changed)
+    output = capsys.readouterr().out
+    assert "⏭️  未变化，跳过: __init__.py" in output
+    assert (server_dir / "server.py").stat().st_mtime != 1
+    assert (server_dir / "__init__.py").stat().st_mtime == 1
@@ -0,0 +1,76 @@
+"""
+模型快速构造测试
+"""
+from pathlib import Path
+
+import pydantic
+import pytest
+
+from api_to_mcp.models import (
+    APIEndpoint, APIParameter, APISpec, build_endpoint, build_parameter, build_spec,
+)
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _built():
+    parameter = build_parameter("limit", "integer", "Page size", False, 10, None)
+    endpoint = build_endpoint("/items", "GET", summary="List", operation_id="listItems", parameters=[parameter], tags=["items"])
+    return build_spec("API", "1.0.0", base_url="https://api.example.com", endpoints=[endpoint])
+
+
+def _validated():
+    parameter = APIParameter(name="limit", type="integer", description="Page size", required=False, default=10)
+    endpoint = APIEndpoint(path="/items", method="GET", summary="List", operation_id="listItems", parameters=[parameter], tags=["items"])
+    return APISpec(title="API", version="1.0.0", base_url="https://api.example.com", endpoints=[endpoint])
+
+
+def test_build_matches_validated_construction():
+    assert _built().model_dump() == _validated().model_dump()
+    assert _built() == _validated()
+    assert APISpec.model_validate(_built().model_dump()) == _built()
+
+
+def test_fields_set_is_per_instance():
+    first, second = build_parameter("a"), build_parameter("b")
+    assert first.model_fields_set == set(APIParameter.model_fields)
+    assert first.model_fields_set is not second.model_fields_set
+
+    # 修改一个实例的已设置字段不影响其他实例
+    first.model_fields_set.discard("enum")
+    assert "enum" in second.model_fields_set
+    assert "enum" not in first.model_dump(exclude_unset=True)
+    assert "enum" in second.model_dump(exclude_unset=True)
+
+
+def test_built_models_are_mutable_and_copyable():
+    api_spec = _built()
+    api_spec.endpoints[0].enhanced_summary = "Enhanced"
+    copied = api_spec.model_copy(deep=True)
+    copied.endpoints[0].enhanced_summary = "Other"
+
+    assert api_spec.endpoints[0].enhanced_summary == "Enhanced"
+    assert copied.model_dump()["endpoints"][0]["enhanced_summary"] == "Other"
+
+
+def test_batch_rapidapi_validates_scraped_specs(monkeypatch, tmp_path):
+    monkeypatch.syspath_prepend(str(REPO_ROOT))
+    batch_rapidapi = pytest.importorskip("batch_rapidapi")
+    processor = batch_rapidapi.BatchRapidAPIProcessor(output_dir=str(tmp_path))
+    openapi = {
+        "info": {"title": "Scraped", "version": "1.0.0"},
+        "servers": [{"url": "https://scraped.p.rapidapi.com"}],
+        "paths": {"/search": {"get": {
+            "operationId": "search",
+            "parameters": [{"name": "q", "schema": {"type": "string"}, "required": True}],
+        }}},
+    }
+
+    api_spec = processor._openapi_to_api_spec(openapi, "https://rapidapi.com/x/api/scraped")
+    assert api_spec.endpoints[0].parameters[0].name == "q"
+
+    # 抓取到的数据类型不正确时由 pydantic 拒绝，而不是带着错误类型进入生成器
+    openapi["paths"]["/search"]["get"]["parameters"][0]["name"] = {"unexpected": "object"}
+    with pytest.raises(pydantic.ValidationError):
+        processor._openapi_to_api_spec(openapi, "https://rapidapi.com/x/api/scraped")
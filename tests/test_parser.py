@@ -0,0 +1,187 @@
+"""
+OpenAPI/Swagger 解析器测试
+"""
+import json
+
+import pytest
+
+from api_to_mcp.parsers import OpenAPIParser
+from api_to_mcp.parsers.ref_resolver import RefResolver
+
+from conftest import sample_openapi
+
+
+def _openapi(paths, components=None, **extra):
+    spec = {
+        "openapi": "3.0.0",
+        "info": {"title": "Pets", "version": "1.0.0"},
+        "servers": [{"url": "https://api.example.com/v1"}],
+        "paths": paths,
+        **extra,
+    }
+    if components is not None:
+        spec["components"] = components
+    return spec
+
+
+def test_resolver_follows_chains_and_memoizes():
+    document = {
+        "components": {
+            "schemas": {
+                "Alias": {"$ref": "#/components/schemas/Pet"},
+                "Pet": {"type": "object", "properties": {"name": {"type": "string"}}},
+            }
+        }
+    }
+    resolver = RefResolver(document)
+
+    first = resolver.resolve({"$ref": "#/components/schemas/Alias"})
+    second = resolver.resolve({"$ref": "#/components/schemas/Pet"})
+
+    assert first is document["components"]["schemas"]["Pet"]
+    assert second is first
+    assert resolver.resolve({"type": "string"}) == {"type": "string"}
+
+
+def test_resolver_escaped_pointer_tokens():
+    document = {"paths": {"/pets/{id}": {"get": {"operationId": "getPet"}}}}
+    resolver = RefResolver(document)
+    assert resolver.resolve({"$ref": "#/paths/~1pets~1{id}/get"})["operationId"] == "getPet"
+
+
+@pytest.mark.parametrize("ref, message", [
+    ("#/components/schemas/A", "循环"),
+    ("#/components/schemas/Missing", "不存在"),
+    ("https://example.com/schemas.json#/Pet", "远程"),
+    ("schemas.json#/Pet", "未提供规范文件路径"),
+])
+def test_resolver_errors(ref, message):
+    document = {
+        "components": {
+            "schemas": {
+                "A": {"$ref": "#/components/schemas/B"},
+                "B": {"$ref": "#/components/schemas/A"},
+            }
+        }
+    }
+    with pytest.raises(ValueError, match=message):
+        RefResolver(document).resolve({"$ref": ref})
+
+
+def test_relative_file_refs(tmp_path):
+    (tmp_path / "common").mkdir()
+    (tmp_path / "common" / "params.yaml").write_text(
+        "Limit:\n"
+        "  name: limit\n"
+        "  in: query\n"
+        "  schema:\n"
+        "    $ref: '#/LimitSchema'\n"
+        "LimitSchema:\n"
+        "  type: integer\n"
+        "  default: 20\n",
+        encoding="utf-8",
+    )
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps(_openapi({
+        "/pets": {"get": {
+            "operationId": "listPets",
+            "parameters": [{"$ref": "common/params.yaml#/Limit"}],
+            "responses": {"200": {"description": "OK"}},
+        }}
+    })), encoding="utf-8")
+
+    parser = OpenAPIParser()
+    api_spec = parser.parse_file(str(spec_file))
+
+    param = api_spec.endpoints[0].parameters[0]
+    assert (param.name, param.type, param.default) == ("limit", "integer", 20)
+    assert parser._resolver.external_documents == [str((tmp_path / "common" / "params.yaml").resolve())]
+
+
+def test_parser_resolves_component_refs_and_merges_path_parameters():
+    spec = _openapi(
+        {
+            "/pets/{id}": {
+                "parameters": [
+                    {"$ref": "#/components/parameters/PetId"},
+                    {"name": "lang", "in": "query", "schema": {"type": "string"}, "description": "path level"},
+                ],
+                "get": {
+                    "operationId": "getPet",
+                    "parameters": [
+                        {"name": "lang", "in": "query", "schema": {"$ref": "#/components/schemas/Lang"}, "description": "operation level"},
+                    ],
+                    "requestBody": {"$ref": "#/components/requestBodies/Empty"},
+                    "responses": {"200": {"description": "OK"}},
+                },
+            }
+        },
+        components={
+            "parameters": {"PetId": {"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}},
+            "schemas": {"Lang": {"type": "string", "enum": ["en", "zh"]}},
+            "requestBodies": {"Empty": {"content": {}}},
+        },
+    )
+
+    endpoint = OpenAPIParser().parse_dict(spec).endpoints[0]
+
+    params = {param.name: param for param in endpoint.parameters}
+    assert params["id"].type == "integer" and params["id"].required
+    assert params["lang"].description == "operation level"
+    assert params["lang"].enum == ["en", "zh"]
+    assert endpoint.request_body == {"content": {}}
+
+
+def test_unresolvable_ref_is_skipped_with_warning(capsys):
+    spec = _openapi({
+        "/pets": {"get": {
+            "operationId": "listPets",
+            "parameters": [{"$ref": "#/components/parameters/Missing"}, {"name": "q", "in": "query"}],
+            "responses": {"200": {"description": "OK"}},
+        }}
+    })
+
+    endpoint = OpenAPIParser().parse_dict(spec).endpoints[0]
+
+    assert [param.name for param in endpoint.parameters] == ["q"]
+    assert "无法解析 $ref" in capsys.readouterr().out
+
+
+def test_swagger_body_parameter_type_from_ref():
+    spec = {
+        "swagger": "2.0",
+        "info": {"title": "Pets", "version": "1.0.0"},
+        "host": "api.example.com",
+        "basePath": "/v2",
+        "paths": {"/pets": {"post": {
+            "operationId": "addPet",
+            "parameters": [{"name": "body", "in": "body", "schema": {"$ref": "#/definitions/Pet"}}],
+            "responses": {"200": {"description": "OK"}},
+        }}},
+        "definitions": {"Pet": {"type": "object"}},
+    }
+
+    api_spec = OpenAPIParser().parse_dict(spec)
+
+    assert api_spec.base_url == "https://api.example.com/v2"
+    assert api_spec.endpoints[0].parameters[0].type == "object"
+
+
+def test_iter_endpoints_is_lazy_and_parse_info_skips_endpoints():
+    spec = sample_openapi()
+    parser = OpenAPIParser()
+
+    info = parser.parse_info(spec)
+    endpoints = parser.iter_endpoints(spec)
+
+    assert info.endpoints == []
+    assert (info.title, info.base_url, info.auth_type) == ("Sample API", "https://api.example.com/v1", "apiKey")
+    assert next(endpoints).operation_id == "listItems"
+    assert [endpoint.operation_id for endpoint in endpoints] == ["createItem", "getItem", "health"]
+
+
+def test_parse_dict_matches_iter_endpoints():
+    spec = sample_openapi()
+    parser = OpenAPIParser()
+    assert parser.parse_dict(spec).endpoints == list(parser.iter_endpoints(spec))
+    assert parser.parse_dict(spec).endpoints[0].cache_ttl == 60.0
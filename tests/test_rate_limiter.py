@@ -0,0 +1,103 @@
+"""
+令牌桶限流与 Retry-After 解析测试
+"""
+import asyncio
+from email.utils import formatdate
+import time
+
+import pytest
+
+from api_to_mcp.enhancer import DescriptionEnhancer
+from api_to_mcp.rate_limiter import RateLimiter, TokenBucket, parse_retry_after
+
+from conftest import make_endpoint, make_spec
+
+
+def test_token_bucket_reserve():
+    bucket = TokenBucket(60)  # 每秒补充 1 个
+    now = bucket._updated
+    assert bucket.reserve(60, now) == 0.0
+    # 余额为负时返回补足所需的等待时间
+    assert bucket.reserve(2, now) == pytest.approx(2.0)
+    assert bucket.reserve(1, now + 3) == pytest.approx(0.0)
+
+
+def test_requests_per_minute_limit():
+    limiter = RateLimiter(requests_per_minute=120)  # 容量 120，每秒补充 2 个
+    delays = [limiter.reserve() for _ in range(121)]
+    assert delays[:120] == [0.0] * 120
+    assert delays[120] == pytest.approx(0.5, abs=0.05)
+
+
+def test_tokens_per_minute_limit():
+    limiter = RateLimiter(tokens_per_minute=600)  # 每秒补充 10 个 token
+    assert limiter.reserve(600) == 0.0
+    assert limiter.reserve(50) == pytest.approx(5.0, abs=0.05)
+
+
+def test_unlimited_by_default():
+    limiter = RateLimiter()
+    assert all(limiter.reserve(10_000) == 0.0 for _ in range(100))
+
+
+def test_pause_delays_all_callers():
+    limiter = RateLimiter()
+    limiter.pause(0.2)
+    assert 0.1 < limiter.reserve() <= 0.2
+
+    started = time.monotonic()
+    asyncio.run(limiter.aacquire())
+    assert time.monotonic() - started >= 0.1
+
+
+def test_shared_limiter_per_key():
+    first = RateLimiter.shared("https://a/deploy", 10, 0)
+    assert RateLimiter.shared("https://a/deploy", 10, 0) is first
+    assert RateLimiter.shared("https://b/deploy", 10, 0) is not first
+    assert RateLimiter.shared("https://a/deploy", 20, 0) is not first
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "3"}, 3.0),
+    ({"retry-after": "0.25"}, 0.25),
+    ({"retry-after": "soon"}, None),
+    ({}, None),
+    (None, None),
+])
+def test_parse_retry_after(headers, expected):
+    assert parse_retry_after(headers) == expected
+
+
+def test_parse_retry_after_http_date():
+    delay = parse_retry_after({"retry-after": formatdate(time.time() + 30, usegmt=True)})
+    assert 28 <= delay <= 30
+
+
+def test_client_errors_are_not_retried(chat_server, azure_config):
+    chat_server.reply = lambda body: (400, {}, "bad request")
+    spec = make_spec([make_endpoint("op0")])
+    enhancer = DescriptionEnhancer(config=azure_config)
+
+    enhancer.enhance_api_spec(spec)
+
+    assert len(chat_server.requests) == 1
+    assert enhancer.metrics.retried == 0
+    assert enhancer.metrics.fallback == 1
+
+
+def test_retry_after_pauses_shared_limiter(chat_server, azure_config):
+    replies = iter([(429, {"Retry-After": "0.2"}, "slow down")])
+    default_reply = chat_server.reply
+    chat_server.reply = lambda body: next(replies, None) or default_reply(body)
+    spec = make_spec([make_endpoint("op0")])
+    enhancer = DescriptionEnhancer(config=azure_config)
+    paused = []
+    original_pause = enhancer.rate_limiter.pause
+    enhancer.rate_limiter.pause = lambda seconds: paused.append(seconds) or original_pause(seconds)
+
+    enhancer.enhance_api_spec(spec)
+
+    assert paused == [pytest.approx(0.2)]
+    assert enhancer.metrics.throttled == 1
+    assert spec.endpoints[0].enhanced_summary == "Summary of op0"
@@ -0,0 +1,132 @@
+"""
+解析结果缓存测试
+"""
+import datetime
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from api_to_mcp.cli import cli
+from api_to_mcp.config import SpecCacheConfig
+from api_to_mcp.parsers import OpenAPIParser, SpecCache, spec_cache as spec_cache_module
+
+from conftest import sample_openapi
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SpecCache(SpecCacheConfig(path=str(tmp_path / "specs")))
+
+
+@pytest.fixture
+def spec_file(tmp_path):
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps(sample_openapi()), encoding="utf-8")
+    return path
+
+
+def test_parse_file_hits_cache(cache, spec_file, monkeypatch):
+    first = OpenAPIParser(cache=cache).parse_file(str(spec_file))
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    # 命中时不再加载和解析规范文件
+    monkeypatch.setattr("api_to_mcp.parsers.openapi_parser.load_spec_file", lambda path: pytest.fail("未命中缓存"))
+    second = OpenAPIParser(cache=cache).parse_file(str(spec_file))
+
+    assert cache.hits == 1
+    assert second == first
+    assert second.endpoints[0].parameters[0].default == 10
+    # 重建的模型仍可修改和序列化
+    second.endpoints[0].enhanced_summary = "changed"
+    assert second.endpoints[0].model_dump()["enhanced_summary"] == "changed"
+
+
+def test_content_change_is_a_miss(cache, spec_file):
+    OpenAPIParser(cache=cache).parse_file(str(spec_file))
+    data = sample_openapi()
+    data["info"]["title"] = "Renamed"
+    spec_file.write_text(json.dumps(data), encoding="utf-8")
+
+    assert OpenAPIParser(cache=cache).parse_file(str(spec_file)).title == "Renamed"
+    assert cache.hits == 0
+
+
+def test_external_ref_change_invalidates(cache, tmp_path):
+    schemas = tmp_path / "params.json"
+    schemas.write_text(json.dumps({"Limit": {"name": "limit", "in": "query", "schema": {"type": "integer"}}}))
+    data = sample_openapi()
+    data["paths"]["/items"]["get"]["parameters"] = [{"$ref": "params.json#/Limit"}]
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps(data))
+
+    OpenAPIParser(cache=cache).parse_file(str(spec_file))
+    schemas.write_text(json.dumps({"Limit": {"name": "limit", "in": "query", "schema": {"type": "string"}}}))
+    api_spec = OpenAPIParser(cache=cache).parse_file(str(spec_file))
+
+    assert cache.hits == 0
+    assert api_spec.endpoints[0].parameters[0].type == "string"
+
+
+def test_corrupted_entry_is_a_miss(cache, spec_file):
+    parser = OpenAPIParser(cache=cache)
+    parser.parse_file(str(spec_file))
+    key = cache.make_key(spec_file)
+    cache._entry_path(key).write_bytes(b"\x00garbage")
+
+    assert cache.get(key) is None
+    assert parser.parse_file(str(spec_file)).title == "Sample API"
+
+
+def test_unencodable_spec_is_not_cached(cache):
+    api_spec = OpenAPIParser().parse_dict(sample_openapi())
+    api_spec.endpoints[0].parameters[0].default = datetime.date(2024, 1, 1)
+    assert cache.set("key", api_spec) is False
+    assert cache.get("key") is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    api_spec = OpenAPIParser().parse_dict(sample_openapi())
+    entry_size = len(spec_cache_module._encode({"dependencies": {}, "spec": api_spec.model_dump()}))
+    # 容量只够保存一个半条目
+    cache = SpecCache(SpecCacheConfig(path=str(tmp_path / "specs"), max_mb=entry_size * 1.5 / 1024 / 1024))
+    cache.set("a", api_spec)
+    os.utime(cache._entry_path("a"), (1, 1))
+    cache.set("b", api_spec)
+
+    assert [path.stem for path in cache.path.glob("*.bin")] == ["b"]
+
+
+def test_codec_round_trip():
+    data = {"spec": {"title": "中文", "n": 1, "x": 1.5, "flag": True, "none": None, "items": [1, "a"]}}
+    assert spec_cache_module._decode(spec_cache_module._encode(data)) == data
+
+
+def test_msgpack_codec():
+    msgpack = pytest.importorskip("msgpack")
+    assert spec_cache_module.CODEC == "msgpack"
+    payload = spec_cache_module._encode({"a": [1, 2]})
+    assert msgpack.unpackb(payload) == {"a": [1, 2]}
+
+
+def test_spec_cache_is_opt_in(spec_file, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache-dir"
+    monkeypatch.setenv("API_TO_MCP_SPEC_CACHE", str(cache_dir))
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["validate", str(spec_file)])
+    assert result.exit_code == 0, result.output
+    assert not cache_dir.exists()
+
+    result = runner.invoke(cli, ["convert", str(spec_file), "-o", str(tmp_path / "out"), "--no-enhance"])
+    assert result.exit_code == 0, result.output
+    assert not cache_dir.exists()
+
+    result = runner.invoke(cli, ["validate", str(spec_file), "--spec-cache"])
+    assert result.exit_code == 0, result.output
+    assert len(list(cache_dir.glob("*.bin"))) == 1
+
+    result = runner.invoke(cli, ["convert", str(spec_file), "-o", str(tmp_path / "out"), "--no-enhance", "--spec-cache"])
+    assert result.exit_code == 0, result.output
+    assert "命中解析缓存" in result.output